@@ -0,0 +1,359 @@
+"""
+JSON endpoints of the API server.
+
+Authenticated requests send "Authorization: Bearer <token>" with a token
+from POST /api/login. The cart is the customer's stock holds, so items
+in it are reserved exactly as they are for the desktop client.
+"""
+import re
+from datetime import date, datetime
+from functools import wraps
+from ..config import API_CONFIG
+from ..dao.category_dao import CategoryDAO
+from ..dao.inventory_dao import InventoryDAO
+from ..dao.order_dao import OrderDAO, PAGE_SIZE as ORDER_PAGE_SIZE
+from ..dao.product_dao import ProductDAO, PAGE_SIZE
+from ..dao.session_dao import SessionDAO
+from ..dao.user_dao import UserDAO
+from ..db.db_connection import db
+from ..db.instrumentation import query_stats
+from ..utils.security import LoginThrottledError
+from .server import HTTPError, Response, json_response
+
+ORDER_STATUSES = ('pending', 'paid', 'shipped', 'delivered')
+
+# Longest Idempotency-Key accepted, the size of orders.idempotency_key
+IDEMPOTENCY_KEY_LENGTH = 64
+
+category_dao = CategoryDAO()
+inventory_dao = InventoryDAO()
+order_dao = OrderDAO()
+product_dao = ProductDAO()
+session_dao = SessionDAO()
+user_dao = UserDAO()
+
+
+class Router:
+    def __init__(self):
+        self.routes = []  # [(method, compiled pattern, handler), ...]
+
+    def route(self, method, pattern):
+        """Register a handler for a path such as /api/products/{product_id}; IDs are passed as ints"""
+        regex = re.sub(r"\{(\w+)\}", r"(?P<\1>[0-9]+)", pattern)
+        def register(handler):
+            @wraps(handler)
+            def routed(request, **params):
+                # Reads follow this request's own writes; login_required widens that to the user's.
+                # The writer is a bare token, so the request and its body are not kept once answered
+                with db.read_your_writes(object()):
+                    return handler(request, **params)
+            self.routes.append((method, re.compile(f"^{regex}$"), routed))
+            return handler
+        return register
+
+    def match(self, method, path):
+        """Find the handler for a request, returning (handler, path parameters)"""
+        allowed = []
+        for route_method, regex, handler in self.routes:
+            match = regex.match(path)
+            if match:
+                if route_method == method:
+                    return handler, {name: int(value) for name, value in match.groupdict().items()}
+                allowed.append(route_method)
+        if allowed:
+            raise HTTPError(405, headers={"Allow": ", ".join(allowed)})
+        raise HTTPError(404)
+
+
+router = Router()
+
+
+def login_required(handler):
+    """Reject requests without a valid session and set request.user"""
+    @wraps(handler)
+    def wrapper(request, **params):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        user = session_dao.get_session_user(token.strip()) if scheme.lower() == "bearer" else None
+        if user is None:
+            raise HTTPError(401, "Login required", headers={"WWW-Authenticate": "Bearer"})
+        request.user = user
+        with db.read_your_writes(user.id):
+            return handler(request, **params)
+    return wrapper
+
+
+def admin_required(handler):
+    """Reject requests from users who are not admins"""
+    @wraps(handler)
+    def wrapper(request, **params):
+        if request.user.role != "admin":
+            raise HTTPError(403, "Admin access required")
+        return handler(request, **params)
+    return login_required(wrapper)
+
+
+def int_param(request, name, default=None, minimum=None):
+    """Read an integer query parameter"""
+    value = request.query.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise HTTPError(400, f"{name} must be at least {minimum}")
+    return value
+
+
+def date_param(request, name):
+    """Read a YYYY-MM-DD query parameter"""
+    value = request.query.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be a date (YYYY-MM-DD)")
+
+
+def order_cursor_param(request):
+    """Read an order listing cursor, the "<order_date>,<id>" of the last order seen"""
+    value = request.query.get("cursor")
+    if not value:
+        return None
+    order_date, _, order_id = value.rpartition(",")
+    try:
+        return datetime.fromisoformat(order_date), int(order_id)
+    except ValueError:
+        raise HTTPError(400, "cursor is not valid")
+
+
+def login_source(request):
+    """The client address failed logins are counted against, or None to count them per account only.
+
+    Behind a proxy every connection comes from the proxy, so the client is
+    taken from X-Forwarded-For, and only when a trusted proxy sent it.
+    """
+    trusted_proxies = API_CONFIG['trusted_proxies']
+    if request.client_ip in trusted_proxies:
+        # Each proxy appends the address it saw; entries before the nearest untrusted one can be forged
+        for address in reversed(request.headers.get("x-forwarded-for", "").split(",")):
+            address = address.strip()
+            if address and address not in trusted_proxies:
+                return address
+        return None
+    return request.client_ip if API_CONFIG['throttle_peer_address'] else None
+
+
+@router.route("GET", "/api/health")
+def health(request):
+    return json_response({"status": "ok"})
+
+
+@router.route("GET", "/metrics")
+def metrics(request):
+    """Query statistics of the worker process that answers, in Prometheus text format"""
+    text = query_stats.to_prometheus()
+    if db.replicas is not None:
+        text += db.replicas.to_prometheus()
+    return Response(200, text.encode("utf-8"),
+                    content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.route("POST", "/api/login")
+def login(request):
+    payload = request.json()
+    email = str(payload.get("email", "")).strip()
+    password = str(payload.get("password", ""))
+    if not email or not password:
+        raise HTTPError(400, "email and password are required")
+    try:
+        user = user_dao.authenticate_user(email, password, source=login_source(request))
+    except LoginThrottledError as e:
+        raise HTTPError(429, str(e), headers={"Retry-After": str(e.retry_after)})
+    if user is None:
+        raise HTTPError(401, "Invalid email or password")
+    token = session_dao.create_session(user)
+    if token is None:
+        raise HTTPError(503, "Could not start a session")
+    return json_response({"token": token, "user": user.to_dict()})
+
+
+@router.route("POST", "/api/logout")
+@login_required
+def logout(request):
+    token = request.headers["authorization"].partition(" ")[2].strip()
+    session_dao.revoke_session(token)
+    return Response(204)
+
+
+@router.route("GET", "/api/categories")
+def list_categories(request):
+    categories = [{"id": category_id, "name": name, "description": description}
+                  for category_id, name, description in category_dao.get_all_categories()]
+    return json_response({"categories": categories}, cacheable=True)
+
+
+@router.route("GET", "/api/products")
+def list_products(request):
+    """One page of products, optionally searched and filtered by category"""
+    page_size = min(int_param(request, "limit", PAGE_SIZE, minimum=1), API_CONFIG['max_page_size'])
+    cursor = int_param(request, "cursor", minimum=0)
+    category_id = int_param(request, "category_id")
+    search = request.query.get("q", "").strip()
+    if search:
+        products, next_cursor = product_dao.get_products_by_name_page(search, cursor, page_size, category_id)
+    elif category_id is not None:
+        products, next_cursor = product_dao.get_products_by_category_page(category_id, cursor, page_size)
+    else:
+        products, next_cursor = product_dao.get_all_products_page(cursor, page_size)
+    return json_response({"products": [product.to_dict() for product in products],
+                          "next_cursor": next_cursor}, cacheable=True)
+
+
+@router.route("GET", "/api/products/{product_id}")
+def get_product(request, product_id):
+    product = product_dao.get_product_by_id(product_id)
+    if product is None:
+        raise HTTPError(404, "Product not found")
+    return json_response(product.to_dict(), cacheable=True)
+
+
+def cart_payload(user_id):
+    holds = inventory_dao.get_holds(user_id)
+    products = {product.id: product for product in product_dao.get_products_by_ids([hold[0] for hold in holds])}
+    items = []
+    total = 0
+    for product_id, quantity, expires_at in holds:
+        product = products.get(product_id)
+        if product is None:
+            continue
+        items.append({"product": product.to_dict(), "quantity": quantity, "held_until": expires_at})
+        total += product.price * quantity
+    return {"items": items, "total": total}
+
+
+@router.route("GET", "/api/cart")
+@login_required
+def get_cart(request):
+    return json_response(cart_payload(request.user.id))
+
+
+@router.route("PUT", "/api/cart/{product_id}")
+@login_required
+def set_cart_item(request, product_id):
+    """Set the quantity of a product in the cart, reserving the stock"""
+    quantity = request.json().get("quantity")
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        raise HTTPError(400, "quantity must be a positive integer")
+    if product_dao.get_product_by_id(product_id) is None:
+        raise HTTPError(404, "Product not found")
+    if not inventory_dao.hold_stock(request.user.id, product_id, quantity):
+        available = inventory_dao.get_available_stock(product_id, request.user.id)
+        raise HTTPError(409, payload={"error": "Insufficient stock", "available": available})
+    return json_response(cart_payload(request.user.id))
+
+
+@router.route("DELETE", "/api/cart/{product_id}")
+@login_required
+def remove_cart_item(request, product_id):
+    inventory_dao.release_hold(request.user.id, product_id)
+    return Response(204)
+
+
+@router.route("POST", "/api/checkout")
+@login_required
+def checkout(request):
+    """Place an order for everything in the cart at current prices.
+
+    A client that sends an Idempotency-Key header can retry the request
+    safely: repeating a key replays the order already placed with it.
+    """
+    key = request.headers.get("idempotency-key", "").strip() or None
+    if key is not None and len(key) > IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPError(400, f"Idempotency-Key must be at most {IDEMPOTENCY_KEY_LENGTH} characters")
+    
+    with db.primary():  # Read the holds and the placed order from the primary, never a lagging replica
+        if key is not None:
+            # The first attempt emptied the cart, so replay before looking at it
+            order = order_dao.get_order_by_idempotency_key(request.user.id, key)
+            if order is not None:
+                return checkout_response(order.id, order.total_amount, replayed=True)
+        holds = inventory_dao.get_holds(request.user.id)
+        if not holds:
+            raise HTTPError(400, "Your cart is empty")
+        # Priced from the product rows locked in the order transaction, not the product cache
+        order_items = [{"product_id": product_id, "quantity": quantity}
+                       for product_id, quantity, expires_at in holds]
+        order_id, shortfalls = order_dao.place_order(request.user.id, None, order_items, key, reprice=True)
+        if shortfalls:
+            raise HTTPError(409, payload={"error": "Insufficient stock", "shortfalls": shortfalls})
+        order = order_dao.get_order_by_id(order_id) if order_id else None
+    if order is None:
+        raise HTTPError(500, "Failed to place order")
+    return checkout_response(order.id, order.total_amount)
+
+
+def checkout_response(order_id, total, replayed=False):
+    headers = {"Location": f"/api/orders/{order_id}"}
+    if replayed:
+        headers["Idempotent-Replayed"] = "true"
+    return json_response({"order_id": order_id, "total": total}, status=201, headers=headers)
+
+
+@router.route("GET", "/api/orders")
+@login_required
+def list_orders(request):
+    """One page of the caller's orders, newest first; admins see every order and can filter by user"""
+    page_size = min(int_param(request, "limit", ORDER_PAGE_SIZE, minimum=1), API_CONFIG['max_page_size'])
+    status = request.query.get("status") or None
+    if status is not None and status not in ORDER_STATUSES:
+        raise HTTPError(400, f"status must be one of {', '.join(ORDER_STATUSES)}")
+    user_id = int_param(request, "user_id", minimum=1) if request.user.role == "admin" else request.user.id
+    orders, next_cursor = order_dao.get_orders_page(order_cursor_param(request), page_size, status,
+                                                    date_param(request, "start_date"),
+                                                    date_param(request, "end_date"), user_id)
+    if next_cursor is not None:
+        last_date, last_id = next_cursor
+        next_cursor = f"{last_date.isoformat()},{last_id}"
+    return json_response({"orders": [order.to_dict() for order in orders], "next_cursor": next_cursor})
+
+
+@router.route("GET", "/api/orders/{order_id}")
+@login_required
+def get_order(request, order_id):
+    user_id = None if request.user.role == "admin" else request.user.id
+    order, items = order_dao.get_order_details(order_id, user_id)
+    if order is None:
+        raise HTTPError(404, "Order not found")
+    return json_response({"order": order.to_dict(), "items": [item.to_dict() for item in items]})
+
+
+@router.route("PATCH", "/api/orders/{order_id}")
+@admin_required
+def update_order(request, order_id):
+    status = request.json().get("status")
+    if status not in ORDER_STATUSES:
+        raise HTTPError(400, f"status must be one of {', '.join(ORDER_STATUSES)}")
+    if order_dao.get_order_by_id(order_id) is None:
+        raise HTTPError(404, "Order not found")
+    if not order_dao.update_order_status(order_id, status):
+        raise HTTPError(500, "Failed to update order status")
+    return get_order(request, order_id=order_id)
+
+
+@router.route("GET", "/api/analytics/sales")
+@admin_required
+def sales_analytics(request):
+    rows = order_dao.get_sales_report()
+    return json_response({"days": [{"date": sale_date, "orders": orders_count, "revenue": revenue}
+                                   for sale_date, orders_count, revenue in rows]})
+
+
+@router.route("GET", "/api/analytics/top-products")
+@admin_required
+def top_products_analytics(request):
+    rows = order_dao.get_top_selling_products()
+    return json_response({"products": [{"name": name, "quantity_sold": quantity}
+                                       for name, quantity in rows]})
@@ -0,0 +1,376 @@
+"""
+HTTP/JSON API server over the DAO layer.
+
+Runs without the GUI, so it can be put behind a load balancer and scaled
+out. Run from the repository root:
+
+    python -m ecommerce_system.api.server --port 8080 --workers 4
+
+The parent process binds the port and forks worker processes that share
+the socket. Each worker runs an asyncio loop for the connections and a
+thread pool for the blocking DAO calls, with its own database pool.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+from ..config import API_CONFIG, INVENTORY_CONFIG
+from ..dao.inventory_dao import InventoryDAO
+from ..db.db_connection import db
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None, headers=None, payload=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.headers = headers or {}
+        self.payload = payload
+
+
+class Request:
+    def __init__(self, method, target, version, headers, body, client_ip):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        self.version = version
+        self.headers = headers  # Lowercased names
+        self.body = body
+        self.client_ip = client_ip
+        self.user = None  # Set for requests with a valid session token
+
+    def json(self):
+        """Parse the body as a JSON object"""
+        try:
+            payload = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return payload
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class Response:
+    def __init__(self, status=200, body=b"", content_type="application/json", headers=None, cacheable=False):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.cacheable = cacheable  # Send an ETag and answer If-None-Match with 304
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)  # Money keeps its exact DECIMAL value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_response(payload, status=200, headers=None, cacheable=False):
+    """Build a JSON response"""
+    body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+    return Response(status, body, headers=headers, cacheable=cacheable)
+
+
+class HTTPServer:
+    """A small HTTP/1.1 server with keep-alive, gzip and ETags.
+
+    Handlers are plain blocking functions; they run on the thread pool so a
+    slow query never stalls other connections.
+    """
+
+    def __init__(self, router, executor, keep_alive_timeout=15, max_body_bytes=1024 * 1024,
+                 gzip_min_bytes=1024):
+        self.router = router
+        self.executor = executor
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_bytes = max_body_bytes
+        self.gzip_min_bytes = gzip_min_bytes
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes or idles out"""
+        peer = writer.get_extra_info("peername")
+        client_ip = peer[0] if peer else None
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader, client_ip),
+                                                     self.keep_alive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as e:
+                    # The stream position is unknown after a malformed request
+                    await self._send(writer, None, self._error_response(e), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                response = await self._dispatch(request)
+                await self._send(writer, request, response, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, client_ip):
+        """Read one request, or return None when the client closed the connection"""
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HTTPError(414)
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise HTTPError(505)
+
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise HTTPError(431)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, colon, value = line.decode("latin-1").partition(":")
+            if not colon or not name.strip():
+                raise HTTPError(400, "Malformed header")
+            headers[name.strip().lower()] = value.strip()
+            if len(headers) > 100:
+                raise HTTPError(431)
+
+        if "transfer-encoding" in headers:
+            raise HTTPError(411, "Send request bodies with a Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_bytes:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body, client_ip)
+
+    async def _dispatch(self, request):
+        """Run the matching handler on the thread pool and return its response"""
+        try:
+            handler, params = self.router.match(request.method, request.path)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, lambda: handler(request, **params))
+        except HTTPError as e:
+            return self._error_response(e)
+        except Exception as e:
+            print(f"Error handling {request.method} {request.path}: {e}")
+            return self._error_response(HTTPError(500))
+
+    def _error_response(self, error):
+        payload = error.payload or {"error": str(error)}
+        return json_response(payload, error.status, headers=error.headers)
+
+    async def _send(self, writer, request, response, keep_alive):
+        """Write a response, applying conditional GET and gzip"""
+        headers = {
+            "Date": formatdate(usegmt=True),
+            "Content-Type": response.content_type,
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        headers.update(response.headers)
+        status, body = response.status, response.body
+
+        if response.cacheable and status == 200:
+            # Weak, since the same JSON is also sent gzip-encoded
+            etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+            headers["ETag"] = etag
+            headers["Cache-Control"] = "no-cache"
+            if request is not None and self._etag_matches(request.headers.get("if-none-match"), etag):
+                status, body = 304, b""
+
+        if (request is not None and len(body) >= self.gzip_min_bytes
+                and response.content_type.startswith(COMPRESSIBLE_TYPES)):
+            headers["Vary"] = "Accept-Encoding"
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                body = gzip.compress(body, compresslevel=5)
+                headers["Content-Encoding"] = "gzip"
+
+        if status == 304:
+            del headers["Content-Type"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    @staticmethod
+    def _etag_matches(if_none_match, etag):
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == opaque:
+                return True
+        return False
+
+
+def serve(sock, config):
+    """Run one worker process's event loop on an already bound socket"""
+    from .routes import router
+
+    if not db.connect():
+        return 1
+    executor = ThreadPoolExecutor(max_workers=config['threads'], thread_name_prefix="api")
+    server = HTTPServer(router, executor, config['keep_alive_timeout'], config['max_body_bytes'],
+                        config['gzip_min_bytes'])
+
+    async def run():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform; Ctrl+C still raises KeyboardInterrupt
+        purging = asyncio.create_task(purge_expired_holds(executor))
+        try:
+            async with await asyncio.start_server(server.handle_connection, sock=sock):
+                await stop.wait()
+        finally:
+            purging.cancel()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        db.disconnect()
+    return 0
+
+
+async def purge_expired_holds(executor):
+    """Delete expired cart holds every INVENTORY_CONFIG['purge_minutes'] until cancelled"""
+    inventory_dao = InventoryDAO()
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(INVENTORY_CONFIG['purge_minutes'] * 60)
+        await loop.run_in_executor(executor, inventory_dao.purge_expired_holds)
+
+
+def supervise(sock, config, workers):
+    """Fork worker processes and restart any that die until asked to stop.
+
+    A worker that exits within min_worker_uptime of starting, for instance
+    because the database is down, is restarted after a delay that doubles
+    with each such exit in a row, up to max_restart_delay.
+    """
+    children = {}  # pid -> time.monotonic() it was started
+    stopping = False
+    fast_exits = 0
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 1
+            try:
+                code = serve(sock, config)
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        uptime = time.monotonic() - children.pop(pid)
+        if stopping:
+            continue
+        if uptime >= config['min_worker_uptime']:
+            fast_exits = 0
+            print(f"Worker {pid} exited with status {status}; restarting")
+            spawn()
+            continue
+
+        fast_exits += 1
+        delay = min(2 ** (fast_exits - 1), config['max_restart_delay'])
+        print(f"Worker {pid} exited with status {status} {uptime:.1f}s after starting; "
+              f"restarting in {delay}s")
+        if fast_exits >= 5:
+            print(f"WARNING: {fast_exits} workers in a row exited within {config['min_worker_uptime']}s "
+                  f"of starting; check the errors above", file=sys.stderr)
+        # Sleep in short steps so a stop signal isn't held up by the delay
+        restart_at = time.monotonic() + delay
+        while not stopping:
+            remaining = restart_at - time.monotonic()
+            if remaining <= 0:
+                spawn()
+                break
+            time.sleep(min(remaining, 0.5))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the e-commerce API over HTTP")
+    parser.add_argument("--host", default=API_CONFIG['host'])
+    parser.add_argument("--port", type=int, default=API_CONFIG['port'])
+    parser.add_argument("--workers", type=int, default=API_CONFIG['workers'],
+                        help="worker processes (forking requires a POSIX system)")
+    args = parser.parse_args()
+
+    sock = socket.create_server((args.host, args.port), backlog=1024)
+    sock.setblocking(False)
+    print(f"Serving API on http://{args.host}:{args.port} with {args.workers} worker(s)")
+    if args.workers > 1 and hasattr(os, "fork"):
+        return supervise(sock, API_CONFIG, args.workers)
+    return serve(sock, API_CONFIG)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
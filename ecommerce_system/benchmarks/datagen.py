@@ -0,0 +1,230 @@
+"""
+Synthetic data for the benchmark suite.
+
+Fills an empty database with a catalog, customers and an order history. The
+same scale and seed always produce the same data. Run from the repository
+root:
+
+    python -m ecommerce_system.benchmarks.datagen --scale 100k
+    python -m ecommerce_system.benchmarks.datagen --scale 1m --backend mysql --reset
+
+A scale is the number of orders. Each order has one to four items, and there
+is one product per 10 orders and one customer per 20 (at least 100 of each).
+Every customer's password is BENCH_PASSWORD.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from ..config import BENCHMARK_CONFIG
+from ..db.backends import BACKENDS
+from ..db.db_connection import db
+from ..db.migrate import MigrationRunner
+from ..dao.sales_rollup_dao import SalesRollupDAO
+from ..utils.search_index import product_index
+from ..utils.security import hash_password
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+BENCH_PASSWORD = "benchmark-password"
+
+# Rows sent in one multi-row INSERT
+BATCH_SIZE = 1000
+
+# Words product names and descriptions are made of; searches pick from these too
+WORDS = (
+    "wireless", "organic", "classic", "smart", "portable", "premium", "compact", "vintage", "eco",
+    "ultra", "deluxe", "mini", "pro", "travel", "kids", "outdoor", "ceramic", "steel", "cotton",
+    "bamboo", "leather", "glass", "digital", "solar", "ergonomic", "waterproof", "foldable",
+)
+NOUNS = (
+    "headphones", "kettle", "backpack", "lamp", "keyboard", "mug", "jacket", "blender", "speaker",
+    "notebook", "chair", "bottle", "watch", "charger", "tent", "sneakers", "camera", "pillow",
+    "scarf", "drone", "router", "monitor", "grinder", "mixer", "wallet", "umbrella", "helmet",
+)
+CATEGORIES = (
+    "Electronics", "Home", "Kitchen", "Outdoors", "Fashion", "Sports", "Toys", "Office",
+    "Garden", "Books", "Beauty", "Health", "Automotive", "Pets", "Music", "Travel",
+)
+# Order statuses and how often each occurs
+STATUS_WEIGHTS = (("pending", 10), ("paid", 25), ("shipped", 25), ("delivered", 40))
+
+
+class Scale:
+    def __init__(self, orders):
+        self.orders = orders
+        self.products = max(orders // 10, 100)
+        self.users = max(orders // 20, 100)
+        self.categories = len(CATEGORIES)
+
+    def __str__(self):
+        return (f"{self.orders} orders, {self.products} products, {self.users} customers, "
+                f"{self.categories} categories")
+
+
+def parse_scale(value):
+    """Read a scale given as a preset name (10k, 1m, ...) or a number of orders"""
+    if value.lower() in SCALES:
+        return Scale(SCALES[value.lower()])
+    try:
+        orders = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"scale must be one of {', '.join(SCALES)} or a number")
+    if orders <= 0:
+        raise argparse.ArgumentTypeError("scale must be positive")
+    return Scale(orders)
+
+
+def insert_rows(table, columns, rows):
+    """Insert rows with multi-row statements, BATCH_SIZE rows per transaction"""
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    batch = []
+
+    def flush():
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholders] * len(batch))}"
+        with db.transaction() as cursor:
+            cursor.execute(query, [value for row in batch for value in row])
+        batch.clear()
+
+    count = 0
+    for row in rows:
+        batch.append(row)
+        count += 1
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    return count
+
+
+def product_rows(scale, rng):
+    for product_id in range(1, scale.products + 1):
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {rng.choice(NOUNS)} {product_id}"
+        description = " ".join(rng.choice(WORDS + NOUNS) for _ in range(12))
+        price = Decimal(rng.randint(199, 49999)) / 100
+        # Plenty of stock, so benchmark checkouts never run short
+        yield (product_id, rng.randint(1, scale.categories), name, description, price,
+               rng.randint(10_000, 100_000))
+
+
+def user_rows(scale, password_hash):
+    for user_id in range(1, scale.users + 1):
+        yield (user_id, f"Bench Customer {user_id}", f"customer{user_id}@bench.example", password_hash, "customer")
+
+
+def order_rows(scale, rng, prices, days, items):
+    """Yield order rows, collecting their items into the items list as they are made"""
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    end = datetime.now().replace(microsecond=0)
+    for order_id in range(1, scale.orders + 1):
+        total = Decimal("0.00")
+        for product_id in rng.sample(range(1, scale.products + 1), rng.randint(1, 4)):
+            quantity = rng.randint(1, 3)
+            total += prices[product_id] * quantity
+            items.append((order_id, product_id, quantity, prices[product_id]))
+        order_date = end - timedelta(seconds=rng.randint(0, days * 86400))
+        yield (order_id, rng.randint(1, scale.users), total, rng.choices(statuses, weights)[0], order_date)
+
+
+def generate(scale, seed=1, days=365, progress=print):
+    """Fill an empty database with synthetic data"""
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    insert_rows("categories", ("id", "name", "description"),
+                ((index, name, f"Synthetic {name.lower()} category")
+                 for index, name in enumerate(CATEGORIES[:scale.categories], 1)))
+
+    prices = [None]  # Indexed by product ID
+    def priced(rows):
+        for row in rows:
+            prices.append(row[4])
+            yield row
+    insert_rows("products", ("id", "category_id", "name", "description", "price", "stock"),
+                priced(product_rows(scale, rng)))
+    progress(f"  {scale.products} products")
+
+    # Hashing once keeps generation fast; logins still pay the full bcrypt cost
+    password_hash = hash_password(BENCH_PASSWORD)
+    insert_rows("users", ("id", "name", "email", "password", "role"), user_rows(scale, password_hash))
+    progress(f"  {scale.users} customers")
+
+    # Orders are written in chunks so their items are never all held in memory
+    items = []
+    orders = order_rows(scale, rng, prices, days, items)
+    written = item_count = 0
+    while written < scale.orders:
+        chunk = [order for _, order in zip(range(BATCH_SIZE * 10), orders)]
+        insert_rows("orders", ("id", "user_id", "total_amount", "status", "order_date"), chunk)
+        item_count += insert_rows("order_items", ("order_id", "product_id", "quantity", "price"), items)
+        items.clear()
+        written += len(chunk)
+        if written % (BATCH_SIZE * 100) == 0 or written == scale.orders:
+            progress(f"  {written}/{scale.orders} orders ({item_count} items)")
+
+    SalesRollupDAO().rebuild()
+    product_index.mark_stale()
+    progress(f"Generated {scale} in {time.perf_counter() - started:.1f}s")
+
+
+def is_empty():
+    result = db.fetch_one("SELECT (SELECT COUNT(*) FROM products) + (SELECT COUNT(*) FROM orders)")
+    return result is not None and result[0] == 0
+
+
+def reset():
+    """Delete every row the generator writes"""
+    with db.transaction() as cursor:
+        for table in ("sessions", "stock_holds", "product_sales_daily", "sales_daily", "order_items",
+                      "orders", "products", "categories", "users"):
+            cursor.execute(f"DELETE FROM {table}")
+
+
+def use_database(backend, name=None):
+    """Point the DAOs at a benchmark database, creating it if needed, and return its name"""
+    name = name or BENCHMARK_CONFIG['databases'][backend]
+    db.use_backend(backend, name)
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a benchmark database with synthetic data")
+    parser.add_argument("--scale", type=parse_scale, default=parse_scale("10k"),
+                        help=f"orders to generate: {', '.join(SCALES)} or a number (default: 10k)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    parser.add_argument("--days", type=int, default=365, help="days of order history (default: 365)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=BENCHMARK_CONFIG['backend'],
+                        help="database backend (default: %(default)s)")
+    parser.add_argument("--database", help="database (or SQLite file) to fill; never point this at real data")
+    parser.add_argument("--reset", action="store_true", help="delete existing rows first")
+    args = parser.parse_args()
+
+    try:
+        database = use_database(args.backend, args.database)
+    except Exception as e:
+        print(f"Error preparing the benchmark database: {e}")
+        return 1
+    if not db.connect():
+        return 1
+    try:
+        MigrationRunner().upgrade()
+        if args.reset:
+            reset()
+        elif not is_empty():
+            print(f"Database {database} already has data; pass --reset to replace it")
+            return 1
+        print(f"Generating {args.scale} into {database}")
+        generate(args.scale, args.seed, args.days)
+        return 0
+    except Exception as e:
+        print(f"Data generation failed: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
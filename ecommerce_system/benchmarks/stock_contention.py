@@ -0,0 +1,117 @@
+"""
+Flash-sale contention benchmark for the stock reservation engine.
+
+Many threads check out the same hot product at once and the outcome is
+checked for overselling. Run from the repository root against a test database:
+
+    python -m ecommerce_system.benchmarks.stock_contention --threads 50 --orders 500 --stock 300
+"""
+import argparse
+import sys
+import threading
+import time
+import uuid
+from ..config import POOL_CONFIG
+from ..db.db_connection import db
+from ..dao.order_dao import OrderDAO
+from ..dao.product_dao import ProductDAO
+from ..models.product import Product
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def create_fixtures(stock):
+    """Create a throwaway customer and hot product, returning their IDs"""
+    tag = uuid.uuid4().hex[:12]
+    db.execute_query(
+        "INSERT INTO users (name, email, password, role) VALUES (%s, %s, %s, 'customer')",
+        ("Benchmark User", f"bench-{tag}@example.com", "!")
+    )
+    user_id = db.fetch_one("SELECT id FROM users WHERE email = %s", (f"bench-{tag}@example.com",))[0]
+
+    ProductDAO().create_product(Product(name=f"bench-hot-{tag}", price=9.99, stock=stock))
+    product_id = db.fetch_one("SELECT id FROM products WHERE name = %s", (f"bench-hot-{tag}",))[0]
+    return user_id, product_id
+
+
+def run(threads, orders, stock, quantity):
+    """Run the benchmark and return True if no stock was oversold"""
+    user_id, product_id = create_fixtures(stock)
+    order_dao = OrderDAO()
+    remaining = [orders]
+    lock = threading.Lock()
+    latencies = []
+    outcomes = {'placed': 0, 'short': 0, 'error': 0}
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            items = [{'product_id': product_id, 'quantity': quantity, 'price': 9.99}]
+            started = time.perf_counter()
+            order_id, shortfalls = order_dao.place_order(user_id, 9.99 * quantity, items)
+            elapsed = time.perf_counter() - started
+            outcome = 'placed' if order_id else 'short' if shortfalls else 'error'
+            with lock:
+                latencies.append(elapsed)
+                outcomes[outcome] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall_time = time.perf_counter() - started
+
+    final_stock = db.fetch_one("SELECT stock FROM products WHERE id = %s", (product_id,))[0]
+    sold = db.fetch_one(
+        "SELECT COALESCE(SUM(quantity), 0) FROM order_items WHERE product_id = %s", (product_id,))[0]
+    expected_orders = min(orders, stock // quantity)
+
+    print(f"Checkouts: {orders} on {threads} threads, stock {stock}, quantity {quantity}")
+    print(f"Placed: {outcomes['placed']}  Short: {outcomes['short']}  Errors: {outcomes['error']}")
+    print(f"Throughput: {orders / wall_time:.1f} checkouts/s over {wall_time:.2f}s")
+    print(f"Latency ms: p50 {percentile(latencies, 50) * 1000:.1f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}  p99 {percentile(latencies, 99) * 1000:.1f}")
+    print(f"Final stock: {final_stock}  Units sold: {sold}")
+
+    correct = (final_stock >= 0 and final_stock + sold == stock
+               and outcomes['placed'] == expected_orders and outcomes['error'] == 0)
+    print("✓ No overselling" if correct else "✗ Stock accounting is inconsistent")
+
+    # Deleting the user cascades to its orders and order items
+    db.execute_query("DELETE FROM users WHERE id = %s", (user_id,))
+    db.execute_query("DELETE FROM products WHERE id = %s", (product_id,))
+    return correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock reservation contention benchmark")
+    parser.add_argument("--threads", type=int, default=50, help="concurrent checkout threads")
+    parser.add_argument("--orders", type=int, default=500, help="total checkout attempts")
+    parser.add_argument("--stock", type=int, default=300, help="starting stock of the hot product")
+    parser.add_argument("--quantity", type=int, default=1, help="units bought per checkout")
+    args = parser.parse_args()
+
+    # Let every thread hold a connection so the database, not the pool, is the bottleneck
+    POOL_CONFIG['max_size'] = max(POOL_CONFIG['max_size'], args.threads)
+    if not db.connect():
+        return 1
+    try:
+        return 0 if run(args.threads, args.orders, args.stock, args.quantity) else 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Benchmarks of the DAO hot paths.
+
+Times each operation against a database filled by benchmarks.datagen and
+reports throughput and p50/p95/p99 latency. Results can be saved as JSON and
+compared with an earlier run to catch regressions between commits. Run from
+the repository root:
+
+    python -m ecommerce_system.benchmarks.datagen --scale 100k
+    python -m ecommerce_system.benchmarks.suite --output before.json
+    python -m ecommerce_system.benchmarks.suite --compare before.json
+
+The suite places orders, so only run it against a benchmark database.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from ..config import BENCHMARK_CONFIG
+from ..db.backends import BACKENDS
+from ..db.db_connection import db
+from ..dao.order_dao import OrderDAO
+from ..dao.product_dao import ProductDAO
+from ..dao.user_dao import UserDAO
+from .datagen import BENCH_PASSWORD, NOUNS, WORDS, use_database
+from .stock_contention import percentile
+
+
+class Benchmark:
+    def __init__(self, name, operation, iterations=None):
+        self.name = name
+        self.operation = operation  # Called with a random.Random; returns a value to check
+        self.iterations = iterations  # Cap below the configured iterations, for slow operations
+
+
+def build_benchmarks(rng):
+    """Create the benchmarks for the data currently in the database"""
+    product_dao = ProductDAO()
+    order_dao = OrderDAO()
+    user_dao = UserDAO()
+    users = db.fetch_one("SELECT COUNT(*) FROM users WHERE email LIKE %s", ("%@bench.example",))[0]
+    products = db.fetch_all("SELECT id, price FROM products ORDER BY id LIMIT 10000")
+    if not users or not products:
+        raise RuntimeError("The database has no benchmark data; run benchmarks.datagen first")
+
+    def get_products_by_name(rng):
+        return product_dao.get_products_by_name(rng.choice(WORDS + NOUNS))
+
+    def create_order(rng):
+        lines = rng.sample(products, rng.randint(1, 3))
+        items = [{'product_id': product_id, 'quantity': 1, 'price': price} for product_id, price in lines]
+        return order_dao.create_order(rng.randint(1, users), sum(price for _, price in lines), items)
+
+    def authenticate_user(rng):
+        return user_dao.authenticate_user(f"customer{rng.randint(1, users)}@bench.example", BENCH_PASSWORD)
+
+    return [
+        Benchmark("get_all_products", lambda rng: product_dao.get_all_products(raw=True), iterations=50),
+        Benchmark("get_products_by_name", get_products_by_name),
+        Benchmark("create_order", create_order),
+        Benchmark("get_sales_report", lambda rng: order_dao.get_sales_report()),
+        Benchmark("get_top_selling_products", lambda rng: order_dao.get_top_selling_products()),
+        # bcrypt dominates; a handful of logins gives stable numbers
+        Benchmark("authenticate_user", authenticate_user, iterations=50),
+    ]
+
+
+def run_benchmark(benchmark, rng, iterations, seconds, warmup):
+    """Time one operation and return its results"""
+    for _ in range(warmup):
+        benchmark.operation(rng)
+
+    iterations = min(iterations, benchmark.iterations or iterations)
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    while len(latencies) < iterations and time.perf_counter() - started < seconds:
+        call_started = time.perf_counter()
+        result = benchmark.operation(rng)
+        latencies.append(time.perf_counter() - call_started)
+        if not result:
+            failures += 1  # The DAOs report errors by returning an empty result
+    elapsed = time.perf_counter() - started
+
+    return {
+        'iterations': len(latencies),
+        'failures': failures,
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(max(latencies, default=0) * 1000, 3),
+    }
+
+
+def git_commit():
+    """Get the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def data_counts():
+    tables = ("products", "users", "orders", "order_items")
+    return {table: db.fetch_one(f"SELECT COUNT(*) FROM {table}")[0] for table in tables}
+
+
+def compare(results, baseline, tolerance):
+    """Print each operation's change from a baseline run and return the regressed names"""
+    regressions = []
+    print(f"\n{'operation':<26} {'p50 before':>11} {'p50 now':>9} {'p95 before':>11} {'p95 now':>9}  change")
+    for name, result in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not before or not before['p95_ms']:
+            print(f"{name:<26} {'-':>11} {result['p50_ms']:>9.2f} {'-':>11} {result['p95_ms']:>9.2f}  new")
+            continue
+        change = result['p95_ms'] / before['p95_ms'] - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<26} {before['p50_ms']:>11.2f} {result['p50_ms']:>9.2f} {before['p95_ms']:>11.2f} "
+              f"{result['p95_ms']:>9.2f}  {change:+.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DAO hot paths")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=BENCHMARK_CONFIG['backend'],
+                        help="database backend (default: %(default)s)")
+    parser.add_argument("--database", help="database (or SQLite file) filled by benchmarks.datagen")
+    parser.add_argument("--only", action="append", metavar="NAME", help="run only this operation (repeatable)")
+    parser.add_argument("--iterations", type=int, default=BENCHMARK_CONFIG['iterations'],
+                        help="most timed calls per operation")
+    parser.add_argument("--seconds", type=float, default=BENCHMARK_CONFIG['seconds'],
+                        help="longest time spent on one operation")
+    parser.add_argument("--warmup", type=int, default=BENCHMARK_CONFIG['warmup'],
+                        help="untimed calls before timing each operation")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    parser.add_argument("--output", help="save the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare with results saved by an earlier run")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_CONFIG['tolerance'],
+                        help="p95 slowdown counted as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read {args.compare}: {e}")
+
+    try:
+        database = use_database(args.backend, args.database)
+    except Exception as e:
+        print(f"Error preparing the benchmark database: {e}")
+        return 1
+    if not db.connect():
+        return 1
+    try:
+        rng = random.Random(args.seed)
+        try:
+            benchmarks = build_benchmarks(rng)
+        except RuntimeError as e:
+            print(e)
+            return 1
+        if args.only:
+            unknown = set(args.only) - {benchmark.name for benchmark in benchmarks}
+            if unknown:
+                parser.error(f"unknown operation: {', '.join(sorted(unknown))}")
+            benchmarks = [benchmark for benchmark in benchmarks if benchmark.name in args.only]
+
+        counts = data_counts()
+        print(f"Benchmarking {db.backend.describe()}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+        print(f"{'operation':<26} {'calls':>6} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        results = {}
+        for benchmark in benchmarks:
+            result = run_benchmark(benchmark, rng, args.iterations, args.seconds, args.warmup)
+            results[benchmark.name] = result
+            failed = f"  ({result['failures']} failed)" if result['failures'] else ""
+            print(f"{benchmark.name:<26} {result['iterations']:>6} {result['throughput']:>9.1f} "
+                  f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}{failed}")
+    finally:
+        db.disconnect()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'database': database,
+        'data': counts,
+        'settings': {'iterations': args.iterations, 'seconds': args.seconds, 'warmup': args.warmup,
+                     'seed': args.seed},
+        'results': results,
+    }
+    if args.output:
+        try:
+            with open(args.output, "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            print(f"Results saved to {args.output}")
+        except OSError as e:
+            print(f"Error saving results: {e}")
+            return 1
+
+    if baseline is not None:
+        if baseline.get('data') != counts:
+            print("Note: the baseline was measured on a different amount of data")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"p95 latency regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 import os
 
+# Database backend: 'mysql' uses DB_CONFIG, 'sqlite' uses SQLITE_CONFIG and needs no server
+DB_BACKEND = 'mysql'
+
 # Database Configuration
 DB_CONFIG = {
     'host': 'localhost',
@@ -9,10 +12,136 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
+# Embedded SQLite Configuration
+SQLITE_CONFIG = {
+    'database': 'ecommerce.db',  # Database file
+    'journal_mode': 'WAL',  # Readers don't block the writer
+    'synchronous': 'NORMAL',  # Safe with WAL; a power cut can lose only the last commits
+    'busy_timeout': 5,  # Seconds to wait for another connection's write lock
+    'statement_cache_size': 256  # Statements kept translated per process and prepared per connection
+}
+
 # Application Configuration
 APP_NAME = "E-Commerce Management System"
 VERSION = "1.0.0"
 
 # Paths
 ASSETS_PATH = os.path.join(os.path.dirname(__file__), 'assets')
-IMAGES_PATH = os.path.join(ASSETS_PATH, 'images')
\ No newline at end of file
+IMAGES_PATH = os.path.join(ASSETS_PATH, 'images')
+
+# Connection Pool Configuration
+POOL_CONFIG = {
+    'min_size': 2,
+    'max_size': 10,
+    'checkout_timeout': 5,  # Seconds to wait for a free connection
+    'health_check_interval': 30  # Ping connections idle for longer than this before reuse
+}
+
+# Query Execution Configuration
+QUERY_CONFIG = {
+    'statement_cache_size': 100,  # Prepared statements kept per connection
+    'stream_batch_size': 1000  # Rows fetched per round trip by db.iter_query
+}
+
+# Transaction Retry Configuration
+RETRY_CONFIG = {
+    'attempts': 5,  # Runs of a transaction aborted by a deadlock or lock wait timeout, first included
+    'base_delay': 0.05,  # Seconds; the longest wait doubles after each attempt
+    'max_delay': 1.0  # Longest wait between attempts in seconds
+}
+
+# Read Replica Configuration
+REPLICA_CONFIG = {
+    # Each replica: connection settings that differ from the primary's, plus a routing weight,
+    # e.g. {'host': 'db-replica-1', 'weight': 2}
+    'replicas': [],
+    'max_lag_seconds': 5,  # Replicas further behind the primary don't serve reads
+    'lag_check_interval': 5,  # Seconds between replication lag checks of each replica
+    'read_your_writes_seconds': 5  # Reads stay on the primary this long after the same user's write
+}
+
+# Inventory Configuration
+INVENTORY_CONFIG = {
+    'hold_minutes': 15,  # How long items added to a cart stay reserved
+    'purge_minutes': 5  # How often the API server and desktop client delete expired holds
+}
+
+# Search Configuration
+SEARCH_CONFIG = {
+    'rebuild_seconds': 300  # Rebuild the search index to pick up changes from other processes
+}
+
+# Cache Configuration
+CACHE_CONFIG = {
+    'products': {
+        'max_size': 5000,  # Cached products and product listings
+        'ttl': 60  # Seconds before a cached entry is re-read, bounding staleness from other processes
+    },
+    'users': {
+        'max_size': 10000,  # Users cached by ID and by email for logins and user lookups
+        'ttl': 60
+    }
+}
+
+# Background Work Configuration
+BACKGROUND_CONFIG = {
+    'max_workers': 4,  # Threads running database calls for the GUI
+    'poll_ms': 30  # How often the GUI checks for finished calls
+}
+
+# Thumbnail Configuration
+THUMBNAIL_CONFIG = {
+    'directory': os.path.join(ASSETS_PATH, 'thumbnails'),  # Generated thumbnails, safe to delete
+    'size': (100, 100),  # Product card image size in pixels
+    'memory_cache_size': 200  # Decoded thumbnails kept in memory by the product grid
+}
+
+# Security Configuration
+SECURITY_CONFIG = {
+    'bcrypt_rounds': 12,  # Cost of new password hashes; older hashes are upgraded at login
+    'hash_workers': 2,  # Threads allowed to run bcrypt at once, so logins cannot take every core
+    'login_window_seconds': 300,  # Failed logins are counted over this window
+    'max_failures_per_account': 5,  # Failed logins allowed per email within the window
+    'max_failures_per_source': 20  # Failed logins allowed per client within the window
+}
+
+# Session Configuration
+SESSION_CONFIG = {
+    'ttl_minutes': 480,  # How long a login session stays valid
+    'cache_size': 10000,  # Sessions whose user is kept in memory
+    'cache_ttl': 60  # Seconds before a cached session is re-checked, bounding revocations made by other processes
+}
+
+# API Server Configuration
+API_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8080,
+    'workers': 2,  # Server processes sharing the listening socket
+    'threads': 8,  # Database threads per process; keep within POOL_CONFIG['max_size']
+    'keep_alive_timeout': 15,  # Seconds an idle connection stays open
+    'max_body_bytes': 1024 * 1024,  # Largest request body accepted
+    'gzip_min_bytes': 1024,  # Smaller responses are sent uncompressed
+    'max_page_size': 200,  # Most products returned by one listing request
+    'min_worker_uptime': 10,  # Workers exiting sooner are restarted after a doubling delay
+    'max_restart_delay': 30,  # Longest wait before restarting a worker that keeps failing
+    'trusted_proxies': (),  # Proxy addresses whose X-Forwarded-For header names the client
+    'throttle_peer_address': False  # Count failed logins per connecting address; only when clients connect directly
+}
+
+# Query Instrumentation Configuration
+INSTRUMENTATION_CONFIG = {
+    'enabled': True,  # Time and count every database statement
+    'slow_query_ms': 200,  # Statements slower than this are written to the slow-query log
+    'slow_log_path': None,  # File for the slow-query log; None prints it
+    'export_path': None  # JSON file the desktop client writes query statistics to on exit
+}
+
+# Benchmark Configuration
+BENCHMARK_CONFIG = {
+    'backend': 'sqlite',  # Embedded by default, so benchmarks need no database server
+    'databases': {'mysql': 'ecommerce_bench', 'sqlite': 'ecommerce_bench.db'},  # Throwaway databases per backend
+    'seconds': 10,  # Longest time spent timing one operation
+    'iterations': 1000,  # Most timed calls of one operation
+    'warmup': 5,  # Untimed calls first, to fill caches and indexes
+    'tolerance': 0.2  # Slowdown in p95 latency reported as a regression by --compare
+}
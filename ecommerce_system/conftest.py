@@ -0,0 +1,70 @@
+"""
+Shared pytest fixtures. Tests that touch the database run against a fresh,
+migrated SQLite database, so no database server is needed.
+"""
+import sqlite3
+import uuid
+import pytest
+from .config import CACHE_CONFIG, SECURITY_CONFIG, SQLITE_CONFIG
+from .dao import product_dao, user_dao
+from .db.db_connection import db
+from .db.migrate import MigrationRunner
+from .utils.cache import LRUCache
+from .utils.search_index import ProductSearchIndex
+from .utils.security import LoginThrottle
+
+
+def use_sqlite(monkeypatch, database):
+    """Connect the global db to an empty, migrated SQLite database until the generator is closed"""
+    monkeypatch.setitem(SQLITE_CONFIG, 'database', SQLITE_CONFIG['database'])
+    previous_backend = db.backend_name
+    db.use_backend('sqlite', database)
+    # Cached rows, the search index and failed login counts belong to the database they came from
+    monkeypatch.setattr(product_dao, 'product_cache', LRUCache(**CACHE_CONFIG['products']))
+    monkeypatch.setattr(user_dao, 'user_cache', LRUCache(**CACHE_CONFIG['users']))
+    monkeypatch.setattr(product_dao, 'product_index', ProductSearchIndex())
+    monkeypatch.setattr(user_dao, 'login_throttle', LoginThrottle(SECURITY_CONFIG['login_window_seconds']))
+    assert db.connect()
+    try:
+        MigrationRunner().upgrade()
+        yield db
+    finally:
+        db.disconnect()
+        db.use_backend(previous_backend)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """The global db, connected to a migrated SQLite file for one test"""
+    yield from use_sqlite(monkeypatch, str(tmp_path / "test.db"))
+
+
+@pytest.fixture
+def memory_database(monkeypatch):
+    """The global db, connected to a migrated in-memory SQLite database for one test.
+
+    The pooled connections share the database, which lasts until the last of
+    them is closed. Shared-cache connections fail rather than wait on each
+    other's locks, so this suits tests that use one connection at a time.
+    """
+    yield from use_sqlite(monkeypatch, f"file:test-{uuid.uuid4().hex}?mode=memory&cache=shared")
+
+
+@pytest.fixture
+def replica_path(database, tmp_path, monkeypatch):
+    """Give the global db a SQLite replica, starting as a copy of the primary; yields the replica's file.
+
+    The replica is checked once and then not again during the test. Write to
+    the file directly to tell replica reads from primary ones.
+    """
+    path = str(tmp_path / "replica.db")
+    source, copy = sqlite3.connect(SQLITE_CONFIG['database']), sqlite3.connect(path)
+    source.backup(copy)
+    source.close()
+    copy.close()
+    monkeypatch.setitem(database.replica_config, 'replicas', [{'database': path}])
+    monkeypatch.setitem(database.replica_config, 'lag_check_interval', 3600)
+    database.disconnect()
+    assert database.connect()
+    database.replicas._check_lag(database.replicas.replicas[0])
+    yield path
@@ -1,18 +1,7 @@
-from ..db.db_connection import db
+from ..db.db_connection import db, read_only
 
 
 class CategoryDAO:
-    def create_table(self):
-        """Create the categories table if it doesn't exist"""
-        query = """
-        CREATE TABLE IF NOT EXISTS categories (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            description TEXT
-        )
-        """
-        return db.execute_query(query)
-
     def create_category(self, name, description=None):
         """Create a new category"""
         query = """
@@ -28,6 +17,7 @@ class CategoryDAO:
         result = db.fetch_one(query, (category_id,))
         return result  # Return tuple (id, name, description)
 
+    @read_only
     def get_all_categories(self):
         """Get all categories"""
         query = "SELECT id, name, description FROM categories"
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+from ..db.db_connection import db
+from ..config import INVENTORY_CONFIG
+
+# Maximum number of products locked or updated in one statement
+BATCH_SIZE = 500
+
+
+class InventoryDAO:
+    def reserve_stock(self, cursor, order_items, user_id=None, prices=None):
+        """Atomically take stock for order items inside an open transaction.
+
+        Product rows are locked in ascending ID order so concurrent checkouts
+        cannot deadlock. Stock held in other users' active carts counts as
+        unavailable; the buyer's own holds are consumed. Returns a list of
+        shortfalls, one dict per product that cannot be fully supplied, in
+        which case no stock is taken. A prices dict is filled with the
+        {product_id: price} of the locked rows.
+        """
+        if any(item['quantity'] <= 0 for item in order_items):
+            raise ValueError("Order quantities must be positive")
+        quantities = {}
+        for item in order_items:
+            quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+        product_ids = sorted(quantities)
+
+        available = self._lock_available_stock(cursor, product_ids, user_id, prices)
+
+        shortfalls = []
+        for product_id in product_ids:
+            in_stock = available.get(product_id, 0)
+            if quantities[product_id] > in_stock:
+                shortfalls.append({
+                    'product_id': product_id,
+                    'requested': quantities[product_id],
+                    'available': max(in_stock, 0)
+                })
+        if shortfalls:
+            return shortfalls
+
+        # Rows are locked, but keep the stock guard so stock can never go negative
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            batch = product_ids[start:start + BATCH_SIZE]
+            query = f"""
+            UPDATE products
+            SET stock = stock - CASE id {" ".join(["WHEN %s THEN %s"] * len(batch))} END
+            WHERE id IN ({", ".join(["%s"] * len(batch))})
+            AND stock >= CASE id {" ".join(["WHEN %s THEN %s"] * len(batch))} END
+            """
+            cases = []
+            for product_id in batch:
+                cases.extend((product_id, quantities[product_id]))
+            cursor.execute(query, cases + batch + cases)
+            if cursor.rowcount != len(batch):
+                raise RuntimeError("Stock changed while product rows were locked")
+
+        # The buyer's cart holds have now been turned into an order
+        if user_id is not None:
+            self._delete_holds(cursor, user_id, product_ids)
+        return shortfalls
+
+    def hold_stock(self, user_id, product_id, quantity, minutes=None):
+        """Set aside stock for a user's cart until the hold expires"""
+        if quantity <= 0:
+            return False
+        minutes = INVENTORY_CONFIG['hold_minutes'] if minutes is None else minutes
+        expires_at = datetime.now() + timedelta(minutes=minutes)
+        try:
+            with db.transaction() as cursor:
+                available = self._lock_available_stock(cursor, [product_id], user_id)
+                if quantity > available.get(product_id, 0):
+                    return False
+
+                query = """
+                INSERT INTO stock_holds (user_id, product_id, quantity, expires_at)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE quantity = VALUES(quantity), expires_at = VALUES(expires_at)
+                """
+                cursor.execute(query, (user_id, product_id, quantity, expires_at))
+            return True
+        except Exception as e:
+            print(f"Error holding stock: {e}")
+            return False
+
+    def release_hold(self, user_id, product_id):
+        """Release a user's hold on a product"""
+        query = "DELETE FROM stock_holds WHERE user_id = %s AND product_id = %s"
+        return db.execute_query(query, (user_id, product_id))
+
+    def release_holds(self, user_id):
+        """Release all of a user's holds"""
+        query = "DELETE FROM stock_holds WHERE user_id = %s"
+        return db.execute_query(query, (user_id,))
+
+    def get_holds(self, user_id):
+        """Get a user's active holds"""
+        query = """
+        SELECT product_id, quantity, expires_at
+        FROM stock_holds
+        WHERE user_id = %s AND expires_at > %s
+        """
+        return db.fetch_all(query, (user_id, datetime.now()))  # [(product_id, quantity, expires_at), ...]
+
+    def get_available_stock(self, product_id, user_id=None):
+        """Get stock not held by other users' active carts"""
+        query = """
+        SELECT p.stock - COALESCE(SUM(h.quantity), 0)
+        FROM products p
+        LEFT JOIN stock_holds h
+            ON h.product_id = p.id AND h.expires_at > %s AND h.user_id <> %s
+        WHERE p.id = %s
+        GROUP BY p.id, p.stock
+        """
+        result = db.fetch_one(query, (datetime.now(), user_id or 0, product_id))
+        return max(int(result[0]), 0) if result else 0
+
+    def purge_expired_holds(self):
+        """Delete holds that have expired"""
+        query = "DELETE FROM stock_holds WHERE expires_at <= %s"
+        return db.execute_query(query, (datetime.now(),))
+
+    def _lock_available_stock(self, cursor, product_ids, user_id, prices=None):
+        """Lock product rows in ID order and return {product_id: available stock}"""
+        available = {}
+        now = datetime.now()
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            batch = product_ids[start:start + BATCH_SIZE]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"SELECT id, stock, price FROM products WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE",
+                batch
+            )
+            for product_id, stock, price in cursor.fetchall():
+                available[product_id] = stock
+                if prices is not None:
+                    prices[product_id] = price
+
+            # Stock set aside in other users' unexpired carts
+            cursor.execute(
+                f"""
+                SELECT product_id, SUM(quantity)
+                FROM stock_holds
+                WHERE product_id IN ({placeholders}) AND expires_at > %s AND user_id <> %s
+                GROUP BY product_id
+                """,
+                batch + [now, user_id or 0]
+            )
+            for product_id, held in cursor.fetchall():
+                available[product_id] -= int(held)
+        return available
+
+    def _delete_holds(self, cursor, user_id, product_ids):
+        """Delete a user's holds on the given products"""
+        for start in range(0, len(product_ids), BATCH_SIZE):
+            batch = product_ids[start:start + BATCH_SIZE]
+            query = f"DELETE FROM stock_holds WHERE user_id = %s AND product_id IN ({', '.join(['%s'] * len(batch))})"
+            cursor.execute(query, [user_id] + batch)
@@ -1,176 +1,282 @@
-from ..db.db_connection import db
+from ..db.db_connection import db, read_only
 from ..models.order import Order, OrderItem
-from datetime import datetime
+from .inventory_dao import InventoryDAO
+from .product_dao import ProductDAO
+from .sales_rollup_dao import SalesRollupDAO, SOLD_STATUSES
+from datetime import datetime, timedelta
+
+# Maximum number of rows sent in one multi-row statement
+BATCH_SIZE = 500
+
+# Default number of orders fetched per page
+PAGE_SIZE = 200
 
 
 class OrderDAO:
-    def create_tables(self):
-        """Create the orders and order_items tables if they don't exist"""
-        # Create orders table
-        orders_query = """
-        CREATE TABLE IF NOT EXISTS orders (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            user_id INT NOT NULL,
-            total_amount DECIMAL(10, 2) NOT NULL,
-            status ENUM('pending', 'paid', 'shipped', 'delivered') DEFAULT 'pending',
-            order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-        """
-        
-        # Create order_items table
-        order_items_query = """
-        CREATE TABLE IF NOT EXISTS order_items (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            order_id INT NOT NULL,
-            product_id INT NOT NULL,
-            quantity INT NOT NULL,
-            price DECIMAL(10, 2) NOT NULL,
-            FOREIGN KEY (order_id) REFERENCES orders(id) ON DELETE CASCADE,
-            FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
-        )
-        """
-        
-        success1 = db.execute_query(orders_query)
-        success2 = db.execute_query(order_items_query)
-        return success1 and success2
+    def __init__(self):
+        self.inventory_dao = InventoryDAO()
+        self.rollup_dao = SalesRollupDAO()
+        self.product_dao = ProductDAO()
 
-    def create_order(self, user_id, total_amount, order_items):
-        """Create a new order with its items"""
-        try:
-            # Start transaction
-            db.connection.start_transaction()
+    def create_order(self, user_id, total_amount, order_items, idempotency_key=None):
+        """Create a new order with its items in a single transaction"""
+        order_id, shortfalls = self.place_order(user_id, total_amount, order_items, idempotency_key)
+        for shortfall in shortfalls:
+            print(f"Insufficient stock for product {shortfall['product_id']}: "
+                  f"requested {shortfall['requested']}, available {shortfall['available']}")
+        return order_id
+
+    def place_order(self, user_id, total_amount, order_items, idempotency_key=None, reprice=False):
+        """Reserve stock and create an order, returning (order_id, shortfalls).
+
+        With an idempotency key, placing the order again with the same key
+        returns the order already placed instead of creating another one, so
+        a checkout whose outcome is unknown can simply be retried. With
+        reprice=True the given prices and total are ignored and the order is
+        charged the prices of the product rows locked to take the stock.
+        """
+        def place(cursor):
+            items, total = order_items, total_amount
+            if idempotency_key:
+                cursor.execute("SELECT id FROM orders WHERE user_id = %s AND idempotency_key = %s",
+                               (user_id, idempotency_key))
+                existing = cursor.fetchone()
+                if existing:
+                    return existing[0], [], False
+            
+            # Take the stock first; nothing is written if any line is short
+            prices = {} if reprice else None
+            shortfalls = self.inventory_dao.reserve_stock(cursor, order_items, user_id, prices)
+            if shortfalls:
+                return None, shortfalls, False
+            if reprice:
+                items = [{**item, 'price': prices[item['product_id']]} for item in order_items]
+                total = sum(item['price'] * item['quantity'] for item in items)
             
-            # Create the order
+            # Create the order, dated here so the sales rollup uses the same day
+            order_date = datetime.now().replace(microsecond=0)
             order_query = """
-            INSERT INTO orders (user_id, total_amount, status) 
-            VALUES (%s, %s, 'pending')
+            INSERT INTO orders (user_id, total_amount, status, order_date, idempotency_key) 
+            VALUES (%s, %s, 'pending', %s, %s)
             """
-            db.execute_query(order_query, (user_id, total_amount))
+            cursor.execute(order_query, (user_id, total, order_date, idempotency_key))
             
             # Get the newly created order ID
-            order_id = db.connection.insert_id()
+            order_id = cursor.lastrowid
             
-            # Create order items
-            for item in order_items:
-                item_query = """
-                INSERT INTO order_items (order_id, product_id, quantity, price) 
-                VALUES (%s, %s, %s, %s)
-                """
-                db.execute_query(item_query, (order_id, item['product_id'], 
-                                            item['quantity'], item['price']))
-                
-                # Update product stock
-                update_stock_query = """
-                UPDATE products SET stock = stock - %s WHERE id = %s
-                """
-                db.execute_query(update_stock_query, (item['quantity'], item['product_id']))
-            
-            # Commit transaction
-            db.connection.commit()
-            return order_id
+            # Create all order items with multi-row statements
+            self._insert_order_items(cursor, order_id, items)
+            self.rollup_dao.record_order(cursor, order_id, order_date, 'pending', total, items)
+            return order_id, [], True
+        
+        try:
+            # One transaction on a pooled connection, run again after a deadlock
+            order_id, shortfalls, placed = db.run_transaction(place)
+            if placed:
+                # Cached stock levels of the ordered products are now stale
+                self.product_dao.invalidate_cache(item['product_id'] for item in order_items)
+            return order_id, shortfalls
             
         except Exception as e:
-            # Rollback transaction on error
-            db.connection.rollback()
+            # The transaction has already been rolled back
+            if idempotency_key and db.backend.is_duplicate_key(e):
+                # A concurrent attempt with the same key committed first
+                order = self.get_order_by_idempotency_key(user_id, idempotency_key)
+                if order:
+                    return order.id, []
             print(f"Error creating order: {e}")
-            return None
+            return None, []
+
+    def get_order_by_idempotency_key(self, user_id, idempotency_key):
+        """Get the order a user placed with an idempotency key"""
+        query = f"SELECT {Order.COLUMNS} FROM orders WHERE user_id = %s AND idempotency_key = %s"
+        result = db.fetch_one(query, (user_id, idempotency_key))
+        
+        if result:
+            return Order.from_row(result)
+        return None
+
+    def _insert_order_items(self, cursor, order_id, order_items):
+        """Insert order items with multi-row INSERT statements"""
+        for start in range(0, len(order_items), BATCH_SIZE):
+            batch = order_items[start:start + BATCH_SIZE]
+            query = f"""
+            INSERT INTO order_items (order_id, product_id, quantity, price) 
+            VALUES {", ".join(["(%s, %s, %s, %s)"] * len(batch))}
+            """
+            params = []
+            for item in batch:
+                params.extend((order_id, item['product_id'], item['quantity'], item['price']))
+            cursor.execute(query, params)
 
     def get_order_by_id(self, order_id):
         """Get an order by ID"""
-        query = "SELECT id, user_id, total_amount, status, order_date FROM orders WHERE id = %s"
+        query = f"SELECT {Order.COLUMNS} FROM orders WHERE id = %s"
         result = db.fetch_one(query, (order_id,))
         
         if result:
-            return Order(
-                order_id=result[0],
-                user_id=result[1],
-                total_amount=result[2],
-                status=result[3],
-                order_date=result[4]
-            )
+            return Order.from_row(result)
         return None
 
-    def get_orders_by_user(self, user_id):
-        """Get all orders for a specific user"""
-        query = "SELECT id, user_id, total_amount, status, order_date FROM orders WHERE user_id = %s ORDER BY order_date DESC"
+    @read_only
+    def get_orders_by_user(self, user_id, raw=False):
+        """Get all orders for a specific user; with raw=True, as row tuples ordered like Order.COLUMNS"""
+        query = f"SELECT {Order.COLUMNS} FROM orders WHERE user_id = %s ORDER BY order_date DESC"
         results = db.fetch_all(query, (user_id,))
         
-        orders = []
-        for result in results:
-            orders.append(Order(
-                order_id=result[0],
-                user_id=result[1],
-                total_amount=result[2],
-                status=result[3],
-                order_date=result[4]
-            ))
-        return orders
-
-    def get_all_orders(self):
-        """Get all orders"""
-        query = "SELECT id, user_id, total_amount, status, order_date FROM orders ORDER BY order_date DESC"
-        results = db.fetch_all(query)
+        if raw:
+            return results
+        return [Order.from_row(result) for result in results]
+
+    @read_only
+    def iter_orders(self, status=None, start_date=None, end_date=None, user_id=None, raw=False):
+        """Yield matching orders, newest first, streaming rows instead of loading them all.
+
+        start_date and end_date are inclusive; a date covers its whole day.
+        """
+        where, params = self._order_filters(status, start_date, end_date, user_id)
+        query = f"SELECT {Order.COLUMNS} FROM orders {where} ORDER BY order_date DESC, id DESC"
+        for result in db.iter_query(query, params):
+            yield result if raw else Order.from_row(result)
+
+    @read_only
+    def get_orders_page(self, cursor=None, page_size=PAGE_SIZE, status=None, start_date=None,
+                        end_date=None, user_id=None):
+        """Get one page of matching orders, newest first, returning (orders, next_cursor).
+
+        The cursor is the (order_date, id) of the last order seen; next_cursor
+        is None on the last page.
+        """
+        where, params = self._order_filters(status, start_date, end_date, user_id, cursor)
+        query = f"""
+        SELECT {Order.COLUMNS} 
+        FROM orders {where} 
+        ORDER BY order_date DESC, id DESC 
+        LIMIT %s
+        """
+        results = db.fetch_all(query, params + [page_size + 1])
         
-        orders = []
-        for result in results:
-            orders.append(Order(
-                order_id=result[0],
-                user_id=result[1],
-                total_amount=result[2],
-                status=result[3],
-                order_date=result[4]
-            ))
-        return orders
+        orders = [Order.from_row(result) for result in results[:page_size]]
+        next_cursor = (orders[-1].order_date, orders[-1].id) if len(results) > page_size else None
+        return orders, next_cursor
+
+    def _order_filters(self, status, start_date, end_date, user_id, cursor=None):
+        """Build the WHERE clause and parameters for an order listing"""
+        conditions = []
+        params = []
+        if status:
+            conditions.append("status = %s")
+            params.append(status)
+        if user_id:
+            conditions.append("user_id = %s")
+            params.append(user_id)
+        if start_date:
+            conditions.append("order_date >= %s")
+            params.append(start_date)
+        if end_date:
+            if isinstance(end_date, datetime):
+                conditions.append("order_date <= %s")
+            else:
+                conditions.append("order_date < %s")
+                end_date += timedelta(days=1)
+            params.append(end_date)
+        if cursor is not None:
+            # Keyset: orders after the last one seen, in (order_date, id) descending order
+            last_date, last_id = cursor
+            conditions.append("(order_date < %s OR (order_date = %s AND id < %s))")
+            params.extend((last_date, last_date, last_id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
 
     def update_order_status(self, order_id, status):
-        """Update order status"""
-        query = "UPDATE orders SET status = %s WHERE id = %s"
-        return db.execute_query(query, (status, order_id))
+        """Update order status and move its totals in the sales rollups"""
+        def update(cursor):
+            cursor.execute(
+                "SELECT status, order_date, total_amount FROM orders WHERE id = %s FOR UPDATE",
+                (order_id,)
+            )
+            result = cursor.fetchone()
+            if not result:
+                return False
+            old_status, order_date, total_amount = result
+            if old_status == status:
+                return True
+            
+            cursor.execute("UPDATE orders SET status = %s WHERE id = %s", (status, order_id))
+            self.rollup_dao.move_order(cursor, order_id, order_date, total_amount, old_status, status)
+            return True
+        
+        try:
+            # The rollup rows are shared with checkouts, so a deadlock is retried
+            return db.run_transaction(update)
+        except Exception as e:
+            print(f"Error updating order status: {e}")
+            return False
 
     def get_order_items(self, order_id):
         """Get all items for a specific order"""
-        query = "SELECT id, order_id, product_id, quantity, price FROM order_items WHERE order_id = %s"
+        query = f"SELECT {OrderItem.COLUMNS} FROM order_items WHERE order_id = %s"
         results = db.fetch_all(query, (order_id,))
         
-        items = []
-        for result in results:
-            items.append(OrderItem(
-                item_id=result[0],
-                order_id=result[1],
-                product_id=result[2],
-                quantity=result[3],
-                price=result[4]
-            ))
-        return items
+        return [OrderItem.from_row(result) for result in results]
 
-    def get_sales_report(self):
-        """Get sales report data"""
+    def get_order_details(self, order_id, user_id=None):
+        """Get an order and its items with product names in one query, returning (order, items)"""
         query = """
+        SELECT o.id, o.user_id, o.total_amount, o.status, o.order_date,
+               oi.id, oi.product_id, oi.quantity, oi.price, p.name
+        FROM orders o
+        LEFT JOIN order_items oi ON oi.order_id = o.id
+        LEFT JOIN products p ON p.id = oi.product_id
+        WHERE o.id = %s
+        """
+        params = [order_id]
+        if user_id is not None:
+            # Customers may only see their own orders
+            query += " AND o.user_id = %s"
+            params.append(user_id)
+        results = db.fetch_all(query + " ORDER BY oi.id", params)
+        
+        if not results:
+            return None, []
+        
+        first = results[0]
+        order = Order.from_row(first[:5])
+        # Items are (oi.id, o.id, product_id, quantity, price, product name); NULL for an order without items
+        items = [OrderItem.from_row((result[5], result[0]) + result[6:])
+                 for result in results if result[5] is not None]
+        return order, items
+
+    @read_only
+    def get_sales_report(self):
+        """Get sales report data for the last 30 days with sales"""
+        query = f"""
         SELECT 
-            DATE(order_date) as date, 
-            COUNT(*) as orders_count, 
-            SUM(total_amount) as total_revenue
-        FROM orders 
-        WHERE status IN ('paid', 'shipped', 'delivered')
-        GROUP BY DATE(order_date)
+            sale_date as date, 
+            CAST(SUM(orders_count) AS SIGNED) as orders_count, 
+            SUM(revenue) as total_revenue
+        FROM sales_daily 
+        WHERE status IN ({", ".join(["%s"] * len(SOLD_STATUSES))})
+        GROUP BY sale_date
+        HAVING SUM(orders_count) > 0
         ORDER BY date DESC
         LIMIT 30
         """
-        return db.fetch_all(query)
+        return db.fetch_all(query, SOLD_STATUSES)
 
+    @read_only
     def get_top_selling_products(self):
         """Get top selling products"""
-        query = """
+        query = f"""
         SELECT 
             p.name,
-            SUM(oi.quantity) as total_sold
-        FROM order_items oi
-        JOIN products p ON oi.product_id = p.id
-        JOIN orders o ON oi.order_id = o.id
-        WHERE o.status IN ('paid', 'shipped', 'delivered')
+            SUM(s.quantity) as total_sold
+        FROM product_sales_daily s
+        JOIN products p ON s.product_id = p.id
+        WHERE s.status IN ({", ".join(["%s"] * len(SOLD_STATUSES))})
         GROUP BY p.id, p.name
+        HAVING SUM(s.quantity) > 0
         ORDER BY total_sold DESC
         LIMIT 10
         """
-        return db.fetch_all(query)
\ No newline at end of file
+        return db.fetch_all(query, SOLD_STATUSES)
@@ -1,25 +1,28 @@
-from ..db.db_connection import db
+import threading
+import time
+from ..db.db_connection import db, read_only
 from ..models.product import Product
+from ..utils.search_index import product_index
+from ..utils.cache import LRUCache
+from ..config import SEARCH_CONFIG, CACHE_CONFIG
 
+# Default number of products fetched per page
+PAGE_SIZE = 60
 
-class ProductDAO:
-    def create_table(self):
-        """Create the products table if it doesn't exist"""
-        query = """
-        CREATE TABLE IF NOT EXISTS products (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            category_id INT,
-            name VARCHAR(255) NOT NULL,
-            description TEXT,
-            price DECIMAL(10, 2) NOT NULL,
-            stock INT NOT NULL DEFAULT 0,
-            image VARCHAR(255),
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (category_id) REFERENCES categories(id) ON DELETE SET NULL
-        )
-        """
-        return db.execute_query(query)
+# Rows read per query while building the search index
+INDEX_BUILD_BATCH = 10000
+
+# Products written per multi-row statement by bulk_save_products
+BULK_BATCH_SIZE = 1000
+
+# Held while the search index is being built
+_index_lock = threading.Lock()
 
+# Product rows shared by every ProductDAO, keyed by ('id', product_id) or by listing page
+product_cache = LRUCache(**CACHE_CONFIG['products'])
+
+
+class ProductDAO:
     def create_product(self, product):
         """Create a new product"""
         query = """
@@ -28,82 +31,251 @@ class ProductDAO:
         """
         params = (product.category_id, product.name, product.description, 
                   product.price, product.stock, product.image)
-        return db.execute_query(query, params)
+        product_id = db.execute_insert(query, params)
+        if product_id is None:
+            return False
+        
+        product.id = product_id
+        self.invalidate_cache()
+        if product_index.built:
+            product_index.add(product.id, product.name, product.description, product.category_id)
+        return True
+
+    def bulk_save_products(self, products):
+        """Save products in multi-row batches, one transaction per batch.
+
+        Products with an ID update the existing row (or insert one with that
+        ID); products without one are inserted. Returns a list of
+        (position, error) for the products that could not be saved.
+        """
+        failures = []
+        for start in range(0, len(products), BULK_BATCH_SIZE):
+            batch = products[start:start + BULK_BATCH_SIZE]
+            try:
+                with db.transaction() as cursor:
+                    self._save_batch(cursor, batch)
+            except Exception:
+                # Retry one product at a time to find the rows the database rejects
+                for position, product in enumerate(batch, start):
+                    try:
+                        with db.transaction() as cursor:
+                            self._save_batch(cursor, [product])
+                    except Exception as e:
+                        failures.append((position, str(e)))
+        
+        if products:
+            self.invalidate_cache(product.id for product in products if product.id is not None)
+            product_index.mark_stale()
+        return failures
+
+    def _save_batch(self, cursor, products):
+        """Insert new products and upsert products with an ID using one statement each"""
+        new = [product for product in products if product.id is None]
+        existing = [product for product in products if product.id is not None]
+        if new:
+            query = f"""
+            INSERT INTO products (category_id, name, description, price, stock, image) 
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(new))}
+            """
+            params = []
+            for product in new:
+                params.extend((product.category_id, product.name, product.description,
+                               product.price, product.stock, product.image))
+            cursor.execute(query, params)
+        if existing:
+            query = f"""
+            INSERT INTO products (id, category_id, name, description, price, stock, image) 
+            VALUES {", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(existing))}
+            ON DUPLICATE KEY UPDATE category_id = VALUES(category_id), name = VALUES(name), 
+                                    description = VALUES(description), price = VALUES(price), 
+                                    stock = VALUES(stock), image = VALUES(image)
+            """
+            params = []
+            for product in existing:
+                params.extend((product.id, product.category_id, product.name, product.description,
+                               product.price, product.stock, product.image))
+            cursor.execute(query, params)
+
+    @read_only
+    def iter_products(self, batch_size=None):
+        """Yield every product in ID order, streaming batch_size rows per round trip"""
+        query = f"SELECT {Product.COLUMNS} FROM products ORDER BY id"
+        for result in db.iter_query(query, batch_size=batch_size):
+            yield Product.from_row(result)
 
     def get_product_by_id(self, product_id):
         """Get a product by ID"""
-        query = "SELECT id, category_id, name, description, price, stock, image, created_at FROM products WHERE id = %s"
-        result = db.fetch_one(query, (product_id,))
+        query = f"SELECT {Product.COLUMNS} FROM products WHERE id = %s"
+        result = self._cached(('id', product_id), lambda: db.fetch_one(query, (product_id,)))
         
         if result:
-            return Product(
-                product_id=result[0],
-                category_id=result[1],
-                name=result[2],
-                description=result[3],
-                price=result[4],
-                stock=result[5],
-                image=result[6],
-                created_at=result[7]
-            )
+            return Product.from_row(result)
         return None
 
-    def get_all_products(self):
-        """Get all products"""
-        query = "SELECT id, category_id, name, description, price, stock, image, created_at FROM products"
+    @read_only
+    def get_all_products(self, raw=False):
+        """Get all products; with raw=True, as row tuples ordered like Product.COLUMNS"""
+        # Not cached: one entry holding the whole table would defeat the cache's size bound
+        query = f"SELECT {Product.COLUMNS} FROM products"
         results = db.fetch_all(query)
         
-        products = []
-        for result in results:
-            products.append(Product(
-                product_id=result[0],
-                category_id=result[1],
-                name=result[2],
-                description=result[3],
-                price=result[4],
-                stock=result[5],
-                image=result[6],
-                created_at=result[7]
-            ))
-        return products
-
-    def get_products_by_category(self, category_id):
-        """Get products by category ID"""
-        query = "SELECT id, category_id, name, description, price, stock, image, created_at FROM products WHERE category_id = %s"
+        if raw:
+            return results
+        return [Product.from_row(result) for result in results]
+
+    @read_only
+    def get_products_by_category(self, category_id, raw=False):
+        """Get products by category ID; with raw=True, as row tuples ordered like Product.COLUMNS"""
+        query = f"SELECT {Product.COLUMNS} FROM products WHERE category_id = %s"
         results = db.fetch_all(query, (category_id,))
         
-        products = []
-        for result in results:
-            products.append(Product(
-                product_id=result[0],
-                category_id=result[1],
-                name=result[2],
-                description=result[3],
-                price=result[4],
-                stock=result[5],
-                image=result[6],
-                created_at=result[7]
-            ))
-        return products
+        if raw:
+            return results
+        return [Product.from_row(result) for result in results]
 
+    @read_only
     def get_products_by_name(self, name):
-        """Get products by name (partial match)"""
-        query = "SELECT id, category_id, name, description, price, stock, image, created_at FROM products WHERE name LIKE %s"
-        results = db.fetch_all(query, (f"%{name}%",))
+        """Get products matching a search term, best matches first"""
+        return self.search_products(name)
+
+    @read_only
+    def search_products(self, query, category_id=None, limit=None, offset=0):
+        """Search product names and descriptions, best matches first"""
+        self._ensure_search_index()
+        product_ids = product_index.search(query, category_id, limit, offset)
+        return self.get_products_by_ids(product_ids)
+
+    def get_search_facets(self, query):
+        """Get the number of search matches per category as {category_id: count}"""
+        self._ensure_search_index()
+        return product_index.facet_counts(query)
+
+    @read_only
+    def get_products_by_ids(self, product_ids):
+        """Get products by ID, in the order the IDs were given"""
+        rows = {}
+        missing = []
+        for product_id in product_ids:
+            result = product_cache.get(('id', product_id))
+            if result:
+                rows[product_id] = result
+            else:
+                missing.append(product_id)
+        
+        generation = product_cache.generation
+        for start in range(0, len(missing), 500):
+            batch = missing[start:start + 500]
+            query = f"""
+            SELECT {Product.COLUMNS} 
+            FROM products 
+            WHERE id IN ({", ".join(["%s"] * len(batch))})
+            """
+            for result in db.fetch_all(query, batch):
+                rows[result[0]] = result
+                product_cache.set(('id', result[0]), result, generation=generation)
+        
+        return [Product.from_row(rows[product_id]) for product_id in product_ids if product_id in rows]
+
+    def get_cache_stats(self):
+        """Get product cache size and hit/miss/eviction counters"""
+        return product_cache.stats()
+
+    def invalidate_cache(self, product_ids=()):
+        """Drop cached listings and the given products after a write"""
+        product_ids = set(product_ids)
+        product_cache.invalidate_where(lambda key: key[0] != 'id' or key[1] in product_ids)
+
+    def _cached(self, key, load):
+        """Return a cached result, loading and caching it on a miss"""
+        result = product_cache.get(key)
+        if result is None:
+            generation = product_cache.generation
+            result = load()
+            # Empty results are not cached since the DAO returns them on errors too
+            if result:
+                product_cache.set(key, result, generation=generation)
+        return result
+
+    def _ensure_search_index(self):
+        """Build the search index on first use and refresh it in the background once stale"""
+        if not product_index.built:
+            with _index_lock:
+                if not product_index.built:
+                    product_index.build(self._iter_search_rows())
+            return
+        
+        age = time.monotonic() - product_index.built_at
+        stale = product_index.stale or age > SEARCH_CONFIG['rebuild_seconds']
+        if stale and _index_lock.acquire(blocking=False):
+            def rebuild():
+                try:
+                    product_index.build(self._iter_search_rows())
+                finally:
+                    _index_lock.release()
+            threading.Thread(target=rebuild, daemon=True).start()
+
+    def _iter_search_rows(self):
+        """Yield (id, name, description, category_id) for every product in batches"""
+        last_id = 0
+        while True:
+            query = """
+            SELECT id, name, description, category_id 
+            FROM products 
+            WHERE id > %s 
+            ORDER BY id 
+            LIMIT %s
+            """
+            results = db.fetch_all(query, (last_id, INDEX_BUILD_BATCH))
+            yield from results
+            if len(results) < INDEX_BUILD_BATCH:
+                return
+            last_id = results[-1][0]
+
+    @read_only
+    def get_all_products_page(self, cursor=None, page_size=PAGE_SIZE):
+        """Get one page of all products, returning (products, next_cursor)"""
+        return self._get_page("", (), cursor, page_size)
+
+    @read_only
+    def get_products_by_category_page(self, category_id, cursor=None, page_size=PAGE_SIZE):
+        """Get one page of products in a category, returning (products, next_cursor)"""
+        return self._get_page("category_id = %s", (category_id,), cursor, page_size)
+
+    @read_only
+    def get_products_by_name_page(self, name, cursor=None, page_size=PAGE_SIZE, category_id=None):
+        """Get one page of search results, returning (products, next_cursor)"""
+        # Results are ranked, so the cursor is the number of results already seen
+        offset = int(cursor or 0)
+        self._ensure_search_index()
+        product_ids = product_index.search(name, category_id, page_size + 1, offset)
+        products = self.get_products_by_ids(product_ids[:page_size])
+        next_cursor = offset + page_size if len(product_ids) > page_size else None
+        return products, next_cursor
+
+    def _get_page(self, condition, params, cursor, page_size):
+        """Fetch products after the keyset cursor (the last product ID seen) in ID order.
+
+        One extra row is requested to find out whether another page exists;
+        next_cursor is None on the last page.
+        """
+        conditions = [condition] if condition else []
+        params = list(params)
+        if cursor is not None:
+            conditions.append("id > %s")
+            params.append(int(cursor))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+        SELECT {Product.COLUMNS} 
+        FROM products {where} 
+        ORDER BY id 
+        LIMIT %s
+        """
+        results = self._cached(('page', condition, tuple(params), page_size),
+                               lambda: tuple(db.fetch_all(query, params + [page_size + 1])))
         
-        products = []
-        for result in results:
-            products.append(Product(
-                product_id=result[0],
-                category_id=result[1],
-                name=result[2],
-                description=result[3],
-                price=result[4],
-                stock=result[5],
-                image=result[6],
-                created_at=result[7]
-            ))
-        return products
+        products = [Product.from_row(result) for result in results[:page_size]]
+        next_cursor = products[-1].id if len(results) > page_size else None
+        return products, next_cursor
 
     def update_product(self, product):
         """Update a product"""
@@ -114,14 +286,24 @@ class ProductDAO:
         """
         params = (product.category_id, product.name, product.description, 
                   product.price, product.stock, product.image, product.id)
-        return db.execute_query(query, params)
+        success = db.execute_query(query, params)
+        self.invalidate_cache([product.id])
+        if success and product_index.built:
+            product_index.add(product.id, product.name, product.description, product.category_id)
+        return success
 
     def delete_product(self, product_id):
         """Delete a product"""
         query = "DELETE FROM products WHERE id = %s"
-        return db.execute_query(query, (product_id,))
+        success = db.execute_query(query, (product_id,))
+        self.invalidate_cache([product_id])
+        if success:
+            product_index.remove(product_id)
+        return success
 
     def update_stock(self, product_id, new_stock):
         """Update product stock"""
         query = "UPDATE products SET stock = %s WHERE id = %s"
-        return db.execute_query(query, (new_stock, product_id))
\ No newline at end of file
+        success = db.execute_query(query, (new_stock, product_id))
+        self.invalidate_cache([product_id])
+        return success
@@ -0,0 +1,138 @@
+"""
+Pre-aggregated daily sales, kept up to date by OrderDAO.
+
+To rebuild the rollups from the full order history, run from the repository root:
+
+    python -m ecommerce_system.dao.sales_rollup_dao rebuild
+"""
+import argparse
+import sys
+from ..db.db_connection import db, read_only
+
+# Maximum number of rows sent in one multi-row statement
+BATCH_SIZE = 500
+
+# Order statuses that count as sales in reports
+SOLD_STATUSES = ('paid', 'shipped', 'delivered')
+
+# Rows each day's sales_daily totals are spread over, chosen by order ID, so
+# concurrent checkouts update different rows; reports sum over the shards
+SHARDS = 16
+
+
+class SalesRollupDAO:
+    def record_order(self, cursor, order_id, order_date, status, total_amount, order_items):
+        """Add a new order to the rollups inside the order's transaction"""
+        lines = {}
+        for item in order_items:
+            quantity, revenue = lines.get(item['product_id'], (0, 0))
+            lines[item['product_id']] = (quantity + item['quantity'],
+                                         revenue + item['quantity'] * item['price'])
+        self._add(cursor, order_id, order_date, status, 1, total_amount,
+                  [(product_id, quantity, revenue) for product_id, (quantity, revenue) in lines.items()])
+
+    def move_order(self, cursor, order_id, order_date, total_amount, old_status, new_status):
+        """Move an order's totals from its old status to its new one inside a transaction"""
+        cursor.execute("""
+        SELECT product_id, SUM(quantity), SUM(quantity * price)
+        FROM order_items
+        WHERE order_id = %s
+        GROUP BY product_id
+        """, (order_id,))
+        lines = cursor.fetchall()
+        self._add(cursor, order_id, order_date, old_status, -1, -total_amount,
+                  [(product_id, -quantity, -revenue) for product_id, quantity, revenue in lines])
+        self._add(cursor, order_id, order_date, new_status, 1, total_amount, lines)
+
+    def rebuild(self):
+        """Recompute every rollup row from the orders and order_items tables"""
+        try:
+            with db.transaction() as cursor:
+                cursor.execute("DELETE FROM sales_daily")
+                cursor.execute("DELETE FROM product_sales_daily")
+                cursor.execute("""
+                INSERT INTO sales_daily (sale_date, status, orders_count, revenue)
+                SELECT DATE(order_date), status, COUNT(*), SUM(total_amount)
+                FROM orders
+                GROUP BY DATE(order_date), status
+                """)
+                cursor.execute("""
+                INSERT INTO product_sales_daily (sale_date, product_id, status, quantity, revenue)
+                SELECT DATE(o.order_date), oi.product_id, o.status, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+                FROM order_items oi
+                JOIN orders o ON oi.order_id = o.id
+                GROUP BY DATE(o.order_date), oi.product_id, o.status
+                """)
+            return True
+        except Exception as e:
+            print(f"Error rebuilding sales rollups: {e}")
+            return False
+
+    @read_only
+    def get_sales_by_status(self):
+        """Get order count and revenue per status"""
+        query = """
+        SELECT status, SUM(orders_count), SUM(revenue)
+        FROM sales_daily
+        GROUP BY status
+        """
+        return db.fetch_all(query)  # [(status, orders_count, revenue), ...]
+
+    @read_only
+    def get_sales_by_category(self):
+        """Get units sold and revenue per category"""
+        query = f"""
+        SELECT c.name, SUM(s.quantity) AS total_sold, SUM(s.revenue) AS total_revenue
+        FROM product_sales_daily s
+        JOIN products p ON s.product_id = p.id
+        LEFT JOIN categories c ON p.category_id = c.id
+        WHERE s.status IN ({", ".join(["%s"] * len(SOLD_STATUSES))})
+        GROUP BY c.id, c.name
+        ORDER BY total_revenue DESC
+        """
+        return db.fetch_all(query, SOLD_STATUSES)  # [(category_name or None, total_sold, total_revenue), ...]
+
+    def _add(self, cursor, order_id, order_date, status, orders_count, revenue, product_lines):
+        """Add (or subtract, with negative values) an order's totals to one day and status"""
+        sale_date = order_date.date()
+        cursor.execute("""
+        INSERT INTO sales_daily (sale_date, status, shard, orders_count, revenue)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE orders_count = orders_count + VALUES(orders_count),
+                                revenue = revenue + VALUES(revenue)
+        """, (sale_date, status, order_id % SHARDS, orders_count, revenue))
+
+        # Rows are upserted in product ID order so orders sharing products cannot deadlock
+        product_lines = sorted(product_lines, key=lambda line: line[0])
+        for start in range(0, len(product_lines), BATCH_SIZE):
+            batch = product_lines[start:start + BATCH_SIZE]
+            query = f"""
+            INSERT INTO product_sales_daily (sale_date, product_id, status, quantity, revenue)
+            VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))}
+            ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity),
+                                    revenue = revenue + VALUES(revenue)
+            """
+            params = []
+            for product_id, quantity, line_revenue in batch:
+                params.extend((sale_date, product_id, status, quantity, line_revenue))
+            cursor.execute(query, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the daily sales rollup tables")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    if not db.connect():
+        return 1
+    try:
+        if not SalesRollupDAO().rebuild():
+            return 1
+        print("Sales rollups rebuilt")
+        return 0
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Login sessions for the GUI and for headless front ends.
+
+create_session hands out a random token once; only its SHA-256 hash is
+stored, so a copy of the sessions table cannot be used to sign in. The
+signed-in user is cached per token, so checking a session normally costs
+no query at all.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from ..db.db_connection import db
+from ..models.user import User
+from ..utils.cache import LRUCache
+from ..config import SESSION_CONFIG
+
+# (user without password, expires_at) by token hash, shared by every SessionDAO
+session_cache = LRUCache(SESSION_CONFIG['cache_size'], SESSION_CONFIG['cache_ttl'])
+
+
+def hash_token(token):
+    """Get the value stored for a session token"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class SessionDAO:
+    def create_session(self, user):
+        """Start a session for an authenticated user and return its token, or None on failure"""
+        token = secrets.token_urlsafe(32)
+        token_hash = hash_token(token)
+        created_at = datetime.now().replace(microsecond=0)
+        expires_at = created_at + timedelta(minutes=SESSION_CONFIG['ttl_minutes'])
+        query = """
+        INSERT INTO sessions (token_hash, user_id, created_at, expires_at) 
+        VALUES (%s, %s, %s, %s)
+        """
+        if not db.execute_query(query, (token_hash, user.id, created_at, expires_at)):
+            return None
+        
+        principal = User(user_id=user.id, name=user.name, email=user.email, password=None,
+                         role=user.role, created_at=user.created_at)
+        session_cache.set(token_hash, (principal, expires_at))
+        return token
+
+    def get_session_user(self, token):
+        """Get the user a session token belongs to, or None if it is unknown, expired or revoked.
+
+        The returned User is shared with other lookups of the same session and
+        must not be modified.
+        """
+        if not token:
+            return None
+        token_hash = hash_token(token)
+        entry = session_cache.get(token_hash)
+        if entry is None:
+            generation = session_cache.generation
+            query = """
+            SELECT u.id, u.name, u.email, u.role, u.created_at, s.expires_at 
+            FROM sessions s 
+            JOIN users u ON u.id = s.user_id 
+            WHERE s.token_hash = %s
+            """
+            result = db.fetch_one(query, (token_hash,))
+            if not result:
+                return None
+            principal = User(user_id=result[0], name=result[1], email=result[2], password=None,
+                             role=result[3], created_at=result[4])
+            entry = (principal, result[5])
+            session_cache.set(token_hash, entry, generation=generation)
+        
+        user, expires_at = entry
+        if expires_at <= datetime.now():
+            session_cache.invalidate(token_hash)
+            return None
+        return user
+
+    def revoke_session(self, token):
+        """End one session, e.g. on logout"""
+        token_hash = hash_token(token)
+        session_cache.invalidate(token_hash)
+        return db.execute_query("DELETE FROM sessions WHERE token_hash = %s", (token_hash,))
+
+    def revoke_user_sessions(self, user_id):
+        """End every session of a user, e.g. after a role or password change"""
+        success = db.execute_query("DELETE FROM sessions WHERE user_id = %s", (user_id,))
+        self.forget_user(user_id)
+        return success
+
+    def forget_user(self, user_id):
+        """Drop a user's cached sessions so the next lookup re-reads the user"""
+        session_cache.invalidate_values(lambda entry: entry[0].id == user_id)
+
+    def purge_expired_sessions(self):
+        """Delete sessions that have expired"""
+        query = "DELETE FROM sessions WHERE expires_at <= %s"
+        return db.execute_query(query, (datetime.now().replace(microsecond=0),))
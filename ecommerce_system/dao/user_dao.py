@@ -1,22 +1,23 @@
-from ..db.db_connection import db
+from ..db.db_connection import db, read_only
 from ..models.user import User
-from ..utils.security import hash_password, verify_password
+from ..utils.cache import LRUCache
+from ..utils.security import hash_password, verify_password, needs_rehash, login_throttle
+from ..config import CACHE_CONFIG, SECURITY_CONFIG
+from .session_dao import SessionDAO
+
+# Default number of users fetched per page
+PAGE_SIZE = 200
+
+# A user's columns in User.COLUMNS order, with NULL for the password hash
+PRINCIPAL_COLUMNS = "id, name, email, NULL, role, created_at"
+
+# Users without their password hashes, shared by every UserDAO, keyed by ('id', user_id) or ('email', email)
+user_cache = LRUCache(**CACHE_CONFIG['users'])
 
 
 class UserDAO:
-    def create_table(self):
-        """Create the users table if it doesn't exist"""
-        query = """
-        CREATE TABLE IF NOT EXISTS users (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            name VARCHAR(255) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            password VARCHAR(255) NOT NULL,
-            role ENUM('admin', 'customer') DEFAULT 'customer',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """
-        return db.execute_query(query)
+    def __init__(self):
+        self.session_dao = SessionDAO()
 
     def create_user(self, user):
         """Create a new user"""
@@ -31,80 +32,148 @@ class UserDAO:
         return db.execute_query(query, params)
 
     def get_user_by_email(self, email):
-        """Get a user by email"""
-        query = "SELECT id, name, email, password, role, created_at FROM users WHERE email = %s"
-        result = db.fetch_one(query, (email,))
+        """Get a user by email, without the password hash"""
+        query = f"SELECT {PRINCIPAL_COLUMNS} FROM users WHERE email = %s"
+        result = self._cached(('email', email), lambda: db.fetch_one(query, (email,)))
         
         if result:
-            return User(
-                user_id=result[0],
-                name=result[1],
-                email=result[2],
-                password=result[3],
-                role=result[4],
-                created_at=result[5]
-            )
+            return User.from_row(result)
         return None
 
     def get_user_by_id(self, user_id):
-        """Get a user by ID"""
-        query = "SELECT id, name, email, password, role, created_at FROM users WHERE id = %s"
-        result = db.fetch_one(query, (user_id,))
+        """Get a user by ID, without the password hash"""
+        query = f"SELECT {PRINCIPAL_COLUMNS} FROM users WHERE id = %s"
+        result = self._cached(('id', user_id), lambda: db.fetch_one(query, (user_id,)))
         
         if result:
-            return User(
-                user_id=result[0],
-                name=result[1],
-                email=result[2],
-                password=result[3],
-                role=result[4],
-                created_at=result[5]
-            )
+            return User.from_row(result)
         return None
 
-    def get_all_users(self):
-        """Get all users"""
-        query = "SELECT id, name, email, password, role, created_at FROM users"
+    def forget_user(self, user_id):
+        """Drop a user's cached rows and sessions after a write"""
+        user_cache.invalidate_values(lambda row: row[0] == user_id)
+        self.session_dao.forget_user(user_id)
+
+    def _cached(self, key, load):
+        """Return a cached user row, loading and caching it on a miss"""
+        result = user_cache.get(key)
+        if result is None:
+            generation = user_cache.generation
+            result = load()
+            # Missing users are not cached, so a new account can sign in straight away
+            if result:
+                user_cache.set(key, result, generation=generation)
+        return result
+
+    @read_only
+    def get_all_users(self, raw=False):
+        """Get all users; with raw=True, as row tuples ordered like User.COLUMNS"""
+        query = f"SELECT {User.COLUMNS} FROM users"
         results = db.fetch_all(query)
         
-        users = []
-        for result in results:
-            users.append(User(
-                user_id=result[0],
-                name=result[1],
-                email=result[2],
-                password=result[3],
-                role=result[4],
-                created_at=result[5]
-            ))
-        return users
+        if raw:
+            return results
+        return [User.from_row(result) for result in results]
+
+    @read_only
+    def iter_users(self, role=None, search=None, raw=False):
+        """Yield matching users in ID order, streaming rows instead of loading them all"""
+        where, params = self._user_filters(role, search)
+        query = f"SELECT {User.COLUMNS} FROM users {where} ORDER BY id"
+        for result in db.iter_query(query, params):
+            yield result if raw else User.from_row(result)
+
+    @read_only
+    def get_users_page(self, cursor=None, page_size=PAGE_SIZE, role=None, search=None):
+        """Get one page of matching users in ID order, returning (users, next_cursor)"""
+        where, params = self._user_filters(role, search, cursor)
+        query = f"SELECT {User.COLUMNS} FROM users {where} ORDER BY id LIMIT %s"
+        results = db.fetch_all(query, params + [page_size + 1])
+        
+        users = [User.from_row(result) for result in results[:page_size]]
+        next_cursor = users[-1].id if len(results) > page_size else None
+        return users, next_cursor
+
+    def _user_filters(self, role, search, cursor=None):
+        """Build the WHERE clause and parameters for a user listing; search matches name or email"""
+        conditions = []
+        params = []
+        if role:
+            conditions.append("role = %s")
+            params.append(role)
+        if search:
+            conditions.append("(name LIKE %s OR email LIKE %s)")
+            pattern = f"%{search}%"
+            params.extend((pattern, pattern))
+        if cursor is not None:
+            conditions.append("id > %s")
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
 
     def update_user(self, user):
-        """Update a user"""
+        """Update a user; a role change signs the user out everywhere"""
+        current = db.fetch_one("SELECT role FROM users WHERE id = %s", (user.id,))
         query = """
         UPDATE users 
         SET name = %s, email = %s, role = %s 
         WHERE id = %s
         """
         params = (user.name, user.email, user.role, user.id)
-        return db.execute_query(query, params)
+        success = db.execute_query(query, params)
+        self.forget_user(user.id)
+        if success and current and current[0] != user.role:
+            self.session_dao.revoke_user_sessions(user.id)
+        return success
 
     def delete_user(self, user_id):
-        """Delete a user"""
+        """Delete a user; their sessions are deleted with them"""
         query = "DELETE FROM users WHERE id = %s"
-        return db.execute_query(query, (user_id,))
-
-    def authenticate_user(self, email, password):
-        """Authenticate a user by email and password"""
-        user = self.get_user_by_email(email)
-        if user and verify_password(password, user.password):
-            # Create a new user object without the password for security
-            return User(
-                user_id=user.id,
-                name=user.name,
-                email=user.email,
-                password=None,  # Don't return the password
-                role=user.role,
-                created_at=user.created_at
-            )
-        return None
\ No newline at end of file
+        success = db.execute_query(query, (user_id,))
+        self.forget_user(user_id)
+        return success
+
+    def authenticate_user(self, email, password, source=None):
+        """Authenticate a user by email and password.
+
+        source identifies the client (e.g. its address) for throttling. Raises
+        LoginThrottledError while the account or source has too many recent
+        failures.
+        """
+        account_key = ('account', email.lower())
+        limits = [(account_key, SECURITY_CONFIG['max_failures_per_account'])]
+        if source is not None:
+            limits.append((('source', source), SECURITY_CONFIG['max_failures_per_source']))
+        # Counted as a failure until the password checks out
+        attempt = login_throttle.begin(limits)
+        
+        # Read uncached, so a password change or deletion made by another process applies at once
+        query = f"SELECT {User.COLUMNS} FROM users WHERE email = %s"
+        result = db.fetch_one(query, (email,))
+        user = User.from_row(result) if result else None
+        if not user or not verify_password(password, user.password):
+            return None
+        
+        login_throttle.succeeded([key for key, _ in limits], attempt)
+        login_throttle.reset(account_key)
+        if needs_rehash(user.password):
+            # The configured cost changed since this hash was made; upgrade it while we have the password
+            self.update_password(user.id, password, revoke_sessions=False)
+        
+        # Create a new user object without the password for security
+        return User(
+            user_id=user.id,
+            name=user.name,
+            email=user.email,
+            password=None,  # Don't return the password
+            role=user.role,
+            created_at=user.created_at
+        )
+
+    def update_password(self, user_id, password, revoke_sessions=True):
+        """Hash and store a new password for a user, signing them out everywhere by default"""
+        query = "UPDATE users SET password = %s WHERE id = %s"
+        success = db.execute_query(query, (hash_password(password), user_id))
+        if success and revoke_sessions:
+            self.session_dao.revoke_user_sessions(user_id)
+        return success
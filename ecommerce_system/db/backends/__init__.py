@@ -0,0 +1,39 @@
+"""
+Database drivers behind DatabaseConnection, selected with DB_BACKEND in config.py.
+
+A backend module provides:
+
+    Error                       the driver's base exception class
+    CONFIG                      its settings dict from config.py
+    describe(config=None)       a short description of the database, for messages
+    connect(config=None)        open a connection with the mysql.connector interface the
+                                DAOs use: cursor(buffered=True, prepared=False), commit(),
+                                rollback(), start_transaction(), in_transaction,
+                                is_connected(), close()
+    create_database(name)       create a database if it doesn't exist
+    is_connection_lost(error)   whether an error means the connection was dropped
+    is_missing_table(error)     whether an error means a table doesn't exist
+    is_retryable(error)         whether a transaction that failed with an error can run again,
+                                e.g. after a deadlock or lock wait timeout
+    is_duplicate_key(error)     whether an error is a unique key violation
+    replication_lag(connection) seconds a replica is behind the primary, or None if unknown
+
+describe() and connect() use CONFIG unless given another settings dict, such
+as a read replica's.
+
+The DAOs are written in MySQL's dialect; backends for other engines
+translate statements as they run them.
+"""
+import importlib
+
+BACKENDS = {
+    'mysql': '.mysql',
+    'sqlite': '.sqlite',
+}
+
+
+def load_backend(name):
+    """Import a backend module by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    return importlib.import_module(BACKENDS[name], __package__)
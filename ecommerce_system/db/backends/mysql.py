@@ -0,0 +1,73 @@
+"""MySQL/MariaDB backend using mysql-connector-python"""
+import mysql.connector
+from mysql.connector import Error, errorcode
+from ...config import DB_CONFIG
+
+CONFIG = DB_CONFIG
+
+# Errors raised when the server dropped the connection under us
+CONNECTION_LOST_ERRORS = (
+    errorcode.CR_SERVER_GONE_ERROR,
+    errorcode.CR_SERVER_LOST,
+    errorcode.CR_SERVER_LOST_EXTENDED,
+)
+
+# Errors after which the whole transaction can safely run again
+RETRYABLE_ERRORS = (
+    errorcode.ER_LOCK_DEADLOCK,
+    errorcode.ER_LOCK_WAIT_TIMEOUT,
+)
+
+
+def describe(config=None):
+    config = config or CONFIG
+    return f"MySQL database {config['database']} on {config['host']}"
+
+
+def connect(config=None):
+    return mysql.connector.connect(**(config or CONFIG))
+
+
+def create_database(name):
+    """Create a database on the configured server if it doesn't exist"""
+    server_config = {key: value for key, value in CONFIG.items() if key != 'database'}
+    connection = mysql.connector.connect(**server_config)
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{name}`")
+        cursor.close()
+    finally:
+        connection.close()
+
+
+def is_connection_lost(error):
+    return getattr(error, 'errno', None) in CONNECTION_LOST_ERRORS
+
+
+def is_missing_table(error):
+    return getattr(error, 'errno', None) == errorcode.ER_NO_SUCH_TABLE
+
+
+def is_retryable(error):
+    return getattr(error, 'errno', None) in RETRYABLE_ERRORS
+
+
+def is_duplicate_key(error):
+    return getattr(error, 'errno', None) == errorcode.ER_DUP_ENTRY
+
+
+def replication_lag(connection):
+    """Seconds a replica is behind its source, or None when it isn't replicating"""
+    cursor = connection.cursor(buffered=True, dictionary=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Error:
+            cursor.execute("SHOW SLAVE STATUS")  # Servers older than MySQL 8.0.22
+        status = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not status:
+        return None
+    lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+    return None if lag is None else float(lag)
@@ -0,0 +1,258 @@
+"""
+Embedded SQLite backend, for deployments without a database server and for
+fast local benchmarks.
+
+Statements are written in MySQL's dialect and translated on the fly:
+placeholders, upserts, AUTO_INCREMENT, ENUM columns and inline index
+definitions. Translations are cached by SQL text, so each statement is
+translated once and SQLite's own statement cache reuses the prepared
+statement. Connections run in WAL mode so readers never block the writer,
+and transactions take the write lock up front (BEGIN IMMEDIATE), which
+serializes them the way the DAOs' SELECT ... FOR UPDATE locks would.
+"""
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from ...config import SQLITE_CONFIG
+
+CONFIG = SQLITE_CONFIG
+Error = sqlite3.Error
+
+# Every DECIMAL column in the schema holds money with two decimal places
+CENT = Decimal("0.01")
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(CENT))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+_QUOTED_OR_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|%s|%%")
+_CREATE_TABLE = re.compile(r"^CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\((.*)\)$", re.IGNORECASE | re.DOTALL)
+_INLINE_INDEX = re.compile(r"^(UNIQUE\s+)?(?:KEY|INDEX)\s+(\w+)\s*(\(.*\))$", re.IGNORECASE | re.DOTALL)
+_UPSERT = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+_REWRITES = (
+    (re.compile(r"\bINT(?:EGER)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE),
+     "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bENUM\s*\([^)]*\)", re.IGNORECASE), "TEXT"),
+    # MySQL's CURRENT_TIMESTAMP is local time; SQLite's is UTC
+    (re.compile(r"\bDEFAULT\s+CURRENT_TIMESTAMP\b", re.IGNORECASE), "DEFAULT (datetime('now', 'localtime'))"),
+    (re.compile(r"\bAS\s+SIGNED\b", re.IGNORECASE), "AS INTEGER"),
+    # Transactions already hold the write lock
+    (re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE), ""),
+    (re.compile(r"^DROP\s+INDEX\s+(\w+)\s+ON\s+\w+$", re.IGNORECASE), r"DROP INDEX \1"),
+)
+
+
+def _placeholders(match):
+    token = match.group(0)
+    if token == "%s":
+        return "?"
+    if token == "%%":
+        return "%"
+    if token.startswith("`"):
+        return '"' + token[1:-1] + '"'
+    return token  # A string literal or quoted name, left alone
+
+
+def _split_definitions(body):
+    """Split a CREATE TABLE body at its top-level commas"""
+    parts, depth, start = [], 0, 0
+    for position, char in enumerate(body):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(body[start:position].strip())
+            start = position + 1
+    parts.append(body[start:].strip())
+    return [part for part in parts if part]
+
+
+def _translate_create_table(match):
+    """Move inline KEY definitions, which SQLite lacks, into CREATE INDEX statements"""
+    if_not_exists, table, body = match.groups()
+    definitions, indexes = [], []
+    for definition in _split_definitions(body):
+        index = _INLINE_INDEX.match(definition)
+        if index is None:
+            definitions.append(definition)
+        elif index.group(1):
+            definitions.append(f"UNIQUE {index.group(3)}")
+        else:
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {index.group(2)} ON {table} {index.group(3)}")
+    create = f"CREATE TABLE {if_not_exists or ''}{table} ({', '.join(definitions)})"
+    return (create, *indexes)
+
+
+@lru_cache(maxsize=CONFIG['statement_cache_size'])
+def translate(query):
+    """Translate a MySQL statement to SQLite, returning the statement and any follow-up DDL"""
+    query = _QUOTED_OR_PLACEHOLDER.sub(_placeholders, query.strip())
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+
+    upsert = _UPSERT.search(query)
+    if upsert:
+        # VALUES(column) in the update list refers to the row that failed to insert
+        updates = _VALUES_FUNCTION.sub(r"excluded.\1", query[upsert.end():])
+        query = f"{query[:upsert.start()]}ON CONFLICT DO UPDATE SET{updates}"
+
+    create = _CREATE_TABLE.match(query)
+    if create:
+        return _translate_create_table(create)
+    return (query,)
+
+
+class SQLiteCursor:
+    """A cursor with mysql.connector's interface.
+
+    Buffered cursors read the result rows when the statement runs, so rowcount
+    is known for SELECTs; unbuffered ones read rows as they are fetched.
+    """
+
+    def __init__(self, connection, buffered=True):
+        self._cursor = connection.cursor()
+        self.buffered = buffered
+        self._rows = []
+        self._position = 0
+        self.rowcount = -1
+
+    def execute(self, query, params=None):
+        statement, *follow_up = translate(query)
+        self._cursor.execute(statement, params or ())
+        for extra in follow_up:
+            self._cursor.execute(extra)
+        self._rows = []
+        self._position = 0
+        if self._cursor.description is None:
+            self.rowcount = self._cursor.rowcount
+        elif self.buffered:
+            self._rows = self._cursor.fetchall()
+            self.rowcount = len(self._rows)
+        else:
+            self.rowcount = -1
+
+    def fetchone(self):
+        if not self.buffered:
+            return self._cursor.fetchone()
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    def fetchmany(self, size=1):
+        if not self.buffered:
+            return self._cursor.fetchmany(size)
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self):
+        if not self.buffered:
+            return self._cursor.fetchall()
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        self._connection = sqlite3.connect(
+            path,
+            timeout=CONFIG['busy_timeout'],
+            isolation_level=None,  # Autocommit; transactions are begun explicitly
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # The pool hands connections between threads
+            cached_statements=CONFIG['statement_cache_size'],
+            uri=path.startswith("file:"),  # e.g. file:name?mode=memory&cache=shared for a shared in-memory database
+        )
+        self._connection.execute(f"PRAGMA journal_mode = {CONFIG['journal_mode']}")
+        self._connection.execute(f"PRAGMA synchronous = {CONFIG['synchronous']}")
+        self._connection.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self, buffered=True, prepared=False):
+        # sqlite3 already keeps prepared statements per connection (cached_statements)
+        return SQLiteCursor(self._connection, buffered)
+
+    def start_transaction(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def is_connected(self):
+        try:
+            self._connection.execute("SELECT 1")
+            return True
+        except Error:
+            return False
+
+    def close(self):
+        self._connection.close()
+
+
+def describe(config=None):
+    return f"SQLite database {(config or CONFIG)['database']}"
+
+
+def connect(config=None):
+    return SQLiteConnection((config or CONFIG)['database'])
+
+
+def create_database(name):
+    """Create the directory for a database file; SQLite creates the file itself"""
+    if name.startswith("file:"):
+        return  # A URI, which may not name a file at all
+    directory = os.path.dirname(os.path.abspath(name))
+    os.makedirs(directory, exist_ok=True)
+
+
+def is_connection_lost(error):
+    return False  # There is no server to lose
+
+
+def is_missing_table(error):
+    return isinstance(error, sqlite3.OperationalError) and "no such table" in str(error)
+
+
+def is_retryable(error):
+    # The database stayed locked for longer than busy_timeout
+    return getattr(error, 'sqlite_errorcode', None) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def is_duplicate_key(error):
+    return getattr(error, 'sqlite_errorcode', None) in (sqlite3.SQLITE_CONSTRAINT_UNIQUE,
+                                                        sqlite3.SQLITE_CONSTRAINT_PRIMARYKEY)
+
+
+def replication_lag(connection):
+    return 0.0  # Replica files are copies kept current outside the application
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolError(Exception):
+    """Raised when the pool cannot hand out a connection"""
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection becomes free within the checkout timeout"""
+
+
+class ConnectionPool:
+    """A thread-safe pool of database connections.
+
+    Connections are created lazily up to ``max_size`` and ``min_size`` of them
+    are opened up front. Borrowed connections that have been idle for longer
+    than ``health_check_interval`` seconds are pinged before being handed out
+    and silently replaced when the server has dropped them.
+    """
+
+    def __init__(self, connect, min_size=2, max_size=10, checkout_timeout=5,
+                 health_check_interval=30):
+        if min_size > max_size:
+            raise ValueError("min_size cannot be larger than max_size")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self._idle = deque()  # (connection, released_at) pairs
+        self._size = 0  # Open connections, idle and borrowed
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def open(self):
+        """Open the minimum number of connections"""
+        with self._condition:
+            self._closed = False
+            missing = self.min_size - self._size
+            self._size += max(missing, 0)
+        for opened in range(missing):
+            try:
+                connection = self._connect()
+            except Exception:
+                with self._condition:
+                    # Give back this connection's slot and those of the ones not opened yet
+                    self._size -= missing - opened
+                    self._condition.notify_all()
+                raise
+            self.release(connection)
+
+    def acquire(self, timeout=None):
+        """Borrow a connection, waiting up to ``timeout`` seconds for one"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    connection, released_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection, released_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {timeout} seconds")
+                self._condition.wait(remaining)
+
+        if connection is not None:
+            idle_for = time.monotonic() - released_at
+            if idle_for < self.health_check_interval or self._is_healthy(connection):
+                return connection
+            self._close_quietly(connection)
+
+        # Open a new connection (or replace a dead one) outside the lock
+        try:
+            return self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        """Return a borrowed connection to the pool"""
+        if not discard:
+            try:
+                # Never hand out a connection with an open transaction
+                if connection.in_transaction:
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+        if discard or self._closed:
+            self._close_quietly(connection)
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        """Return the current pool occupancy"""
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size
+            }
+
+    def _is_healthy(self, connection):
+        try:
+            return connection.is_connected()
+        except Exception:
+            return False
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
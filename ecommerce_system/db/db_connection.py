@@ -1,70 +1,383 @@
-import mysql.connector
-from mysql.connector import Error
-from ..config import DB_CONFIG
+import inspect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from ..config import DB_BACKEND, POOL_CONFIG, QUERY_CONFIG, REPLICA_CONFIG, RETRY_CONFIG
+from .backends import load_backend
+from .connection_pool import ConnectionPool, PoolError
+from .instrumentation import InstrumentedCursor, query_stats
+from .replicas import ReplicaSet
+from .statements import StatementCache
+
+# Routing state of the current thread (or request)
+_read_only = ContextVar('read_only', default=False)
+_on_primary = ContextVar('on_primary', default=False)
+_writer = ContextVar('writer', default=None)
+
+
+def read_only(method):
+    """Mark a DAO method whose reads may be served by a read replica"""
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def generator(*args, **kwargs):
+            # Route each step separately, since the caller's code runs between them
+            items = method(*args, **kwargs)
+            while True:
+                token = _read_only.set(True)
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    _read_only.reset(token)
+                yield item
+        return generator
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
 
 
 class DatabaseConnection:
-    def __init__(self):
-        self.connection = None
-        self.cursor = None
+    def __init__(self, backend=DB_BACKEND, replica_config=REPLICA_CONFIG):
+        self.pool = None
+        self.replicas = None
+        self.backend_name = backend
+        self.replica_config = replica_config
+        self._backend = None
+        self._last_writes = {}  # Writer key -> time.monotonic() of its last write
+        self._writes_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """The driver module, imported on first use so only the configured driver must be installed"""
+        if self._backend is None:
+            self._backend = load_backend(self.backend_name)
+        return self._backend
+
+    @property
+    def errors(self):
+        """Exceptions a database call can raise: the driver's errors and pool failures"""
+        return (self.backend.Error, PoolError)
+
+    def use_backend(self, name, database=None):
+        """Switch to another backend and optionally database, creating it if needed"""
+        if self.pool is not None:
+            raise RuntimeError("Disconnect before switching databases")
+        self.backend_name = name
+        self._backend = None
+        if database:
+            self.backend.create_database(database)
+            self.backend.CONFIG['database'] = database
 
     def connect(self):
-        """Create a database connection"""
+        """Create the database connection pool"""
+        backend = self.backend
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            if self.connection.is_connected():
-                self.cursor = self.connection.cursor()
-                print("Successfully connected to MySQL database")
-                return True
-        except Error as e:
-            print(f"Error connecting to MySQL database: {e}")
+            self.pool = ConnectionPool(backend.connect, **POOL_CONFIG)
+            self.pool.open()
+            print(f"Successfully connected to {backend.describe()}")
+        except self.errors as e:
+            print(f"Error connecting to {backend.describe()}: {e}")
+            self.pool = None
             return False
 
+        config = self.replica_config
+        if config['replicas']:
+            self.replicas = ReplicaSet(backend, config['replicas'], POOL_CONFIG,
+                                       config['max_lag_seconds'], config['lag_check_interval'])
+            self.replicas.open()
+        return True
+
     def disconnect(self):
-        """Close the database connection"""
-        if self.connection and self.connection.is_connected():
-            self.cursor.close()
-            self.connection.close()
-            print("MySQL connection closed")
+        """Close every pooled database connection"""
+        if self.replicas:
+            self.replicas.close()
+            self.replicas = None
+        if self.pool:
+            self.pool.close()
+            self.pool = None
+            print("Database connection closed")
+
+    @contextmanager
+    def primary(self):
+        """Send every read in a with-block to the primary, e.g. for a checkout"""
+        token = _on_primary.set(True)
+        try:
+            yield
+        finally:
+            _on_primary.reset(token)
+
+    @contextmanager
+    def read_your_writes(self, writer):
+        """Attribute writes in a with-block to a writer, such as a user ID.
+
+        After a writer's write, its reads stay on the primary for
+        read_your_writes_seconds, so it never reads a replica that hasn't
+        caught up with its own change. Writes outside such a block belong to
+        one shared writer, which suits the single-user desktop client.
+        """
+        token = _writer.set(writer)
+        try:
+            yield
+        finally:
+            _writer.reset(token)
+
+    def _record_write(self):
+        if self.replicas is None:
+            return
+        now = time.monotonic()
+        window = self.replica_config['read_your_writes_seconds']
+        with self._writes_lock:
+            self._last_writes[_writer.get()] = now
+            if len(self._last_writes) > 1000:
+                self._last_writes = {writer: written for writer, written in self._last_writes.items()
+                                     if now - written < window}
+
+    def _replica_for_read(self):
+        """Choose a replica for a read, or None when it must go to the primary"""
+        if self.replicas is None or not _read_only.get() or _on_primary.get():
+            return None
+        written = self._last_writes.get(_writer.get())
+        if written is not None and time.monotonic() - written < self.replica_config['read_your_writes_seconds']:
+            return None
+        return self.replicas.choose()
+
+    def _pool(self, pool=None):
+        """The given pool, or the primary's, connecting first if needed"""
+        if pool is None:
+            if self.pool is None and not self.connect():
+                raise PoolError("Not connected to the database")
+            pool = self.pool
+        return pool
+
+    def _statements(self, conn):
+        """The prepared statement cache of a connection, or None when disabled"""
+        size = QUERY_CONFIG['statement_cache_size']
+        if not size:
+            return None
+        cache = getattr(conn, 'statement_cache', None)
+        if cache is None:
+            # Kept on the connection so it is dropped together with it
+            cache = conn.statement_cache = StatementCache(conn, size)
+        return cache
+
+    @contextmanager
+    def connection(self, pool=None):
+        """Borrow a connection from the pool (the primary's by default) for the duration of a with-block"""
+        pool = self._pool(pool)
+        conn = pool.acquire()
+        discard = False
+        try:
+            yield conn
+        except self.backend.Error as e:
+            discard = self.backend.is_connection_lost(e)
+            raise
+        finally:
+            pool.release(conn, discard=discard)
+
+    @contextmanager
+    def transaction(self):
+        """Run a with-block in a single transaction and yield its cursor"""
+        with self.primary(), self.connection() as conn:
+            conn.start_transaction()
+            cursor = conn.cursor(buffered=True)
+            try:
+                yield InstrumentedCursor(cursor, query_stats)
+                conn.commit()
+                self._record_write()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def run_transaction(self, work):
+        """Run work(cursor) in a transaction and return its result.
+
+        When the database aborts the transaction for a deadlock or a lock wait
+        timeout, it is rolled back and run again after a random delay that
+        grows with each attempt, so work must only change the database through
+        the cursor.
+        """
+        attempts = RETRY_CONFIG['attempts']
+        for attempt in range(1, attempts + 1):
+            try:
+                with self.transaction() as cursor:
+                    return work(cursor)
+            except self.backend.Error as e:
+                if attempt == attempts or not self.backend.is_retryable(e):
+                    raise
+            # Full jitter keeps colliding transactions from retrying in lockstep
+            time.sleep(random.uniform(0, min(RETRY_CONFIG['max_delay'],
+                                             RETRY_CONFIG['base_delay'] * 2 ** (attempt - 1))))
+
+    def _run(self, handler, query, params, pool=None, read=False):
+        """Run a statement on a pooled connection, reconnecting once if it was lost.
+
+        A lost connection is only retried when the statement had not been
+        sent yet, or is a read: a write may have been applied by the server
+        before the connection dropped, and running it again would apply it
+        twice. Statements with parameters run as prepared statements cached
+        on the connection; the rest, mostly DDL, use a plain buffered cursor.
+        The handler must read every row, since prepared cursors are unbuffered.
+        """
+        for attempt in range(2):
+            sent = False
+            try:
+                with self.connection(pool) as conn:
+                    statements = self._statements(conn) if params else None
+                    if statements is not None:
+                        cursor, query = statements.get(query)
+                    else:
+                        cursor = conn.cursor(buffered=True)
+                    start = time.perf_counter()
+                    sent = True
+                    try:
+                        if params:
+                            cursor.execute(query, params)
+                        else:
+                            cursor.execute(query)
+                        result = handler(conn, cursor)
+                        query_stats.record(query, time.perf_counter() - start, cursor.rowcount)
+                        return result
+                    except self.backend.Error:
+                        query_stats.record(query, time.perf_counter() - start, error=True)
+                        if statements is not None:
+                            statements.discard(query)
+                        raise
+                    finally:
+                        if statements is None:
+                            cursor.close()
+            except self.backend.Error as e:
+                if attempt == 0 and (read or not sent) and self.backend.is_connection_lost(e):
+                    continue
+                raise
+
+    def _read(self, handler, query, params):
+        """Run a SELECT on a replica when routing allows, falling back to the primary"""
+        replica = self._replica_for_read()
+        if replica is not None:
+            try:
+                return self._run(handler, query, params, replica.pool, read=True)
+            except self.errors as e:
+                self.replicas.mark_failed(replica, e)
+        return self._run(handler, query, params, read=True)
 
     def execute_query(self, query, params=None):
         """Execute a query that doesn't return data (INSERT, UPDATE, DELETE)"""
-        try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.connection.commit()
+        def commit(conn, cursor):
+            conn.commit()
+            self._record_write()
             return True
-        except Error as e:
+
+        try:
+            return self._run(commit, query, params)
+        except self.errors as e:
             print(f"Error executing query: {e}")
-            self.connection.rollback()
             return False
 
+    def execute_insert(self, query, params=None):
+        """Execute an INSERT and return the new row's ID, or None on failure"""
+        def commit(conn, cursor):
+            conn.commit()
+            self._record_write()
+            return cursor.lastrowid
+
+        try:
+            return self._run(commit, query, params)
+        except self.errors as e:
+            print(f"Error executing query: {e}")
+            return None
+
     def fetch_all(self, query, params=None):
         """Execute a SELECT query and return all results"""
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
-        except Error as e:
+            return self._read(lambda conn, cursor: cursor.fetchall(), query, params)
+        except self.errors as e:
             print(f"Error fetching data: {e}")
             return []
 
     def fetch_one(self, query, params=None):
         """Execute a SELECT query and return one result"""
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            return self.cursor.fetchone()
-        except Error as e:
+            return self._read(_first_row, query, params)
+        except self.errors as e:
             print(f"Error fetching data: {e}")
             return None
 
+    def iter_query(self, query, params=None, batch_size=None):
+        """Yield the rows of a SELECT as they arrive, batch_size rows per round trip.
+
+        Rows stream from an unbuffered cursor, so memory use stays flat however
+        large the result; the connection is held until the generator finishes.
+        Unlike fetch_all, errors are raised, so a failed scan is never mistaken
+        for a short one.
+        """
+        batch_size = batch_size or QUERY_CONFIG['stream_batch_size']
+        replica = self._replica_for_read()
+        if replica is not None:
+            batches = self._stream(query, params, batch_size, replica.pool)
+            try:
+                first = next(batches, [])
+            except self.errors as e:
+                self.replicas.mark_failed(replica, e)
+            else:
+                yield from first
+                for batch in batches:
+                    yield from batch
+                return
+        for batch in self._stream(query, params, batch_size):
+            yield from batch
+
+    def _stream(self, query, params, batch_size, pool=None):
+        """Yield the rows of a SELECT in batches from an unbuffered cursor"""
+        pool = self._pool(pool)
+        conn = pool.acquire()
+        finished = False
+        elapsed = 0.0
+        rows = 0
+        try:
+            cursor = conn.cursor(buffered=False)
+            start = time.perf_counter()
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    # Count time spent in the database, not in the caller between batches
+                    elapsed += time.perf_counter() - start
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    yield batch
+                    start = time.perf_counter()
+            except self.backend.Error:
+                query_stats.record(query, elapsed + time.perf_counter() - start, rows, error=True)
+                raise
+            query_stats.record(query, elapsed, rows)
+            cursor.close()
+            finished = True
+        finally:
+            # A scan abandoned part-way leaves unread rows on the connection, so it is closed
+            pool.release(conn, discard=not finished)
+
+
+def _first_row(conn, cursor):
+    # Read the whole result: prepared cursors must be drained before the connection is reused
+    rows = cursor.fetchall()
+    return rows[0] if rows else None
+
 
 # Global database instance
-db = DatabaseConnection()
\ No newline at end of file
+db = DatabaseConnection()
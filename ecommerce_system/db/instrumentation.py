@@ -0,0 +1,226 @@
+"""
+Query timing for the database layer.
+
+Every statement run through DatabaseConnection is timed and counted under
+its normalized SQL (literals and placeholder lists collapsed) and the DAO
+method that issued it, so the busiest and slowest queries can be traced back
+to the screen or endpoint that runs them. Statements slower than
+INSTRUMENTATION_CONFIG['slow_query_ms'] are written to the slow-query log.
+
+Statistics are per process. They are served in Prometheus text format at
+GET /metrics by the API server, and the desktop client can write them as JSON
+on exit (INSTRUMENTATION_CONFIG['export_path']).
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from ..config import INSTRUMENTATION_CONFIG
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Modules whose frames are skipped when looking for the caller of a query
+_INTERNAL_MODULES = (__package__ + ".", "contextlib")
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_REPEATED_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_REPEATED_WHEN = re.compile(r"(?:WHEN \? THEN \?\s*){2,}", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(query):
+    """Reduce a statement to its shape, so one query with different values is counted once"""
+    query = query.replace("%s", "?")
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    query = _WHITESPACE.sub(" ", query).strip()
+    # IN lists and multi-row VALUES vary in length with the data
+    query = _PLACEHOLDER_LIST.sub("(...)", query)
+    query = _REPEATED_ROWS.sub("(...), ...", query)
+    return _REPEATED_WHEN.sub("WHEN ? THEN ? ... ", query)
+
+
+def call_site():
+    """Name the function outside the database layer that issued the current query"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_INTERNAL_MODULES):
+            # Report a lambda or helper defined in a DAO method as that method; co_qualname is Python 3.11+
+            code = frame.f_code
+            return getattr(code, 'co_qualname', code.co_name).partition(".<locals>")[0]
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryStat:
+    __slots__ = ('buckets', 'count', 'errors', 'rows', 'total', 'max')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def percentile(self, fraction):
+        """Estimate a latency percentile in seconds by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, in_bucket in enumerate(self.buckets):
+            if in_bucket and seen + in_bucket >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / in_bucket, self.max)
+            seen += in_bucket
+        return self.max
+
+
+class QueryStats:
+    def __init__(self, enabled=True, slow_query_ms=200, slow_log_path=None):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.slow_log_path = slow_log_path
+        self.stats = {}  # (normalized SQL, caller) -> QueryStat
+        self._lock = threading.Lock()
+
+    def record(self, query, seconds, rows=0, error=False):
+        """Count one run of a statement"""
+        if not self.enabled:
+            return
+        sql = normalize_sql(query)
+        caller = call_site()
+        bucket = len(BUCKETS)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                bucket = index
+                break
+        with self._lock:
+            stat = self.stats.get((sql, caller))
+            if stat is None:
+                stat = self.stats[(sql, caller)] = QueryStat()
+            stat.buckets[bucket] += 1
+            stat.count += 1
+            stat.total += seconds
+            stat.max = max(stat.max, seconds)
+            if error:
+                stat.errors += 1
+            else:
+                stat.rows += max(rows, 0)
+        if seconds >= self.slow_query_seconds:
+            self.log_slow_query(sql, caller, seconds, rows)
+
+    def log_slow_query(self, sql, caller, seconds, rows):
+        line = f"Slow query ({seconds * 1000:.1f} ms, {max(rows, 0)} rows) from {caller}: {sql}"
+        if not self.slow_log_path:
+            print(line)
+            return
+        try:
+            with self._lock, open(self.slow_log_path, "a", encoding="utf-8") as log:
+                log.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {line}\n")
+        except OSError as e:
+            print(f"Error writing slow query log: {e}")
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def snapshot(self):
+        """Get every query's statistics, most total time first"""
+        with self._lock:
+            items = [(sql, caller, stat.count, stat.errors, stat.rows, stat.total, stat.max, list(stat.buckets),
+                      stat.percentile(0.5), stat.percentile(0.95), stat.percentile(0.99))
+                     for (sql, caller), stat in self.stats.items()]
+        items.sort(key=lambda item: item[5], reverse=True)
+        return [{
+            'query': sql,
+            'caller': caller,
+            'count': count,
+            'errors': errors,
+            'rows': rows,
+            'total_ms': round(total * 1000, 3),
+            'mean_ms': round(total * 1000 / count, 3),
+            'max_ms': round(longest * 1000, 3),
+            'p50_ms': round(p50 * 1000, 3),
+            'p95_ms': round(p95 * 1000, 3),
+            'p99_ms': round(p99 * 1000, 3),
+            'buckets': buckets,
+        } for sql, caller, count, errors, rows, total, longest, buckets, p50, p95, p99 in items]
+
+    def to_json(self):
+        return json.dumps({'pid': os.getpid(), 'bucket_bounds': list(BUCKETS), 'queries': self.snapshot()},
+                          indent=2)
+
+    def write_json(self, path):
+        """Write the statistics to a JSON file; returns True on success"""
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.to_json())
+            return True
+        except OSError as e:
+            print(f"Error writing query statistics: {e}")
+            return False
+
+    def to_prometheus(self):
+        """Render the statistics in the Prometheus text exposition format"""
+        pid = os.getpid()
+        durations = [
+            "# HELP db_query_duration_seconds Query latency by normalized SQL and calling method",
+            "# TYPE db_query_duration_seconds histogram",
+        ]
+        rows = ["# HELP db_query_rows_total Rows returned or affected", "# TYPE db_query_rows_total counter"]
+        errors = ["# HELP db_query_errors_total Queries that raised an error", "# TYPE db_query_errors_total counter"]
+        for stat in self.snapshot():
+            labels = f'query="{_escape(stat["query"])}",caller="{_escape(stat["caller"])}",pid="{pid}"'
+            cumulative = 0
+            for bound, in_bucket in zip(BUCKETS + ("+Inf",), stat['buckets']):
+                cumulative += in_bucket
+                durations.append(f'db_query_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            durations.append(f"db_query_duration_seconds_sum{{{labels}}} {stat['total_ms'] / 1000}")
+            durations.append(f"db_query_duration_seconds_count{{{labels}}} {stat['count']}")
+            rows.append(f"db_query_rows_total{{{labels}}} {stat['rows']}")
+            errors.append(f"db_query_errors_total{{{labels}}} {stat['errors']}")
+        return "\n".join(durations + rows + errors) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class InstrumentedCursor:
+    """Wraps a cursor so statements run inside a transaction are timed too"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def execute(self, query, params=None):
+        start = time.perf_counter()
+        try:
+            result = self._cursor.execute(query, params)
+        except Exception:
+            self._stats.record(query, time.perf_counter() - start, error=True)
+            raise
+        self._stats.record(query, time.perf_counter() - start, self._cursor.rowcount)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+# Global statistics for this process
+query_stats = QueryStats(INSTRUMENTATION_CONFIG['enabled'], INSTRUMENTATION_CONFIG['slow_query_ms'],
+                         INSTRUMENTATION_CONFIG['slow_log_path'])
@@ -0,0 +1,169 @@
+"""
+Versioned schema migrations.
+
+Migrations live in db/migrations as NNNN_description.py modules with UP and
+DOWN lists of SQL statements. Applied versions are recorded in the
+schema_version table. Run from the repository root:
+
+    python -m ecommerce_system.db.migrate status
+    python -m ecommerce_system.db.migrate up [--target N] [--dry-run]
+    python -m ecommerce_system.db.migrate down --target N [--dry-run]
+"""
+import argparse
+import importlib
+import os
+import re
+import sys
+from .db_connection import db
+
+MIGRATIONS_PACKAGE = __package__ + ".migrations"
+MIGRATIONS_PATH = os.path.join(os.path.dirname(__file__), "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+class Migration:
+    def __init__(self, version, name, up, down):
+        self.version = version
+        self.name = name
+        self.up = up
+        self.down = down
+
+    def __str__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+class MigrationRunner:
+    def discover(self):
+        """Load every migration module in version order"""
+        migrations = []
+        for filename in sorted(os.listdir(MIGRATIONS_PATH)):
+            match = MIGRATION_FILE_PATTERN.match(filename)
+            if not match:
+                continue
+            module = importlib.import_module(f"{MIGRATIONS_PACKAGE}.{filename[:-3]}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module.UP, module.DOWN))
+        return migrations
+
+    def latest_version(self):
+        """Get the newest migration's version from the file names, without loading any"""
+        versions = [int(match.group(1)) for match in map(MIGRATION_FILE_PATTERN.match, os.listdir(MIGRATIONS_PATH))
+                    if match]
+        return max(versions, default=0)
+
+    def current_version(self):
+        """Get the newest applied version, or 0 for a database without migrations"""
+        try:
+            with db.connection() as conn:
+                cursor = conn.cursor(buffered=True)
+                try:
+                    cursor.execute("SELECT MAX(version) FROM schema_version")
+                    return cursor.fetchone()[0] or 0
+                finally:
+                    cursor.close()
+        except db.backend.Error as e:
+            if db.backend.is_missing_table(e):
+                return 0
+            raise
+
+    def pending(self):
+        """Get the migrations that have not been applied yet"""
+        current = self.current_version()
+        if current >= self.latest_version():
+            return []  # Up to date; skip loading the migration modules
+        return [migration for migration in self.discover() if migration.version > current]
+
+    def upgrade(self, target=None, dry_run=False):
+        """Apply pending migrations up to target (default: newest) and return them"""
+        migrations = [migration for migration in self.pending()
+                      if target is None or migration.version <= target]
+        if migrations and not dry_run:
+            self._ensure_version_table()
+        for migration in migrations:
+            print(f"{'Would apply' if dry_run else 'Applying'} {migration}")
+            self._apply(migration.up, dry_run,
+                        "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                        (migration.version, migration.name))
+        return migrations
+
+    def downgrade(self, target, dry_run=False):
+        """Revert applied migrations newer than target, newest first, and return them"""
+        current = self.current_version()
+        migrations = [migration for migration in reversed(self.discover())
+                      if target < migration.version <= current]
+        for migration in migrations:
+            print(f"{'Would revert' if dry_run else 'Reverting'} {migration}")
+            self._apply(migration.down, dry_run,
+                        "DELETE FROM schema_version WHERE version = %s", (migration.version,))
+        return migrations
+
+    def _ensure_version_table(self):
+        """Create the schema_version table if it doesn't exist"""
+        query = """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+            finally:
+                cursor.close()
+
+    def _apply(self, statements, dry_run, record_query, record_params):
+        """Run a migration's statements and record it, or print them for a dry run"""
+        if dry_run:
+            for statement in statements:
+                print(f"    {' '.join(statement.split())};")
+            return
+        # DDL commits implicitly (on MySQL, and on SQLite outside a transaction), so a
+        # failing migration can be left half-applied
+        with db.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(record_query, record_params)
+                conn.commit()
+            finally:
+                cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or revert database schema migrations")
+    parser.add_argument("command", choices=["status", "up", "down"])
+    parser.add_argument("--target", type=int, help="version to migrate to")
+    parser.add_argument("--dry-run", action="store_true", help="print SQL without running it")
+    args = parser.parse_args()
+
+    if args.command == "down" and args.target is None:
+        parser.error("down requires --target")
+    if not db.connect():
+        return 1
+
+    runner = MigrationRunner()
+    try:
+        if args.command == "status":
+            current = runner.current_version()
+            print(f"Current schema version: {current}")
+            for migration in runner.discover():
+                state = "applied" if migration.version <= current else "pending"
+                print(f"  {migration}: {state}")
+        elif args.command == "up":
+            applied = runner.upgrade(args.target, args.dry_run)
+            if not applied:
+                print("Schema is up to date")
+        else:
+            runner.downgrade(args.target, args.dry_run)
+    except db.errors as e:
+        print(f"Migration failed: {e}")
+        return 1
+    finally:
+        db.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
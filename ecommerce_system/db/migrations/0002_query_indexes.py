@@ -0,0 +1,25 @@
+"""Secondary indexes for order history, order listings, sales analytics and product lookups"""
+
+UP = [
+    # get_orders_by_user: WHERE user_id = ? ORDER BY order_date DESC
+    "CREATE INDEX idx_orders_user_date ON orders (user_id, order_date)",
+    # iter_orders / get_orders_page: ORDER BY order_date DESC, id DESC
+    "CREATE INDEX idx_orders_order_date ON orders (order_date)",
+    # get_sales_report / get_top_selling_products: WHERE status IN (...), grouped by day
+    "CREATE INDEX idx_orders_status_date ON orders (status, order_date, total_amount)",
+    # get_top_selling_products: SUM(quantity) grouped by product without reading the rows
+    "CREATE INDEX idx_order_items_product_quantity ON order_items (product_id, quantity)",
+    # Product lookups and sorting by name
+    "CREATE INDEX idx_products_name ON products (name)",
+]
+
+DOWN = [
+    "DROP INDEX idx_products_name ON products",
+    # The composite indexes also back foreign keys, so restore single-column ones first
+    "CREATE INDEX idx_order_items_product ON order_items (product_id)",
+    "DROP INDEX idx_order_items_product_quantity ON order_items",
+    "DROP INDEX idx_orders_status_date ON orders",
+    "DROP INDEX idx_orders_order_date ON orders",
+    "CREATE INDEX idx_orders_user ON orders (user_id)",
+    "DROP INDEX idx_orders_user_date ON orders",
+]
@@ -0,0 +1,42 @@
+"""Daily sales rollups maintained on order creation and status changes, backfilled from order history"""
+
+UP = [
+    """
+    CREATE TABLE IF NOT EXISTS sales_daily (
+        sale_date DATE NOT NULL,
+        status ENUM('pending', 'paid', 'shipped', 'delivered') NOT NULL,
+        orders_count INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, status)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS product_sales_daily (
+        sale_date DATE NOT NULL,
+        product_id INT NOT NULL,
+        status ENUM('pending', 'paid', 'shipped', 'delivered') NOT NULL,
+        quantity INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, product_id, status),
+        KEY idx_product_sales_daily_status_product (status, product_id, quantity)
+    )
+    """,
+    """
+    INSERT INTO sales_daily (sale_date, status, orders_count, revenue)
+    SELECT DATE(order_date), status, COUNT(*), SUM(total_amount)
+    FROM orders
+    GROUP BY DATE(order_date), status
+    """,
+    """
+    INSERT INTO product_sales_daily (sale_date, product_id, status, quantity, revenue)
+    SELECT DATE(o.order_date), oi.product_id, o.status, SUM(oi.quantity), SUM(oi.quantity * oi.price)
+    FROM order_items oi
+    JOIN orders o ON oi.order_id = o.id
+    GROUP BY DATE(o.order_date), oi.product_id, o.status
+    """,
+]
+
+DOWN = [
+    "DROP TABLE IF EXISTS product_sales_daily",
+    "DROP TABLE IF EXISTS sales_daily",
+]
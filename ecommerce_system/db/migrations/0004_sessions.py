@@ -0,0 +1,19 @@
+"""Login sessions, looked up by a hash of the token handed to the client"""
+
+UP = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_hash CHAR(64) PRIMARY KEY,
+        user_id INT NOT NULL,
+        created_at DATETIME NOT NULL,
+        expires_at DATETIME NOT NULL,
+        KEY idx_sessions_user (user_id),
+        KEY idx_sessions_expires (expires_at),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    )
+    """,
+]
+
+DOWN = [
+    "DROP TABLE IF EXISTS sessions",
+]
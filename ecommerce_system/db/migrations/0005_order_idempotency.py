@@ -0,0 +1,12 @@
+"""Idempotency keys on orders, so a retried checkout returns the order it already placed"""
+
+UP = [
+    "ALTER TABLE orders ADD COLUMN idempotency_key VARCHAR(64) NULL",
+    # Keys are chosen by clients, so they only need to be unique per user
+    "CREATE UNIQUE INDEX idx_orders_user_idempotency ON orders (user_id, idempotency_key)",
+]
+
+DOWN = [
+    "DROP INDEX idx_orders_user_idempotency ON orders",
+    "ALTER TABLE orders DROP COLUMN idempotency_key",
+]
@@ -0,0 +1,41 @@
+"""Spread each day's sales_daily totals over shard rows, so concurrent checkouts don't queue on one row"""
+
+UP = [
+    """
+    CREATE TABLE IF NOT EXISTS sales_daily_sharded (
+        sale_date DATE NOT NULL,
+        status ENUM('pending', 'paid', 'shipped', 'delivered') NOT NULL,
+        shard SMALLINT NOT NULL DEFAULT 0,
+        orders_count INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, status, shard)
+    )
+    """,
+    """
+    INSERT INTO sales_daily_sharded (sale_date, status, shard, orders_count, revenue)
+    SELECT sale_date, status, 0, orders_count, revenue
+    FROM sales_daily
+    """,
+    "DROP TABLE sales_daily",
+    "ALTER TABLE sales_daily_sharded RENAME TO sales_daily",
+]
+
+DOWN = [
+    """
+    CREATE TABLE IF NOT EXISTS sales_daily_unsharded (
+        sale_date DATE NOT NULL,
+        status ENUM('pending', 'paid', 'shipped', 'delivered') NOT NULL,
+        orders_count INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (sale_date, status)
+    )
+    """,
+    """
+    INSERT INTO sales_daily_unsharded (sale_date, status, orders_count, revenue)
+    SELECT sale_date, status, SUM(orders_count), SUM(revenue)
+    FROM sales_daily
+    GROUP BY sale_date, status
+    """,
+    "DROP TABLE sales_daily",
+    "ALTER TABLE sales_daily_unsharded RENAME TO sales_daily",
+]
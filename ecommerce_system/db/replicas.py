@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from .connection_pool import ConnectionPool
+
+
+class Replica:
+    def __init__(self, name, pool, weight=1):
+        self.name = name
+        self.pool = pool
+        self.weight = weight
+        self.current_weight = 0  # Smooth weighted round-robin state
+        self.lag = None  # Seconds behind the primary at the last check; None if unknown or unreachable
+        self.checked_at = None  # time.monotonic() of the last lag check
+        self.reads = 0
+
+
+class ReplicaSet:
+    """Read replicas, chosen by weighted round-robin among those close enough to the primary.
+
+    A background thread checks each replica's replication lag every
+    ``check_interval`` seconds, so reads only look at the last readings and
+    never wait on a slow or unreachable replica. A replica that is
+    unreachable, not replicating or more than ``max_lag`` seconds behind is
+    skipped until a later check finds it caught up; with none left, reads go
+    to the primary.
+    """
+
+    def __init__(self, backend, replicas, pool_config, max_lag=5, check_interval=5):
+        self.backend = backend
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.replicas = []
+        for settings in replicas:
+            settings = dict(settings)
+            weight = settings.pop('weight', 1)
+            config = {**backend.CONFIG, **settings}
+            pool = ConnectionPool(lambda config=config: backend.connect(config), **pool_config)
+            self.replicas.append(Replica(backend.describe(config), pool, weight))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._checker = None
+
+    def open(self):
+        """Open each replica's pool and start checking lag; unreachable replicas are retried at each check"""
+        for replica in self.replicas:
+            try:
+                replica.pool.open()
+            except Exception as e:
+                print(f"Error connecting to replica {replica.name}: {e}")
+        self._stop.clear()
+        self._checker = threading.Thread(target=self._check_lags, name="replica-lag", daemon=True)
+        self._checker.start()
+
+    def close(self):
+        self._stop.set()
+        if self._checker is not None:
+            self._checker.join()
+            self._checker = None
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def choose(self):
+        """Pick the replica for the next read, or None to read from the primary"""
+        with self._lock:
+            eligible = [replica for replica in self.replicas
+                        if replica.lag is not None and replica.lag <= self.max_lag]
+            if not eligible:
+                return None
+            total = 0
+            chosen = None
+            for replica in eligible:
+                replica.current_weight += replica.weight
+                total += replica.weight
+                if chosen is None or replica.current_weight > chosen.current_weight:
+                    chosen = replica
+            chosen.current_weight -= total
+            chosen.reads += 1
+            return chosen
+
+    def mark_failed(self, replica, error):
+        """Stop reading from a replica whose query failed until its next lag check"""
+        with self._lock:
+            was_serving = replica.lag is not None
+            replica.lag = None
+            replica.checked_at = time.monotonic()
+        if was_serving:
+            print(f"Replica {replica.name} failed, reading from the primary: {error}")
+
+    def stats(self):
+        with self._lock:
+            return [{'name': replica.name, 'weight': replica.weight, 'lag': replica.lag,
+                     'reads': replica.reads} for replica in self.replicas]
+
+    def to_prometheus(self):
+        """Render each replica's lag and read count in the Prometheus text exposition format"""
+        pid = os.getpid()
+        lag = ["# HELP db_replica_lag_seconds Replication lag at the last check; NaN if unknown",
+               "# TYPE db_replica_lag_seconds gauge"]
+        reads = ["# HELP db_replica_reads_total Reads routed to the replica", "# TYPE db_replica_reads_total counter"]
+        for stat in self.stats():
+            labels = f'replica="{stat["name"]}",pid="{pid}"'
+            lag.append(f"db_replica_lag_seconds{{{labels}}} {'NaN' if stat['lag'] is None else stat['lag']}")
+            reads.append(f"db_replica_reads_total{{{labels}}} {stat['reads']}")
+        return "\n".join(lag + reads) + "\n"
+
+    def _check_lags(self):
+        """Check every replica's lag each check_interval until closed"""
+        while not self._stop.is_set():
+            for replica in self.replicas:
+                if self._stop.is_set():
+                    break
+                self._check_lag(replica)
+            self._stop.wait(self.check_interval)
+
+    def _check_lag(self, replica):
+        try:
+            connection = replica.pool.acquire()
+            discard = False
+            try:
+                lag = self.backend.replication_lag(connection)
+            except Exception:
+                discard = True
+                raise
+            finally:
+                replica.pool.release(connection, discard=discard)
+        except Exception as e:
+            lag = None
+            print(f"Error checking replica {replica.name}: {e}")
+        with self._lock:
+            if lag is not None and lag > self.max_lag and (replica.lag is None or replica.lag <= self.max_lag):
+                print(f"Replica {replica.name} is {lag:.0f}s behind the primary, reading from the primary")
+            replica.lag = lag
+            replica.checked_at = time.monotonic()
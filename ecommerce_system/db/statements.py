@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+class StatementCache:
+    """Prepared statements of one connection, keyed by SQL text.
+
+    Each statement keeps its own prepared cursor, so running the same SQL
+    again skips the prepare round trip. The driver only reuses a prepared
+    statement when it is given the very string it prepared, so the cached
+    text is handed back with the cursor. The least recently used statements
+    are closed once there are more than ``max_size``.
+    """
+
+    def __init__(self, connection, max_size=100):
+        self.connection = connection
+        self.max_size = max_size
+        self._statements = OrderedDict()  # SQL text -> (cursor, SQL text)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query):
+        """Return (cursor, query) for a statement, preparing it on first use"""
+        entry = self._statements.pop(query, None)
+        if entry is None:
+            self.misses += 1
+            if len(self._statements) >= self.max_size:
+                _, (cursor, _) = self._statements.popitem(last=False)
+                self._close_quietly(cursor)
+            entry = (self.connection.cursor(prepared=True), query)
+        else:
+            self.hits += 1
+        self._statements[query] = entry
+        return entry
+
+    def discard(self, query):
+        """Close a statement that failed, so it is prepared afresh next time"""
+        entry = self._statements.pop(query, None)
+        if entry is not None:
+            self._close_quietly(entry[0])
+
+    def _close_quietly(self, cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def __len__(self):
+        return len(self._statements)
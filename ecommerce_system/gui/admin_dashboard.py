@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
+from datetime import date
+from functools import partial
 from ..dao.user_dao import UserDAO
 from ..dao.product_dao import ProductDAO
 from ..dao.category_dao import CategoryDAO
 from ..dao.order_dao import OrderDAO
-from .analytics import AnalyticsDashboard
+from ..utils.thumbnails import ensure_thumbnail
+from .background import get_runner
+from .paged_list import PagedListbox
 
 
 class AdminDashboard:
@@ -16,6 +20,8 @@ class AdminDashboard:
         self.product_dao = ProductDAO()
         self.category_dao = CategoryDAO()
         self.order_dao = OrderDAO()
+        self.runner = get_runner(parent)  # Runs DAO calls off the UI thread
+        self.categories = []
         
         # Configure parent window
         self.parent.title(f"Admin Dashboard - {user.name}")
@@ -99,9 +105,22 @@ class AdminDashboard:
         users_frame = ctk.CTkFrame(self.content_frame)
         users_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Listbox for users
-        self.users_listbox = tk.Listbox(users_frame)
-        self.users_listbox.pack(fill="both", expand=True, padx=5, pady=5)
+        # Filters
+        filter_frame = ctk.CTkFrame(users_frame)
+        filter_frame.pack(fill="x", padx=5, pady=5)
+        
+        self.user_filter_role_var = ctk.StringVar(value="all")
+        ctk.CTkComboBox(filter_frame, values=["all", "admin", "customer"], width=110,
+                        variable=self.user_filter_role_var).pack(side="left", padx=5)
+        self.user_search_entry = ctk.CTkEntry(filter_frame, placeholder_text="Name or email")
+        self.user_search_entry.pack(side="left", padx=5)
+        ctk.CTkButton(filter_frame, text="Filter", width=80, command=self.load_users).pack(side="left", padx=5)
+        
+        # Users are fetched a page at a time as the list scrolls
+        self.users_list = PagedListbox(users_frame, self.runner, noun="users",
+                                       format_item=lambda user: f"{user.id}: {user.name} ({user.email}) - {user.role}")
+        self.users_list.pack(fill="both", expand=True, padx=5, pady=5)
+        self.users_listbox = self.users_list.listbox
         
         # Buttons for user operations
         buttons_frame = ctk.CTkFrame(users_frame)
@@ -114,11 +133,10 @@ class AdminDashboard:
         self.load_users()
 
     def load_users(self):
-        """Load and display all users"""
-        self.users_listbox.delete(0, tk.END)
-        users = self.user_dao.get_all_users()
-        for user in users:
-            self.users_listbox.insert(tk.END, f"{user.id}: {user.name} ({user.email}) - {user.role}")
+        """Show the first page of users matching the filters"""
+        role = self.user_filter_role_var.get()
+        self.users_list.load(partial(self.user_dao.get_users_page, role=None if role == "all" else role,
+                                     search=self.user_search_entry.get().strip() or None))
 
     def add_user(self):
         """Add a new user"""
@@ -131,23 +149,28 @@ class AdminDashboard:
             messagebox.showerror("Error", "Please fill in all fields")
             return
         
-        # Check if user already exists
-        existing_user = self.user_dao.get_user_by_email(email)
-        if existing_user:
-            messagebox.showerror("Error", "User with this email already exists")
-            return
-        
         from ..models.user import User
         new_user = User(name=name, email=email, password=password, role=role)
         
-        if self.user_dao.create_user(new_user):
-            messagebox.showinfo("Success", "User added successfully!")
-            self.user_name_entry.delete(0, tk.END)
-            self.user_email_entry.delete(0, tk.END)
-            self.user_password_entry.delete(0, tk.END)
-            self.load_users()
-        else:
-            messagebox.showerror("Error", "Failed to add user")
+        def create():
+            # Check if user already exists
+            if self.user_dao.get_user_by_email(email):
+                return None
+            return self.user_dao.create_user(new_user)
+        
+        def done(created):
+            if created is None:
+                messagebox.showerror("Error", "User with this email already exists")
+            elif created:
+                messagebox.showinfo("Success", "User added successfully!")
+                self.user_name_entry.delete(0, tk.END)
+                self.user_email_entry.delete(0, tk.END)
+                self.user_password_entry.delete(0, tk.END)
+                self.load_users()
+            else:
+                messagebox.showerror("Error", "Failed to add user")
+        
+        self.runner.submit(create, on_success=done)
 
     def delete_user(self):
         """Delete selected user"""
@@ -165,11 +188,13 @@ class AdminDashboard:
             return
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this user?"):
-            if self.user_dao.delete_user(user_id):
-                messagebox.showinfo("Success", "User deleted successfully!")
-                self.load_users()
-            else:
-                messagebox.showerror("Error", "Failed to delete user")
+            def done(deleted):
+                if deleted:
+                    messagebox.showinfo("Success", "User deleted successfully!")
+                    self.load_users()
+                else:
+                    messagebox.showerror("Error", "Failed to delete user")
+            self.runner.submit(self.user_dao.delete_user, user_id, on_success=done)
 
     def show_products(self):
         """Show the product management view"""
@@ -203,12 +228,16 @@ class AdminDashboard:
         
         # Category selection
         ctk.CTkLabel(form_frame, text="Category:").grid(row=4, column=0, padx=5, pady=5, sticky="w")
-        categories = self.category_dao.get_all_categories()
-        category_names = [cat[1] for cat in categories]  # Get category names
         self.prod_category_var = ctk.StringVar()
-        self.prod_category_combo = ctk.CTkComboBox(form_frame, values=category_names, variable=self.prod_category_var)
+        self.prod_category_combo = ctk.CTkComboBox(form_frame, values=[], variable=self.prod_category_var)
         self.prod_category_combo.grid(row=4, column=1, padx=5, pady=5)
         
+        def show_categories(categories):
+            self.categories = categories
+            self.prod_category_combo.configure(values=[cat[1] for cat in categories])  # Get category names
+        self.runner.submit(self.category_dao.get_all_categories, on_success=show_categories,
+                           key="categories")
+        
         # Image selection
         ctk.CTkLabel(form_frame, text="Image:").grid(row=5, column=0, padx=5, pady=5, sticky="w")
         image_frame = ctk.CTkFrame(form_frame)
@@ -277,9 +306,11 @@ class AdminDashboard:
     def load_products(self):
         """Load and display all products"""
         self.products_listbox.delete(0, tk.END)
-        products = self.product_dao.get_all_products()
-        for product in products:
-            self.products_listbox.insert(tk.END, f"{product.id}: {product.name} - ${product.price} ({product.stock} in stock)")
+        
+        def show(rows):
+            for product_id, _, name, _, price, stock, _, _ in rows:
+                self.products_listbox.insert(tk.END, f"{product_id}: {name} - ${price} ({stock} in stock)")
+        self.runner.submit(self.product_dao.get_all_products, raw=True, on_success=show, key="list")
 
     def add_product(self):
         """Add a new product"""
@@ -298,9 +329,8 @@ class AdminDashboard:
         
         # Get category ID
         category_name = self.prod_category_var.get()
-        categories = self.category_dao.get_all_categories()
         category_id = None
-        for cat in categories:
+        for cat in self.categories:
             if cat[1] == category_name:
                 category_id = cat[0]
                 break
@@ -314,16 +344,19 @@ class AdminDashboard:
         new_product = Product(name=name, description=description, price=price, 
                               stock=stock, category_id=category_id, image=image_path)
         
-        if self.product_dao.create_product(new_product):
-            messagebox.showinfo("Success", "Product added successfully!")
-            self.prod_name_entry.delete(0, tk.END)
-            self.prod_desc_entry.delete(0, tk.END)
-            self.prod_price_entry.delete(0, tk.END)
-            self.prod_stock_entry.delete(0, tk.END)
-            self.prod_image_path_label.configure(text="No image selected")
-            self.load_products()
-        else:
-            messagebox.showerror("Error", "Failed to add product")
+        def done(created):
+            if created:
+                messagebox.showinfo("Success", "Product added successfully!")
+                self.prod_name_entry.delete(0, tk.END)
+                self.prod_desc_entry.delete(0, tk.END)
+                self.prod_price_entry.delete(0, tk.END)
+                self.prod_stock_entry.delete(0, tk.END)
+                self.prod_image_path_label.configure(text="No image selected")
+                self.load_products()
+            else:
+                messagebox.showerror("Error", "Failed to add product")
+        
+        self.runner.submit(self.save_product, self.product_dao.create_product, new_product, on_success=done)
 
     def delete_product(self):
         """Delete selected product"""
@@ -336,11 +369,13 @@ class AdminDashboard:
         prod_id = int(prod_info.split(":")[0])
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this product?"):
-            if self.product_dao.delete_product(prod_id):
-                messagebox.showinfo("Success", "Product deleted successfully!")
-                self.load_products()
-            else:
-                messagebox.showerror("Error", "Failed to delete product")
+            def done(deleted):
+                if deleted:
+                    messagebox.showinfo("Success", "Product deleted successfully!")
+                    self.load_products()
+                else:
+                    messagebox.showerror("Error", "Failed to delete product")
+            self.runner.submit(self.product_dao.delete_product, prod_id, on_success=done)
 
     def update_product(self):
         """Update selected product details including image"""
@@ -352,8 +387,13 @@ class AdminDashboard:
         prod_info = self.products_listbox.get(selection[0])
         prod_id = int(prod_info.split(":")[0])
         
-        # Get the current product details
-        product = self.product_dao.get_product_by_id(prod_id)
+        # Get the current product details and categories, then open the form
+        def load():
+            return self.product_dao.get_product_by_id(prod_id), self.category_dao.get_all_categories()
+        self.runner.submit(load, on_success=lambda result: self.show_update_form(*result))
+
+    def show_update_form(self, product, categories):
+        """Open the update form for a product"""
         if not product:
             messagebox.showerror("Error", "Product not found")
             return
@@ -390,7 +430,6 @@ class AdminDashboard:
         
         # Category selection
         ctk.CTkLabel(form_frame, text="Category:").grid(row=4, column=0, padx=5, pady=5, sticky="w")
-        categories = self.category_dao.get_all_categories()
         category_names = [cat[1] for cat in categories]  # Get category names
         category_var = ctk.StringVar()
         
@@ -476,17 +515,30 @@ class AdminDashboard:
             product.category_id = category_id
             product.image = image_path_label.cget("text") if image_path_label.cget("text") != "No image selected" else None
 
-            if self.product_dao.update_product(product):
-                messagebox.showinfo("Success", "Product updated successfully!")
-                update_window.destroy()
-                self.load_products()
-            else:
-                messagebox.showerror("Error", "Failed to update product")
+            def done(updated):
+                save_btn.configure(state="normal")
+                if updated:
+                    messagebox.showinfo("Success", "Product updated successfully!")
+                    update_window.destroy()
+                    self.load_products()
+                else:
+                    messagebox.showerror("Error", "Failed to update product")
+            
+            save_btn.configure(state="disabled")
+            self.runner.submit(self.save_product, self.product_dao.update_product, product, on_success=done)
 
         # Save button
         save_btn = ctk.CTkButton(form_frame, text="Update Product", command=save_updated_product)
         save_btn.grid(row=6, column=0, columnspan=2, pady=20)
 
+    def save_product(self, save, product):
+        """Save a product on a worker thread and generate its card thumbnail"""
+        if not save(product):
+            return False
+        if product.image:
+            ensure_thumbnail(product.image)
+        return True
+
     def show_categories(self):
         """Show the category management view"""
         self.clear_content()
@@ -534,9 +586,11 @@ class AdminDashboard:
     def load_categories(self):
         """Load and display all categories"""
         self.categories_listbox.delete(0, tk.END)
-        categories = self.category_dao.get_all_categories()
-        for cat in categories:
-            self.categories_listbox.insert(tk.END, f"{cat[0]}: {cat[1]}")
+        
+        def show(categories):
+            for cat in categories:
+                self.categories_listbox.insert(tk.END, f"{cat[0]}: {cat[1]}")
+        self.runner.submit(self.category_dao.get_all_categories, on_success=show, key="list")
 
     def add_category(self):
         """Add a new category"""
@@ -547,13 +601,16 @@ class AdminDashboard:
             messagebox.showerror("Error", "Category name is required")
             return
         
-        if self.category_dao.create_category(name, description):
-            messagebox.showinfo("Success", "Category added successfully!")
-            self.cat_name_entry.delete(0, tk.END)
-            self.cat_desc_entry.delete(0, tk.END)
-            self.load_categories()
-        else:
-            messagebox.showerror("Error", "Failed to add category")
+        def done(created):
+            if created:
+                messagebox.showinfo("Success", "Category added successfully!")
+                self.cat_name_entry.delete(0, tk.END)
+                self.cat_desc_entry.delete(0, tk.END)
+                self.load_categories()
+            else:
+                messagebox.showerror("Error", "Failed to add category")
+        
+        self.runner.submit(self.category_dao.create_category, name, description, on_success=done)
 
     def delete_category(self):
         """Delete selected category"""
@@ -566,11 +623,13 @@ class AdminDashboard:
         cat_id = int(cat_info.split(":")[0])
         
         if messagebox.askyesno("Confirm", "Are you sure you want to delete this category?"):
-            if self.category_dao.delete_category(cat_id):
-                messagebox.showinfo("Success", "Category deleted successfully!")
-                self.load_categories()
-            else:
-                messagebox.showerror("Error", "Failed to delete category")
+            def done(deleted):
+                if deleted:
+                    messagebox.showinfo("Success", "Category deleted successfully!")
+                    self.load_categories()
+                else:
+                    messagebox.showerror("Error", "Failed to delete category")
+            self.runner.submit(self.category_dao.delete_category, cat_id, on_success=done)
 
     def show_orders(self):
         """Show the orders view"""
@@ -585,9 +644,27 @@ class AdminDashboard:
         orders_frame = ctk.CTkFrame(self.content_frame)
         orders_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Listbox for orders
-        self.orders_listbox = tk.Listbox(orders_frame)
-        self.orders_listbox.pack(fill="both", expand=True, padx=5, pady=5)
+        # Filters
+        filter_frame = ctk.CTkFrame(orders_frame)
+        filter_frame.pack(fill="x", padx=5, pady=5)
+        
+        self.order_filter_status_var = ctk.StringVar(value="all")
+        ctk.CTkComboBox(filter_frame, values=["all", "pending", "paid", "shipped", "delivered"], width=110,
+                        variable=self.order_filter_status_var).pack(side="left", padx=5)
+        self.order_user_entry = ctk.CTkEntry(filter_frame, placeholder_text="User ID", width=80)
+        self.order_user_entry.pack(side="left", padx=5)
+        self.order_from_entry = ctk.CTkEntry(filter_frame, placeholder_text="From YYYY-MM-DD", width=130)
+        self.order_from_entry.pack(side="left", padx=5)
+        self.order_to_entry = ctk.CTkEntry(filter_frame, placeholder_text="To YYYY-MM-DD", width=130)
+        self.order_to_entry.pack(side="left", padx=5)
+        ctk.CTkButton(filter_frame, text="Filter", width=80, command=self.load_orders).pack(side="left", padx=5)
+        
+        # Orders are fetched a page at a time as the list scrolls
+        self.orders_list = PagedListbox(
+            orders_frame, self.runner, noun="orders",
+            format_item=lambda order: f"{order.id}: User {order.user_id} - ${order.total_amount} - {order.status}")
+        self.orders_list.pack(fill="both", expand=True, padx=5, pady=5)
+        self.orders_listbox = self.orders_list.listbox
         
         # Buttons for order operations
         buttons_frame = ctk.CTkFrame(orders_frame)
@@ -602,15 +679,66 @@ class AdminDashboard:
         update_status_btn = ctk.CTkButton(buttons_frame, text="Update Status", command=self.update_order_status)
         update_status_btn.pack(side="left", padx=5)
         
+        # Order details text area
+        details_frame = ctk.CTkFrame(orders_frame)
+        details_frame.pack(fill="x", padx=5, pady=5)
+        
+        ctk.CTkLabel(details_frame, text="Order Details:").pack(anchor="w", padx=5)
+        self.order_details_text = tk.Text(details_frame, height=8)
+        self.order_details_text.pack(fill="x", padx=5, pady=5)
+        
         # Load orders
         self.load_orders()
+        self.orders_listbox.bind('<<ListboxSelect>>', self.show_order_details)
 
     def load_orders(self):
-        """Load and display all orders"""
-        self.orders_listbox.delete(0, tk.END)
-        orders = self.order_dao.get_all_orders()
-        for order in orders:
-            self.orders_listbox.insert(tk.END, f"{order.id}: User {order.user_id} - ${order.total_amount} - {order.status}")
+        """Show the first page of orders matching the filters"""
+        status = self.order_filter_status_var.get()
+        user_id = self.order_user_entry.get().strip()
+        try:
+            user_id = int(user_id) if user_id else None
+            start_date = self.parse_date(self.order_from_entry.get())
+            end_date = self.parse_date(self.order_to_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "User ID must be a number and dates must look like 2024-01-31")
+            return
+        
+        self.orders_list.load(partial(self.order_dao.get_orders_page, status=None if status == "all" else status,
+                                      start_date=start_date, end_date=end_date, user_id=user_id))
+
+    def parse_date(self, text):
+        """Read an optional YYYY-MM-DD date from a filter entry"""
+        text = text.strip()
+        return date.fromisoformat(text) if text else None
+
+    def show_order_details(self, event):
+        """Show details of selected order"""
+        selection = self.orders_listbox.curselection()
+        if not selection:
+            return
+        
+        order_info = self.orders_listbox.get(selection[0])
+        order_id = int(order_info.split(":")[0])
+        
+        # Clear previous details
+        self.order_details_text.delete(1.0, tk.END)
+        
+        def show(result):
+            order, order_items = result
+            if not order:
+                return
+            
+            details = f"Order #{order.id} - User {order.user_id} - {order.status} - {order.order_date}\n\n"
+            for item in order_items:
+                product_name = item.product_name or "Unknown Product"
+                details += f"- {product_name}: {item.quantity} x ${item.price:.2f} = ${item.quantity * item.price:.2f}\n"
+            details += f"\nTotal: ${order.total_amount:.2f}\n"
+            
+            self.order_details_text.insert(tk.END, details)
+        
+        # Get the order's items with their product names in one query
+        self.runner.submit(self.order_dao.get_order_details, order_id, on_success=show,
+                           key="order_details")
 
     def update_order_status(self):
         """Update the status of selected order"""
@@ -623,14 +751,19 @@ class AdminDashboard:
         order_id = int(order_info.split(":")[0])
         new_status = self.status_var.get()
         
-        if self.order_dao.update_order_status(order_id, new_status):
-            messagebox.showinfo("Success", "Order status updated successfully!")
-            self.load_orders()
-        else:
-            messagebox.showerror("Error", "Failed to update order status")
+        def done(updated):
+            if updated:
+                messagebox.showinfo("Success", "Order status updated successfully!")
+                self.load_orders()
+            else:
+                messagebox.showerror("Error", "Failed to update order status")
+        
+        self.runner.submit(self.order_dao.update_order_status, order_id, new_status, on_success=done)
 
     def show_analytics(self):
         """Open the analytics dashboard"""
+        # Imported here so matplotlib only loads once analytics is opened
+        from .analytics import AnalyticsDashboard
         # Clear the current frame and open analytics
         self.main_frame.destroy()
         AnalyticsDashboard(self.parent, self.user)
\ No newline at end of file
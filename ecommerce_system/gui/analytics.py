@@ -1,10 +1,16 @@
 import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from ..dao.order_dao import OrderDAO
 from ..dao.product_dao import ProductDAO
+from .background import get_runner
+
+
+def load_matplotlib():
+    """Import matplotlib on first use; it takes most of a second to load"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
 
 
 class AnalyticsDashboard:
@@ -13,6 +19,7 @@ class AnalyticsDashboard:
         self.user = user
         self.order_dao = OrderDAO()
         self.product_dao = ProductDAO()
+        self.runner = get_runner(parent)  # Runs DAO calls off the UI thread
         
         # Configure parent window
         self.parent.title(f"Analytics Dashboard - {user.name}")
@@ -61,9 +68,13 @@ class AnalyticsDashboard:
         charts_frame = ctk.CTkFrame(self.content_frame)
         charts_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Get sales data
-        sales_data = self.order_dao.get_sales_report()
-        
+        # Get sales data; switching views supersedes a report still loading
+        self.runner.submit(self.order_dao.get_sales_report,
+                           on_success=lambda sales_data: self.draw_sales(charts_frame, sales_data),
+                           key="report")
+
+    def draw_sales(self, charts_frame, sales_data):
+        """Draw the sales charts and summary"""
         if not sales_data:
             no_data_label = ctk.CTkLabel(charts_frame, text="No sales data available", 
                                          font=ctk.CTkFont(size=14))
@@ -76,7 +87,9 @@ class AnalyticsDashboard:
         revenue = [float(row[2]) for row in sales_data]
         
         # Create figure with subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
+        Figure, FigureCanvasTkAgg = load_matplotlib()
+        fig = Figure(figsize=(10, 8))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Plot orders count
         ax1.plot(dates, orders_count, marker='o', color='blue', label='Orders Count')
@@ -95,7 +108,7 @@ class AnalyticsDashboard:
         ax2.tick_params(axis='x', rotation=45)
         
         # Adjust layout
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Embed the plot in the tkinter frame
         canvas = FigureCanvasTkAgg(fig, charts_frame)
@@ -131,8 +144,12 @@ class AnalyticsDashboard:
         chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # Get top selling products data
-        top_products = self.order_dao.get_top_selling_products()
-        
+        self.runner.submit(self.order_dao.get_top_selling_products,
+                           on_success=lambda top_products: self.draw_top_products(chart_frame, top_products),
+                           key="report")
+
+    def draw_top_products(self, chart_frame, top_products):
+        """Draw the top selling products bar chart"""
         if not top_products:
             no_data_label = ctk.CTkLabel(chart_frame, text="No product data available", 
                                          font=ctk.CTkFont(size=14))
@@ -144,7 +161,9 @@ class AnalyticsDashboard:
         quantities_sold = [row[1] for row in top_products]
         
         # Create figure for bar chart
-        fig, ax = plt.subplots(figsize=(10, 6))
+        Figure, FigureCanvasTkAgg = load_matplotlib()
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
         
         # Create horizontal bar chart
         bars = ax.barh(product_names, quantities_sold, color='orange')
@@ -159,7 +178,7 @@ class AnalyticsDashboard:
                     ha='left', va='center', fontweight='bold')
         
         # Adjust layout
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Embed the plot in the tkinter frame
         canvas = FigureCanvasTkAgg(fig, chart_frame)
@@ -170,5 +189,6 @@ class AnalyticsDashboard:
         """Go back to admin dashboard"""
         # Import here to avoid circular imports
         from .admin_dashboard import AdminDashboard
+        self.runner.cancel("report")
         self.main_frame.destroy()
         AdminDashboard(self.parent, self.user)
\ No newline at end of file
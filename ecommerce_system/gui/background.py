@@ -0,0 +1,104 @@
+import itertools
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from ..config import BACKGROUND_CONFIG
+
+
+class BackgroundRunner:
+    """Runs DAO calls on worker threads and hands results back to the Tk thread.
+
+    Tk widgets may only be touched from the thread running mainloop, so
+    workers put finished results on a queue that the Tk thread drains with
+    after(). A call submitted with a key supersedes any earlier call with the
+    same key that is still queued or running; only the newest result is
+    delivered.
+    """
+
+    def __init__(self, root, max_workers=4, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dao")
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._latest = {}  # key -> ID of the newest task submitted with it
+        self._futures = {}  # key -> Future of that task
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread and call on_success(result) on the Tk thread"""
+        task_id = next(self._ids)
+        if key is not None:
+            self.cancel(key)
+            self._latest[key] = task_id
+
+        def work():
+            try:
+                self._results.put((task_id, key, on_success, on_error, fn(*args, **kwargs), None))
+            except Exception as e:
+                self._results.put((task_id, key, on_success, on_error, None, e))
+
+        future = self._executor.submit(work)
+        if key is not None:
+            self._futures[key] = future
+        self._pending += 1
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return task_id
+
+    def cancel(self, key):
+        """Drop the result of the task running under key, and skip it if it has not started"""
+        future = self._futures.pop(key, None)
+        if future is not None and future.cancel():
+            self._pending -= 1
+        self._latest.pop(key, None)
+
+    def shutdown(self):
+        """Stop accepting work and let running tasks finish in the background"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        """Deliver finished results on the Tk thread"""
+        while True:
+            try:
+                task_id, key, on_success, on_error, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if key is not None:
+                if self._latest.get(key) != task_id:
+                    continue  # Superseded by a newer request
+                del self._latest[key]
+                self._futures.pop(key, None)
+            self._deliver(on_success, on_error, result, error)
+
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _deliver(self, on_success, on_error, result, error):
+        try:
+            if error is not None:
+                if on_error:
+                    on_error(error)
+                else:
+                    print(f"Background task failed: {error}")
+            elif on_success:
+                on_success(result)
+        except tk.TclError:
+            # The widgets the result was meant for have been closed
+            pass
+
+
+_runner = None
+
+
+def get_runner(widget):
+    """Get the application's background runner, creating it on first use"""
+    global _runner
+    if _runner is None:
+        _runner = BackgroundRunner(widget._root(), **BACKGROUND_CONFIG)
+    return _runner
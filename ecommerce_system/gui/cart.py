@@ -1,8 +1,27 @@
 import tkinter as tk
+import uuid
 from tkinter import messagebox
 import customtkinter as ctk
 from ..dao.order_dao import OrderDAO
 from ..dao.product_dao import ProductDAO
+from ..dao.inventory_dao import InventoryDAO
+from .background import get_runner
+
+
+class Cart(list):
+    """The customer's cart lines, {'product': ..., 'quantity': ...}, and the key of their checkout.
+
+    The key outlives the cart window, so retrying a checkout whose outcome
+    was unknown after reopening the cart still cannot place a second order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.checkout_key = None  # Sent with every attempt to check out these contents
+
+    def changed(self):
+        """Forget the checkout key after the contents change, since a different cart is a new checkout"""
+        self.checkout_key = None
 
 
 class CartWindow:
@@ -13,6 +32,8 @@ class CartWindow:
         self.order_dao = order_dao
         self.product_dao = product_dao
         self.callback = callback
+        self.inventory_dao = InventoryDAO()
+        self.runner = get_runner(parent)
         
         # Configure parent window
         self.parent.title("Shopping Cart")
@@ -58,8 +79,8 @@ class CartWindow:
                                         font=ctk.CTkFont(size=14, weight="bold"))
         self.total_label.pack(side="left", padx=10)
         
-        checkout_btn = ctk.CTkButton(total_frame, text="Checkout", command=self.checkout)
-        checkout_btn.pack(side="right", padx=10)
+        self.checkout_btn = ctk.CTkButton(total_frame, text="Checkout", command=self.checkout)
+        self.checkout_btn.pack(side="right", padx=10)
         
         # Load cart items
         self.load_cart_items()
@@ -135,20 +156,35 @@ class CartWindow:
             if new_quantity <= 0:
                 messagebox.showerror("Error", "Quantity must be greater than 0")
                 return
-            
-            product = self.cart[index]['product']
-            if new_quantity > product.stock:
-                messagebox.showerror("Error", f"Only {product.stock} {product.name} in stock!")
-                return
-            
-            self.cart[index]['quantity'] = new_quantity
-            self.load_cart_items()
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number")
+            return
+        
+        item = self.cart[index]
+        product = item['product']
+        
+        def hold():
+            if self.inventory_dao.hold_stock(self.user.id, product.id, new_quantity):
+                return None
+            return self.inventory_dao.get_available_stock(product.id, self.user.id)
+        
+        def done(available):
+            if available is not None:
+                messagebox.showerror("Error", f"Only {available} {product.name} available right now!")
+                return
+            item['quantity'] = new_quantity
+            self.cart.changed()
+            self.load_cart_items()
+        
+        self.runner.submit(hold, on_success=done, key=("cart_hold", product.id))
 
     def remove_from_cart(self, index):
         """Remove an item from the cart"""
+        product_id = self.cart[index]['product'].id
+        self.runner.cancel(("cart_hold", product_id))
+        self.runner.submit(self.inventory_dao.release_hold, self.user.id, product_id)
         del self.cart[index]
+        self.cart.changed()
         self.load_cart_items()
 
     def checkout(self):
@@ -157,13 +193,6 @@ class CartWindow:
             messagebox.showerror("Error", "Your cart is empty!")
             return
         
-        # Check if all items have sufficient stock
-        for item in self.cart:
-            product = item['product']
-            if item['quantity'] > product.stock:
-                messagebox.showerror("Error", f"Insufficient stock for {product.name}")
-                return
-        
         # Calculate total
         total = sum(item['product'].price * item['quantity'] for item in self.cart)
         
@@ -176,14 +205,35 @@ class CartWindow:
                 'price': item['product'].price
             })
         
-        # Create order
-        order_id = self.order_dao.create_order(self.user.id, total, order_items)
-        
-        if order_id:
+        # Create order; stock is checked and taken atomically in the database
+        # Every attempt to check out the same contents sends the same key, so a retry never places a second order
+        if self.cart.checkout_key is None:
+            self.cart.checkout_key = uuid.uuid4().hex
+        self.checkout_btn.configure(state="disabled", text="Placing order...")
+        self.runner.submit(self.order_dao.place_order, self.user.id, total, order_items, self.cart.checkout_key,
+                           on_success=self.on_order_placed, on_error=self.on_order_failed)
+
+    def on_order_placed(self, result):
+        """Report the outcome of a checkout"""
+        order_id, shortfalls = result
+        self.checkout_btn.configure(state="normal", text="Checkout")
+        
+        if shortfalls:
+            names = {item['product'].id: item['product'].name for item in self.cart}
+            lines = [f"{names.get(s['product_id'], 'Unknown Product')}: only {s['available']} available"
+                     for s in shortfalls]
+            messagebox.showerror("Error", "Insufficient stock:\n" + "\n".join(lines))
+        elif order_id:
             messagebox.showinfo("Success", f"Order #{order_id} placed successfully!")
             self.cart.clear()  # Clear the cart after successful order
+            self.cart.changed()
             self.parent.destroy()  # Close the cart window
             if self.callback:
                 self.callback()  # Call the callback function
         else:
-            messagebox.showerror("Error", "Failed to place order. Please try again.")
\ No newline at end of file
+            messagebox.showerror("Error", "Failed to place order. Please try again.")
+
+    def on_order_failed(self, error):
+        """Report a checkout that raised an error"""
+        self.checkout_btn.configure(state="normal", text="Checkout")
+        messagebox.showerror("Error", f"Failed to place order: {error}")
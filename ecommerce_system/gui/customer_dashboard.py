@@ -5,7 +5,10 @@ from ..dao.user_dao import UserDAO
 from ..dao.product_dao import ProductDAO
 from ..dao.category_dao import CategoryDAO
 from ..dao.order_dao import OrderDAO
-from .cart import CartWindow
+from ..dao.inventory_dao import InventoryDAO
+from .cart import Cart, CartWindow
+from .background import get_runner
+from .product_grid import ProductGrid
 
 
 class CustomerDashboard:
@@ -16,7 +19,16 @@ class CustomerDashboard:
         self.product_dao = ProductDAO()
         self.category_dao = CategoryDAO()
         self.order_dao = OrderDAO()
-        self.cart = []  # Cart items
+        self.inventory_dao = InventoryDAO()
+        self.runner = get_runner(parent)  # Runs DAO calls off the UI thread
+        self.cart = Cart()  # Cart items, kept while cart windows are opened and closed
+        self.categories = []
+        self.fetch_page = None  # Fetches the next page of the current product listing
+        self.next_cursor = None
+        self.loading_page = False
+        
+        # Holds left over from a previous session would block other customers
+        self.runner.submit(self.inventory_dao.release_holds, user.id)
         
         # Configure parent window
         self.parent.title(f"Customer Dashboard - {user.name}")
@@ -74,146 +86,110 @@ class CustomerDashboard:
         
         # Category filter
         ctk.CTkLabel(filter_frame, text="Category:").pack(side="left", padx=(20, 5))
-        categories = self.category_dao.get_all_categories()
-        category_names = ["All"] + [cat[1] for cat in categories]  # Add "All" option
         self.category_var = ctk.StringVar(value="All")
-        category_combo = ctk.CTkComboBox(filter_frame, values=category_names, variable=self.category_var)
+        category_combo = ctk.CTkComboBox(filter_frame, values=["All"], variable=self.category_var)
         category_combo.pack(side="left", padx=5)
         category_combo.bind("<Configure>", lambda e: self.filter_products())
         
+        def show_categories(categories):
+            self.categories = categories
+            category_combo.configure(values=["All"] + [cat[1] for cat in categories])  # Add "All" option
+        self.runner.submit(self.category_dao.get_all_categories, on_success=show_categories,
+                           key="categories")
+        
         # Products list
         products_frame = ctk.CTkFrame(self.content_frame)
         products_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Create a frame with canvas and scrollbar for products
-        canvas_frame = ctk.CTkFrame(products_frame)
-        canvas_frame.pack(fill="both", expand=True)
-        
-        self.canvas = tk.Canvas(canvas_frame)
-        scrollbar = ctk.CTkScrollbar(canvas_frame, orientation="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ctk.CTkFrame(self.canvas)
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Only the cards in view are built; the next page is fetched near the end
+        self.product_grid = ProductGrid(products_frame, on_add_to_cart=self.add_to_cart,
+                                        on_near_end=self.on_products_near_end)
+        self.product_grid.pack(fill="both", expand=True)
         
         # Load products
         self.load_products()
 
     def load_products(self):
-        """Load and display all products"""
-        # Clear existing product widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        
-        products = self.product_dao.get_all_products()
-        self.display_products(products)
+        """Load and display the first page of all products"""
+        self.show_product_pages(self.product_dao.get_all_products_page)
 
-    def display_products(self, products):
-        """Display products in the scrollable frame"""
-        # Clear existing product widgets
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def show_product_pages(self, fetch_page):
+        """Display the first page of a listing; later pages are fetched on scroll"""
+        self.fetch_page = fetch_page
+        self.next_cursor = None
+        self.loading_page = True
+        
+        def show_page(page):
+            products, self.next_cursor = page
+            self.loading_page = False
+            self.display_products(products)
+        
+        # A new search or filter supersedes any listing still loading
+        self.runner.submit(fetch_page, None, on_success=show_page, on_error=self.on_page_error,
+                           key="products")
+
+    def load_next_page(self):
+        """Fetch and append the next page of the current listing"""
+        if self.next_cursor is None or self.loading_page:
+            return
+        self.loading_page = True
         
-        # Display products in a grid
-        row_frame = None
-        col_count = 0
+        def append_page(page):
+            products, self.next_cursor = page
+            self.loading_page = False
+            self.display_products(products, append=True)
         
-        for i, product in enumerate(products):
-            if col_count == 0:  # Start a new row every 3 products
-                row_frame = ctk.CTkFrame(self.scrollable_frame)
-                row_frame.pack(fill="x", padx=5, pady=5)
-                col_count = 0
-            
-            # Create product card
-            product_frame = ctk.CTkFrame(row_frame)
-            product_frame.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-            
-            # Product image if available
-            if product.image and product.image != "No image selected":
-                try:
-                    from PIL import Image, ImageTk
-                    # Load and resize image
-                    img = Image.open(product.image)
-                    img = img.resize((100, 100), Image.Resampling.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    
-                    # Store reference to prevent garbage collection
-                    img_label = ctk.CTkLabel(product_frame, image=photo, text="")
-                    img_label.image = photo  # Keep a reference
-                    img_label.pack(pady=5)
-                except Exception:
-                    # If image loading fails, show a placeholder
-                    img_label = ctk.CTkLabel(product_frame, text="No Image", height=100)
-                    img_label.pack(pady=5)
-            else:
-                img_label = ctk.CTkLabel(product_frame, text="No Image", height=100)
-                img_label.pack(pady=5)
-            
-            # Product details
-            name_label = ctk.CTkLabel(product_frame, text=product.name, 
-                                      font=ctk.CTkFont(size=14, weight="bold"))
-            name_label.pack(pady=5)
-            
-            desc_label = ctk.CTkLabel(product_frame, text=product.description or "No description", 
-                                      wraplength=150)
-            desc_label.pack(pady=2)
-            
-            price_label = ctk.CTkLabel(product_frame, text=f"${product.price:.2f}")
-            price_label.pack(pady=2)
-            
-            stock_label = ctk.CTkLabel(product_frame, text=f"In Stock: {product.stock}")
-            stock_label.pack(pady=2)
-            
-            # Add to cart button
-            add_to_cart_btn = ctk.CTkButton(
-                product_frame, 
-                text="Add to Cart", 
-                command=lambda p=product: self.add_to_cart(p)
-            )
-            add_to_cart_btn.pack(pady=5)
-            
-            col_count += 1
-            if col_count >= 3:  # 3 products per row
-                col_count = 0
+        self.runner.submit(self.fetch_page, self.next_cursor, on_success=append_page,
+                           on_error=self.on_page_error, key="products")
+
+    def on_page_error(self, error):
+        """Report a failed product listing"""
+        self.loading_page = False
+        messagebox.showerror("Error", f"Failed to load products: {error}")
+
+    def on_products_near_end(self):
+        """Fetch another page when the end of the listing comes into view"""
+        if self.next_cursor is not None and not self.loading_page:
+            self.parent.after_idle(self.load_next_page)
+
+    def display_products(self, products, append=False):
+        """Display products in the product grid"""
+        if append:
+            self.product_grid.append_products(products)
+        else:
+            self.product_grid.set_products(products)
 
     def search_products(self):
-        """Search products by name"""
+        """Search products by name and description within the selected category"""
         search_term = self.search_entry.get().strip()
         if search_term:
-            products = self.product_dao.get_products_by_name(search_term)
+            category_id = self.selected_category_id()
+            self.show_product_pages(
+                lambda cursor: self.product_dao.get_products_by_name_page(
+                    search_term, cursor, category_id=category_id))
         else:
-            products = self.product_dao.get_all_products()
+            self.filter_products()
+
+    def selected_category_id(self):
+        """Get the ID of the selected category, or None for all categories"""
+        selected_category = self.category_var.get()
+        if selected_category == "All" or not selected_category:
+            return None
         
-        self.display_products(products)
+        # Get category ID by name
+        for cat in self.categories:
+            if cat[1] == selected_category:
+                return cat[0]
+        return None
 
     def filter_products(self):
         """Filter products by category"""
-        selected_category = self.category_var.get()
-        if selected_category == "All" or not selected_category:
-            products = self.product_dao.get_all_products()
+        category_id = self.selected_category_id()
+        if category_id:
+            self.show_product_pages(
+                lambda cursor: self.product_dao.get_products_by_category_page(category_id, cursor))
         else:
-            # Get category ID by name
-            categories = self.category_dao.get_all_categories()
-            category_id = None
-            for cat in categories:
-                if cat[1] == selected_category:
-                    category_id = cat[0]
-                    break
-            
-            if category_id:
-                products = self.product_dao.get_products_by_category(category_id)
-            else:
-                products = []
-        
-        self.display_products(products)
+            self.show_product_pages(self.product_dao.get_all_products_page)
 
     def add_to_cart(self, product):
         """Add a product to the cart"""
@@ -232,8 +208,11 @@ class CustomerDashboard:
                     maxvalue=product.stock - item['quantity']
                 )
                 if quantity:
-                    item['quantity'] += quantity
-                    messagebox.showinfo("Success", f"Added {quantity} more {product.name} to cart!")
+                    def add_more():
+                        item['quantity'] += quantity
+                        self.cart.changed()
+                        messagebox.showinfo("Success", f"Added {quantity} more {product.name} to cart!")
+                    self.hold_stock(product, item['quantity'] + quantity, add_more)
                 return
         
         # Ask for quantity
@@ -244,11 +223,29 @@ class CustomerDashboard:
             maxvalue=product.stock
         )
         if quantity:
-            self.cart.append({
-                'product': product,
-                'quantity': quantity
-            })
-            messagebox.showinfo("Success", f"Added {quantity} {product.name} to cart!")
+            def add():
+                self.cart.append({
+                    'product': product,
+                    'quantity': quantity
+                })
+                self.cart.changed()
+                messagebox.showinfo("Success", f"Added {quantity} {product.name} to cart!")
+            self.hold_stock(product, quantity, add)
+
+    def hold_stock(self, product, quantity, on_held):
+        """Reserve stock for a cart line in the background, then call on_held"""
+        def hold():
+            if self.inventory_dao.hold_stock(self.user.id, product.id, quantity):
+                return None
+            return self.inventory_dao.get_available_stock(product.id, self.user.id)
+        
+        def done(available):
+            if available is None:
+                on_held()
+            else:
+                messagebox.showerror("Error", f"Only {available} {product.name} available right now!")
+        
+        self.runner.submit(hold, on_success=done)
 
     def show_cart(self):
         """Show the shopping cart"""
@@ -295,9 +292,12 @@ class CustomerDashboard:
     def load_orders(self):
         """Load and display user's orders"""
         self.orders_listbox.delete(0, tk.END)
-        orders = self.order_dao.get_orders_by_user(self.user.id)
-        for order in orders:
-            self.orders_listbox.insert(tk.END, f"{order.id}: ${order.total_amount:.2f} - {order.status}")
+        
+        def show(rows):
+            for order_id, _, total_amount, status, _ in rows:
+                self.orders_listbox.insert(tk.END, f"{order_id}: ${total_amount:.2f} - {status}")
+        self.runner.submit(self.order_dao.get_orders_by_user, self.user.id, raw=True, on_success=show,
+                           key="orders")
         
         # Bind selection event
         self.orders_listbox.bind('<<ListboxSelect>>', self.show_order_details)
@@ -314,15 +314,18 @@ class CustomerDashboard:
         # Clear previous details
         self.order_details_text.delete(1.0, tk.END)
         
-        # Get order items
-        order_items = self.order_dao.get_order_items(order_id)
-        
-        # Display order items
-        details = f"Order #{order_id} Details:\n\n"
-        for item in order_items:
-            # Get product name
-            product = self.product_dao.get_product_by_id(item.product_id)
-            product_name = product.name if product else "Unknown Product"
-            details += f"- {product_name}: {item.quantity} x ${item.price:.2f} = ${item.quantity * item.price:.2f}\n"
+        def show(result):
+            order, order_items = result
+            
+            # Display order items
+            details = f"Order #{order_id} Details:\n\n"
+            for item in order_items:
+                product_name = item.product_name or "Unknown Product"
+                details += f"- {product_name}: {item.quantity} x ${item.price:.2f} = ${item.quantity * item.price:.2f}\n"
+            
+            self.order_details_text.insert(tk.END, details)
         
-        self.order_details_text.insert(tk.END, details)
\ No newline at end of file
+        # Get the order's items with their product names in one query; a newer
+        # selection supersedes one still loading
+        self.runner.submit(self.order_dao.get_order_details, order_id, self.user.id,
+                           on_success=show, key="order_details")
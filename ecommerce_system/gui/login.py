@@ -2,14 +2,16 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from ..dao.user_dao import UserDAO
-from .admin_dashboard import AdminDashboard
-from .customer_dashboard import CustomerDashboard
+from ..utils.security import LoginThrottledError
+from .background import get_runner
 
 
 class LoginWindow:
-    def __init__(self, parent):
+    def __init__(self, parent, ready=True):
         self.parent = parent
+        self.ready = ready  # False while the database is still being connected
         self.user_dao = UserDAO()
+        self.runner = get_runner(parent)  # Password hashing runs off the UI thread
         
         # Create login frame
         self.login_frame = ctk.CTkFrame(parent)
@@ -29,17 +31,27 @@ class LoginWindow:
         self.password_entry.pack(pady=10)
         
         # Login button
-        self.login_button = ctk.CTkButton(self.login_frame, text="Login", command=self.login)
+        state = "normal" if ready else "disabled"
+        self.login_button = ctk.CTkButton(self.login_frame, text="Login", command=self.login, state=state)
         self.login_button.pack(pady=10)
         
         # Register button
-        self.register_button = ctk.CTkButton(self.login_frame, text="Register", command=self.show_register)
+        self.register_button = ctk.CTkButton(self.login_frame, text="Register", command=self.show_register,
+                                             state=state)
         self.register_button.pack(pady=5)
         
         # Bind Enter key to login
         parent.bind('<Return>', lambda event: self.login())
 
+    def set_ready(self):
+        """Allow logging in once the database is connected"""
+        self.ready = True
+        self.login_button.configure(state="normal")
+        self.register_button.configure(state="normal")
+
     def login(self):
+        if not self.ready:
+            return
         email = self.email_entry.get().strip()
         password = self.password_entry.get().strip()
         
@@ -47,18 +59,33 @@ class LoginWindow:
             messagebox.showerror("Error", "Please enter both email and password")
             return
         
-        user = self.user_dao.authenticate_user(email, password)
+        self.login_button.configure(state="disabled")
+        self.runner.submit(self.user_dao.authenticate_user, email, password,
+                           on_success=self.on_login, on_error=self.on_login_error)
+
+    def on_login(self, user):
+        self.login_button.configure(state="normal")
         if user:
             # Close login window and open dashboard based on user role
             self.login_frame.destroy()
             
+            # Dashboards are imported here so the login window doesn't wait for them
             if user.role == "admin":
+                from .admin_dashboard import AdminDashboard
                 AdminDashboard(self.parent, user)
             else:
+                from .customer_dashboard import CustomerDashboard
                 CustomerDashboard(self.parent, user)
         else:
             messagebox.showerror("Error", "Invalid email or password")
 
+    def on_login_error(self, error):
+        self.login_button.configure(state="normal")
+        if isinstance(error, LoginThrottledError):
+            messagebox.showerror("Error", f"Too many failed attempts. Try again in {error.retry_after} seconds.")
+        else:
+            messagebox.showerror("Error", f"Login failed: {error}")
+
     def show_register(self):
         # Create registration frame
         self.login_frame.destroy()
@@ -113,21 +140,28 @@ class LoginWindow:
             messagebox.showerror("Error", "Password must be at least 8 characters long")
             return
         
-        # Check if user already exists
-        existing_user = self.user_dao.get_user_by_email(email)
-        if existing_user:
-            messagebox.showerror("Error", "User with this email already exists")
-            return
-        
         # Create new user
         from ..models.user import User
         new_user = User(name=name, email=email, password=password, role='customer')
         
-        if self.user_dao.create_user(new_user):
-            messagebox.showinfo("Success", "Registration successful! Please login.")
-            self.show_login()
-        else:
-            messagebox.showerror("Error", "Registration failed. Please try again.")
+        def create():
+            # Check if user already exists
+            if self.user_dao.get_user_by_email(email):
+                return None
+            return self.user_dao.create_user(new_user)
+        
+        def done(created):
+            self.register_button.configure(state="normal")
+            if created is None:
+                messagebox.showerror("Error", "User with this email already exists")
+            elif created:
+                messagebox.showinfo("Success", "Registration successful! Please login.")
+                self.show_login()
+            else:
+                messagebox.showerror("Error", "Registration failed. Please try again.")
+        
+        self.register_button.configure(state="disabled")
+        self.runner.submit(create, on_success=done, on_error=lambda e: done(False))
 
     def show_login(self):
         # Destroy register frame and show login
@@ -0,0 +1,74 @@
+import tkinter as tk
+import customtkinter as ctk
+
+# Fetch the next page when fewer than this fraction of the lines remain below the view
+PREFETCH_FRACTION = 0.2
+
+
+class PagedListbox(ctk.CTkFrame):
+    """A Listbox filled a page at a time as the user scrolls.
+
+    ``fetch_page(cursor)`` runs on a worker thread and returns
+    ``(items, next_cursor)``, with a next_cursor of None on the last page.
+    The next page is requested when the end of the list comes into view, so
+    only the pages looked at are ever loaded.
+    """
+
+    def __init__(self, master, runner, format_item, noun="items", key=None):
+        super().__init__(master)
+        self.runner = runner
+        self.format_item = format_item  # Turns an item into its line of text
+        self.noun = noun
+        # Background task key; loading a new listing supersedes the old one, but not other lists' loads
+        self.key = key or f"list-{id(self)}"
+        self.fetch_page = None
+        self.next_cursor = None
+        self.loading = False
+        self.count = 0
+
+        self.status_label = ctk.CTkLabel(self, text="", anchor="w")
+        self.status_label.pack(side="bottom", fill="x", padx=5)
+
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.listbox = tk.Listbox(self, yscrollcommand=self.on_scroll)
+        self.listbox.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+
+    def load(self, fetch_page):
+        """Clear the list and show the first page of a listing"""
+        self.fetch_page = fetch_page
+        self.next_cursor = None
+        self.count = 0
+        self.listbox.delete(0, tk.END)
+        self.load_page(None)
+
+    def load_page(self, cursor):
+        self.loading = True
+        self.status_label.configure(text="Loading...")
+        self.runner.submit(self.fetch_page, cursor, on_success=self.show_page, on_error=self.on_error,
+                           key=self.key)
+
+    def show_page(self, page):
+        items, self.next_cursor = page
+        self.loading = False
+        for item in items:
+            self.listbox.insert(tk.END, self.format_item(item))
+        self.count += len(items)
+        more = ", scroll for more" if self.next_cursor is not None else ""
+        self.status_label.configure(text=f"{self.count} {self.noun}{more}")
+        # A page that doesn't fill the view never scrolls, so check for the end now too
+        self.on_scroll(*self.listbox.yview())
+
+    def on_error(self, error):
+        self.loading = False
+        self.status_label.configure(text=f"Failed to load {self.noun}: {error}")
+
+    def on_scroll(self, first, last):
+        """Listbox yscrollcommand: move the scrollbar and fetch more near the end"""
+        self.scrollbar.set(first, last)
+        if self.next_cursor is not None and not self.loading and float(last) >= 1 - PREFETCH_FRACTION:
+            self.load_page(self.next_cursor)
+
+    def yview(self, *args):
+        self.listbox.yview(*args)
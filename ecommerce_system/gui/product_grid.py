@@ -0,0 +1,270 @@
+import math
+import sys
+from collections import OrderedDict
+import customtkinter as ctk
+from ..config import THUMBNAIL_CONFIG
+from ..utils.thumbnails import load_thumbnail
+from .background import get_runner
+
+# Cards per row and the fixed height of one row of cards, in pixels
+COLUMNS = 3
+ROW_HEIGHT = 300
+
+# Rows built beyond the visible ones so a small scroll never shows a gap
+OVERSCAN_ROWS = 1
+
+# Pixels moved per mouse wheel notch or scroll arrow click
+SCROLL_STEP = 60
+
+# Ask for more products when the view is within this many rows of the end
+PREFETCH_ROWS = 3
+
+
+class ProductCard:
+    """One product card; its widgets are created once and reused for other products"""
+
+    def __init__(self, master, on_add_to_cart):
+        self.on_add_to_cart = on_add_to_cart
+        self.product = None
+
+        self.frame = ctk.CTkFrame(master)
+        self.img_label = ctk.CTkLabel(self.frame, text="No Image", height=100)
+        self.img_label.pack(pady=5)
+
+        self.name_label = ctk.CTkLabel(self.frame, text="", font=ctk.CTkFont(size=14, weight="bold"))
+        self.name_label.pack(pady=5)
+
+        self.desc_label = ctk.CTkLabel(self.frame, text="", wraplength=150)
+        self.desc_label.pack(pady=2)
+
+        self.price_label = ctk.CTkLabel(self.frame, text="")
+        self.price_label.pack(pady=2)
+
+        self.stock_label = ctk.CTkLabel(self.frame, text="")
+        self.stock_label.pack(pady=2)
+
+        self.add_to_cart_btn = ctk.CTkButton(self.frame, text="Add to Cart", command=self.add_to_cart)
+        self.add_to_cart_btn.pack(pady=5)
+
+    def show(self, product, photo, loading=False):
+        """Fill the card with a product"""
+        self.product = product
+        self.show_image(photo, loading)
+        self.name_label.configure(text=product.name)
+        self.desc_label.configure(text=product.description or "No description")
+        self.price_label.configure(text=f"${product.price:.2f}")
+        self.stock_label.configure(text=f"In Stock: {product.stock}")
+
+    def show_image(self, photo, loading=False):
+        """Show a thumbnail, or a placeholder while it loads or if there is none"""
+        if photo is not None:
+            self.img_label.configure(image=photo, text="")
+        else:
+            self.img_label.configure(image="", text="Loading..." if loading else "No Image")
+
+    def add_to_cart(self):
+        if self.product is not None:
+            self.on_add_to_cart(self.product)
+
+
+class ProductGrid(ctk.CTkFrame):
+    """A scrolling grid of product cards that only builds the rows in view.
+
+    Rows have a fixed height, so the rows visible at any scroll position can
+    be computed directly. A small pool of row widgets is kept and, as the view
+    scrolls, rows that leave it are moved and refilled with the products that
+    come into it. Widget count therefore depends on the window height, not on
+    the number of products.
+
+    Card images are thumbnails decoded on worker threads. A card shows a
+    placeholder until its thumbnail arrives and the image is swapped in.
+    """
+
+    def __init__(self, master, on_add_to_cart, on_near_end=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_add_to_cart = on_add_to_cart
+        self.on_near_end = on_near_end
+        self.products = []
+        self.offset = 0  # Pixels scrolled from the top
+        self.slots = []  # Recycled rows: [frame, cards, index of the row shown or None]
+        self.images = OrderedDict()  # path -> PhotoImage, least recently used first
+        self.loading_images = set()  # Paths being decoded on a worker thread
+        self.visible_images = set()  # Paths shown by the rows in view
+        self.missing_images = set()  # Paths that could not be decoded
+        self.runner = get_runner(self)
+
+        self.viewport = ctk.CTkFrame(self)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport.bind("<Configure>", lambda e: self.layout())
+        # Scroll with the wheel only while the pointer is over the grid
+        self.viewport.bind("<Enter>", lambda e: self.bind_mousewheel())
+        self.viewport.bind("<Leave>", lambda e: self.unbind_mousewheel())
+
+    def set_products(self, products):
+        """Show a new list of products from the top"""
+        self.products = list(products)
+        self.offset = 0
+        self.missing_images.clear()  # Retry images that may have been fixed since
+        for slot in self.slots:
+            slot[2] = None
+        self.layout()
+
+    def append_products(self, products):
+        """Add products to the end of the list, keeping the scroll position"""
+        if not products:
+            return
+        last_row = self.row_count() - 1
+        self.products.extend(products)
+        # The old last row may have been partly empty
+        for slot in self.slots:
+            if slot[2] == last_row:
+                slot[2] = None
+        self.layout()
+
+    def row_count(self):
+        return math.ceil(len(self.products) / COLUMNS)
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.row_count() * ROW_HEIGHT)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else SCROLL_STEP
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def scroll_to(self, offset):
+        """Scroll so the given pixel offset is at the top of the view"""
+        self.offset = offset
+        self.layout()
+
+    def bind_mousewheel(self):
+        if sys.platform.startswith("linux"):
+            self.viewport.bind_all("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+            self.viewport.bind_all("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+        else:
+            self.viewport.bind_all("<MouseWheel>", self.on_mousewheel)
+
+    def unbind_mousewheel(self):
+        for sequence in ("<Button-4>", "<Button-5>", "<MouseWheel>"):
+            self.viewport.unbind_all(sequence)
+
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small raw deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.yview("scroll", -delta, "units")
+
+    def layout(self):
+        """Place and fill the rows visible at the current scroll position"""
+        height = self.viewport.winfo_height()
+        if height <= 1:
+            return  # Not mapped yet; <Configure> calls again once it is
+
+        rows = self.row_count()
+        content_height = rows * ROW_HEIGHT
+        self.offset = int(max(0, min(self.offset, content_height - height)))
+
+        needed = height // ROW_HEIGHT + 1 + OVERSCAN_ROWS
+        if len(self.slots) < needed:
+            while len(self.slots) < needed:
+                self.slots.append(self.create_row())
+            # Rows map to slots by index modulo pool size, which just changed
+            for slot in self.slots:
+                slot[2] = None
+
+        first = self.offset // ROW_HEIGHT
+        last = min(first + len(self.slots), rows)
+        # Set before filling rows, since workers consult it to skip stale decodes
+        self.visible_images = {product.image for product in self.products[first * COLUMNS:last * COLUMNS]
+                               if product.image}
+        shown = set()
+        for index in range(first, last):
+            slot = self.slots[index % len(self.slots)]
+            shown.add(id(slot))
+            if slot[2] != index:
+                self.fill_row(slot, index)
+            slot[0].place(x=0, y=index * ROW_HEIGHT - self.offset, relwidth=1.0, height=ROW_HEIGHT)
+        for slot in self.slots:
+            if id(slot) not in shown:
+                slot[0].place_forget()
+                slot[2] = None
+
+        if content_height > 0:
+            self.scrollbar.set(self.offset / content_height, min(1.0, (self.offset + height) / content_height))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.on_near_end and (self.offset + height) >= content_height - PREFETCH_ROWS * ROW_HEIGHT:
+            self.on_near_end()
+
+    def create_row(self):
+        """Build a row frame with a full set of cards"""
+        frame = ctk.CTkFrame(self.viewport)
+        cards = []
+        for column in range(COLUMNS):
+            frame.grid_columnconfigure(column, weight=1, uniform="card")
+            cards.append(ProductCard(frame, self.on_add_to_cart))
+        frame.grid_rowconfigure(0, weight=1)
+        return [frame, cards, None]
+
+    def fill_row(self, slot, index):
+        """Show the products of one grid row in a recycled row frame"""
+        frame, cards, _ = slot
+        start = index * COLUMNS
+        for column, card in enumerate(cards):
+            if start + column < len(self.products):
+                product = self.products[start + column]
+                photo = self.get_image(product.image)
+                card.show(product, photo, loading=photo is None and product.image in self.loading_images)
+                card.frame.grid(row=0, column=column, padx=5, pady=5, sticky="nsew")
+            else:
+                card.frame.grid_remove()
+        slot[2] = index
+
+    def get_image(self, path):
+        """Get a decoded thumbnail, or start decoding it and return None"""
+        if not path or path == "No image selected" or path in self.missing_images:
+            return None
+        photo = self.images.get(path)
+        if photo is not None:
+            self.images.move_to_end(path)
+            return photo
+        if path not in self.loading_images:
+            self.loading_images.add(path)
+            self.runner.submit(self.decode_image, path,
+                               on_success=lambda img: self.image_decoded(path, img),
+                               on_error=lambda e: self.loading_images.discard(path))
+        return None
+
+    def decode_image(self, path):
+        """Load a thumbnail on a worker thread, skipping images scrolled out of view"""
+        if path not in self.visible_images:
+            return False
+        return load_thumbnail(path)
+
+    def image_decoded(self, path, img):
+        """Cache a decoded thumbnail and swap it into the cards showing it"""
+        self.loading_images.discard(path)
+        if img is False:
+            # Skipped while out of view; decode it after all if it came back
+            if path in self.visible_images:
+                self.get_image(path)
+            return
+        if img is None:
+            photo = None
+            self.missing_images.add(path)
+        else:
+            from PIL import ImageTk
+            # PhotoImages belong to the Tk thread, so they are made here
+            photo = ImageTk.PhotoImage(img)
+            self.images[path] = photo
+            if len(self.images) > THUMBNAIL_CONFIG['memory_cache_size']:
+                self.images.popitem(last=False)
+        for slot in self.slots:
+            if slot[2] is None:
+                continue
+            for card in slot[1]:
+                if card.product is not None and card.product.image == path:
+                    card.show_image(photo)
@@ -1,44 +1,99 @@
-import tkinter as tk
-from tkinter import messagebox
-import customtkinter as ctk
-from db.db_connection import db
-from dao.user_dao import UserDAO
-from dao.product_dao import ProductDAO
-from dao.category_dao import CategoryDAO
-from dao.order_dao import OrderDAO
-from gui.login import LoginWindow
+"""
+Desktop client. Run from the repository root:
+
+    python -m ecommerce_system.main [--profile-startup]
+
+The login window is shown straight away; connecting to the database and
+checking the schema happen in the background, and the login button is
+enabled once they finish.
+"""
+import argparse
+import sys
+from .utils.startup_profile import StartupProfiler
 
 
 class ECommerceApp:
-    def __init__(self):
-        # Initialize database connection
-        if not db.connect():
-            messagebox.showerror("Database Error", "Failed to connect to database!")
-            return
-        
-        # Create tables if they don't exist
-        user_dao = UserDAO()
-        product_dao = ProductDAO()
-        category_dao = CategoryDAO()
-        order_dao = OrderDAO()
-        
-        user_dao.create_table()
-        category_dao.create_table()  # Categories need to be created before products
-        product_dao.create_table()
-        order_dao.create_tables()
-        
+    def __init__(self, profiler=None):
+        self.profiler = profiler or StartupProfiler()
+
+        # Imported here so --profile-startup can time them
+        with self.profiler.phase("import customtkinter"):
+            import customtkinter as ctk
+        with self.profiler.phase("import login window"):
+            from .gui.background import get_runner
+            from .gui.login import LoginWindow
+
         # Initialize the login window
-        self.root = ctk.CTk()
-        self.root.title("E-Commerce Management System")
-        self.root.geometry("400x300")
-        self.root.resizable(False, False)
-        
+        with self.profiler.phase("create window"):
+            self.root = ctk.CTk()
+            self.root.title("E-Commerce Management System")
+            self.root.geometry("400x300")
+            self.root.resizable(False, False)
+
         # Initialize login window
-        LoginWindow(self.root)
-        
+        with self.profiler.phase("build login form"):
+            self.login_window = LoginWindow(self.root, ready=False)
+        self.root.after_idle(self.profiler.report, "Login window shown")
+
+        # Connect and migrate off the UI thread
+        get_runner(self.root).submit(self.prepare_database, on_success=self.on_database_ready,
+                                     on_error=self.on_database_error)
+
+    def prepare_database(self):
+        """Connect to the database and apply pending schema migrations"""
+        with self.profiler.phase("connect to database"):
+            from .db.db_connection import db
+            if not db.connect():
+                raise RuntimeError("Failed to connect to database!")
+
+        # A current schema costs a single query
+        with self.profiler.phase("check schema"):
+            from .db.migrate import MigrationRunner
+            try:
+                MigrationRunner().upgrade()
+            except Exception as e:
+                raise RuntimeError(f"Failed to migrate database schema: {e}")
+
+    def on_database_ready(self, result):
+        self.login_window.set_ready()
+        self.profiler.report("Database ready")
+        self.purge_expired_holds()
+
+    def purge_expired_holds(self):
+        """Delete expired cart holds in the background, then again every few minutes"""
+        from .config import INVENTORY_CONFIG
+        from .dao.inventory_dao import InventoryDAO
+        from .gui.background import get_runner
+        get_runner(self.root).submit(InventoryDAO().purge_expired_holds, key="purge_expired_holds")
+        self.root.after(INVENTORY_CONFIG['purge_minutes'] * 60 * 1000, self.purge_expired_holds)
+
+    def on_database_error(self, error):
+        from tkinter import messagebox
+        messagebox.showerror("Database Error", str(error))
+        self.root.destroy()
+
+    def run(self):
         # Start the application
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            from .config import INSTRUMENTATION_CONFIG
+            from .db.db_connection import db
+            from .db.instrumentation import query_stats
+            db.disconnect()
+            if INSTRUMENTATION_CONFIG['export_path']:
+                query_stats.write_json(INSTRUMENTATION_CONFIG['export_path'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="E-Commerce Management System")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase takes")
+    args = parser.parse_args()
+
+    ECommerceApp(StartupProfiler(args.profile_startup)).run()
+    return 0
 
 
 if __name__ == "__main__":
-    app = ECommerceApp()
\ No newline at end of file
+    sys.exit(main())
@@ -1,4 +1,9 @@
 class Order:
+    __slots__ = ('id', 'user_id', 'total_amount', 'status', 'order_date')
+
+    # Column list matching from_row, for SELECT statements
+    COLUMNS = "id, user_id, total_amount, status, order_date"
+
     def __init__(self, order_id=None, user_id=None, total_amount=None, status=None, order_date=None):
         self.id = order_id
         self.user_id = user_id
@@ -6,6 +11,13 @@ class Order:
         self.status = status  # 'pending', 'paid', 'shipped', 'delivered'
         self.order_date = order_date
 
+    @classmethod
+    def from_row(cls, row):
+        """Build an Order from a row selected with COLUMNS"""
+        order = object.__new__(cls)
+        order.id, order.user_id, order.total_amount, order.status, order.order_date = row
+        return order
+
     def __str__(self):
         return f"Order(id={self.id}, user_id={self.user_id}, total_amount={self.total_amount}, status='{self.status}')"
 
@@ -20,12 +32,27 @@ class Order:
 
 
 class OrderItem:
-    def __init__(self, item_id=None, order_id=None, product_id=None, quantity=None, price=None):
+    __slots__ = ('id', 'order_id', 'product_id', 'quantity', 'price', 'product_name')
+
+    # Column list matching from_row, for SELECT statements
+    COLUMNS = "id, order_id, product_id, quantity, price"
+
+    def __init__(self, item_id=None, order_id=None, product_id=None, quantity=None, price=None,
+                 product_name=None):
         self.id = item_id
         self.order_id = order_id
         self.product_id = product_id
         self.quantity = quantity
         self.price = price
+        self.product_name = product_name  # Filled in by joined order detail queries
+
+    @classmethod
+    def from_row(cls, row):
+        """Build an OrderItem from a row selected with COLUMNS, optionally followed by the product name"""
+        item = object.__new__(cls)
+        item.id, item.order_id, item.product_id, item.quantity, item.price = row[:5]
+        item.product_name = row[5] if len(row) > 5 else None
+        return item
 
     def __str__(self):
         return f"OrderItem(id={self.id}, order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity})"
@@ -36,5 +63,6 @@ class OrderItem:
             'order_id': self.order_id,
             'product_id': self.product_id,
             'quantity': self.quantity,
-            'price': self.price
+            'price': self.price,
+            'product_name': self.product_name
         }
\ No newline at end of file
@@ -1,4 +1,9 @@
 class Product:
+    __slots__ = ('id', 'category_id', 'name', 'description', 'price', 'stock', 'image', 'created_at')
+
+    # Column list matching from_row, for SELECT statements
+    COLUMNS = "id, category_id, name, description, price, stock, image, created_at"
+
     def __init__(self, product_id=None, category_id=None, name=None, description=None, 
                  price=None, stock=None, image=None, created_at=None):
         self.id = product_id
@@ -10,6 +15,14 @@ class Product:
         self.image = image
         self.created_at = created_at
 
+    @classmethod
+    def from_row(cls, row):
+        """Build a Product from a row selected with COLUMNS"""
+        product = object.__new__(cls)
+        (product.id, product.category_id, product.name, product.description,
+         product.price, product.stock, product.image, product.created_at) = row
+        return product
+
     def __str__(self):
         return f"Product(id={self.id}, name='{self.name}', price={self.price}, stock={self.stock})"
 
@@ -1,4 +1,9 @@
 class User:
+    __slots__ = ('id', 'name', 'email', 'password', 'role', 'created_at')
+
+    # Column list matching from_row, for SELECT statements
+    COLUMNS = "id, name, email, password, role, created_at"
+
     def __init__(self, user_id=None, name=None, email=None, password=None, role=None, created_at=None):
         self.id = user_id
         self.name = name
@@ -7,6 +12,13 @@ class User:
         self.role = role  # 'admin' or 'customer'
         self.created_at = created_at
 
+    @classmethod
+    def from_row(cls, row):
+        """Build a User from a row selected with COLUMNS"""
+        user = object.__new__(cls)
+        user.id, user.name, user.email, user.password, user.role, user.created_at = row
+        return user
+
     def __str__(self):
         return f"User(id={self.id}, name='{self.name}', email='{self.email}', role='{self.role}')"
 
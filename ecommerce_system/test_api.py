@@ -0,0 +1,130 @@
+"""
+Tests for the HTTP API server and its routes
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from .api.routes import login_source, router
+from .api.server import HTTPServer, Request
+from .config import API_CONFIG, SECURITY_CONFIG
+from .dao.product_dao import ProductDAO
+from .dao.user_dao import UserDAO
+from .models.product import Product
+from .models.user import User
+
+
+def request_from(client_ip, headers=None):
+    return Request("POST", "/api/login", "HTTP/1.1", headers or {}, b"", client_ip)
+
+
+def test_logins_are_counted_per_account_only_by_default():
+    assert login_source(request_from("10.0.0.5")) is None
+
+
+def test_peer_address_is_used_when_clients_connect_directly(monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'throttle_peer_address', True)
+    assert login_source(request_from("203.0.113.9", {"x-forwarded-for": "198.51.100.1"})) == "203.0.113.9"
+
+
+def test_forwarded_address_is_trusted_only_from_configured_proxies(monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'trusted_proxies', ("10.0.0.2", "10.0.0.3"))
+    # A client can put anything first; the entry the outermost trusted proxy appended is used
+    forwarded = {"x-forwarded-for": "1.2.3.4, 198.51.100.7, 10.0.0.3"}
+    assert login_source(request_from("10.0.0.2", forwarded)) == "198.51.100.7"
+    assert login_source(request_from("10.0.0.2")) is None
+    assert login_source(request_from("203.0.113.9", forwarded)) is None
+
+
+@pytest.fixture
+def shop(database, monkeypatch):
+    """A customer, ann@example.com, and a product (ID 1) with 10 in stock"""
+    monkeypatch.setitem(SECURITY_CONFIG, 'bcrypt_rounds', 4)
+    assert UserDAO().create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+    assert ProductDAO().create_product(Product(name="Lamp", description="", price=Decimal("5.00"), stock=10))
+
+
+@pytest.fixture
+def call(shop):
+    """Send raw request bytes to an HTTPServer over the routes; returns (status, headers, body)"""
+    executor = ThreadPoolExecutor(max_workers=2)
+    server = HTTPServer(router, executor, keep_alive_timeout=5, max_body_bytes=1024)
+
+    async def exchange(raw):
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        async with listener:
+            port = listener.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()  # The server closes the connection after answering
+            writer.close()
+        head, _, body = response.partition(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in header_lines)
+        return int(status_line.split()[1]), headers, body
+
+    yield lambda raw: asyncio.run(exchange(raw))
+    executor.shutdown()
+
+
+def request(method, path, body=None, headers=None):
+    """Encode a request that asks the server to close the connection after answering"""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: test", "Connection: close",
+             f"Content-Length: {len(payload)}"]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def log_in(call):
+    status, _, body = call(request("POST", "/api/login", {"email": "ann@example.com", "password": "secret123"}))
+    assert status == 200
+    return {"Authorization": f"Bearer {json.loads(body)['token']}"}
+
+
+def test_malformed_requests_are_rejected(call):
+    assert call(b"GET /api/health\r\n\r\n")[0] == 400
+    assert call(b"GET /api/health HTTP/1.1\r\nno colon here\r\n\r\n")[0] == 400
+    assert call(b"GET /api/health HTTP/1.1\r\nContent-Length: many\r\n\r\n")[0] == 400
+    assert call(b"GET /api/health HTTP/2.0\r\n\r\n")[0] == 505
+    assert call(request("GET", "/api/health"))[0] == 200
+
+
+def test_oversized_bodies_are_rejected(call):
+    status, _, _ = call(request("POST", "/api/login", {"email": "ann@example.com", "password": "x" * 2000}))
+    assert status == 413
+
+
+def test_bad_cursors_are_rejected(call):
+    assert call(request("GET", "/api/products?cursor=abc"))[0] == 400
+    auth = log_in(call)
+    status, _, body = call(request("GET", "/api/orders?cursor=yesterday,1", headers=auth))
+    assert status == 400
+    assert json.loads(body) == {"error": "cursor is not valid"}
+    assert call(request("GET", "/api/orders?cursor=2024-01-01T00:00:00,1", headers=auth))[0] == 200
+
+
+def test_matching_etag_gets_not_modified(call):
+    status, headers, body = call(request("GET", "/api/products/1"))
+    assert status == 200 and json.loads(body)["name"] == "Lamp"
+    status, headers, body = call(request("GET", "/api/products/1", headers={"If-None-Match": headers["ETag"]}))
+    assert (status, body) == (304, b"")
+    assert call(request("GET", "/api/products/1", headers={"If-None-Match": 'W/"other"'}))[0] == 200
+
+
+def test_checkout_with_a_repeated_key_is_replayed(call):
+    auth = log_in(call)
+    assert call(request("PUT", "/api/cart/1", {"quantity": 2}, headers=auth))[0] == 200
+    checkout = request("POST", "/api/checkout", headers={**auth, "Idempotency-Key": "order-1"})
+
+    status, headers, body = call(checkout)
+    assert status == 201 and "Idempotent-Replayed" not in headers
+    order = json.loads(body)
+    assert order["total"] == "10.00"
+
+    status, headers, body = call(checkout)
+    assert status == 201 and headers["Idempotent-Replayed"] == "true"
+    assert json.loads(body) == order
+    assert ProductDAO().get_product_by_id(1).stock == 8
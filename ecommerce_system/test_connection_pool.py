@@ -0,0 +1,105 @@
+"""
+Tests for the connection pool's checkout, release and health checks
+"""
+import sqlite3
+import pytest
+from .db.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.in_transaction = False
+        self.connected = True
+        self.rolled_back = False
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rolled_back = True
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    """The connections the pool has opened, in order"""
+    return []
+
+
+@pytest.fixture
+def pool(opened):
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    return ConnectionPool(connect, min_size=1, max_size=2, health_check_interval=0)
+
+
+def test_open_warms_up_min_size_connections(pool, opened):
+    pool.open()
+    assert len(opened) == 1
+    assert pool.stats() == {'size': 1, 'idle': 1, 'in_use': 0, 'max_size': 2}
+
+
+def test_released_connections_are_reused(pool, opened):
+    connection = pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+    assert len(opened) == 1
+
+
+def test_checkout_times_out_when_every_connection_is_borrowed(pool):
+    pool.acquire()
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0)
+
+
+def test_discarded_connections_free_their_slot(pool, opened):
+    pool.acquire()
+    connection = pool.acquire()
+    pool.release(connection, discard=True)
+    assert connection.closed
+    assert pool.acquire(timeout=0) is opened[-1]
+    assert len(opened) == 3
+
+
+def test_open_transactions_are_rolled_back_on_release(pool):
+    connection = pool.acquire()
+    connection.in_transaction = True
+    pool.release(connection)
+    assert connection.rolled_back
+    assert pool.acquire() is connection
+
+
+def test_dropped_idle_connections_are_replaced(pool, opened):
+    connection = pool.acquire()
+    pool.release(connection)
+    connection.connected = False  # The server closed it while it sat idle
+    replacement = pool.acquire()
+    assert replacement is not connection
+    assert connection.closed
+    assert pool.stats()['size'] == 1
+
+
+def test_failed_warm_up_gives_back_its_slots():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 3:
+            raise sqlite3.OperationalError("unable to open database file")
+        return FakeConnection()
+
+    pool = ConnectionPool(connect, min_size=5, max_size=5)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.open()
+    assert pool.stats() == {'size': 2, 'idle': 2, 'in_use': 0, 'max_size': 5}
+
+    # Once the database is reachable again, the slots the warm-up gave back can be filled
+    connections = [pool.acquire(timeout=0) for _ in range(5)]
+    assert len(connections) == 5
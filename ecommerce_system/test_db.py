@@ -7,38 +7,27 @@ def test_db():
         
         # Import database components
         from db.db_connection import db
-        from dao.user_dao import UserDAO
-        from dao.product_dao import ProductDAO
-        from dao.category_dao import CategoryDAO
-        from dao.order_dao import OrderDAO
+        from db.migrate import MigrationRunner
         
         # Try to connect to database
         if not db.connect():
             print("✗ Database connection failed")
-            print("Note: Make sure MySQL server is running and credentials in config.py are correct")
+            print("Note: Make sure the database server is running and the settings in config.py are correct")
             return False
         
         print("✓ Database connection successful")
         
-        # Create DAO instances
-        user_dao = UserDAO()
-        product_dao = ProductDAO()
-        category_dao = CategoryDAO()
-        order_dao = OrderDAO()
+        # Create tables and indexes
+        runner = MigrationRunner()
+        runner.upgrade()
         
-        # Create tables
-        user_dao.create_table()
-        category_dao.create_table()
-        product_dao.create_table()
-        order_dao.create_tables()
-        
-        print("✓ All tables created successfully")
+        print(f"✓ Schema migrated to version {runner.current_version()}")
         
         # Close database connection
         db.disconnect()
         
         print("\nDatabase test completed successfully!")
-        print("Note: The actual database tables have been created in your MySQL server.")
+        print("Note: The actual database tables have been created in the configured database.")
         
     except Exception as e:
         print(f"Database test failed: {e}")
@@ -0,0 +1,34 @@
+"""
+Tests for reconnecting after a lost database connection
+"""
+import sqlite3
+import pytest
+from .db.backends import sqlite as sqlite_backend
+
+
+@pytest.fixture
+def connection_drops_once(database, monkeypatch):
+    """Make the next statement fail as if the server connection dropped; returns the statements sent"""
+    sent = []
+    execute = sqlite_backend.SQLiteCursor.execute
+
+    def drop_first(cursor, query, params=None):
+        sent.append(query)
+        if len(sent) == 1:
+            raise sqlite3.OperationalError("Lost connection to server during query")
+        return execute(cursor, query, params)
+
+    monkeypatch.setattr(sqlite_backend.SQLiteCursor, 'execute', drop_first)
+    monkeypatch.setattr(sqlite_backend, 'is_connection_lost', lambda error: True)
+    return sent
+
+
+def test_reads_are_retried_on_a_new_connection(database, connection_drops_once):
+    assert database.fetch_one("SELECT COUNT(*) FROM categories WHERE name = %s", ("Lamps",)) == (0,)
+    assert len(connection_drops_once) == 2
+
+
+def test_writes_are_not_sent_twice(database, connection_drops_once):
+    # The server may have applied the insert before the connection dropped
+    assert database.execute_query("INSERT INTO categories (name) VALUES (%s)", ("Lamps",)) is False
+    assert len(connection_drops_once) == 1
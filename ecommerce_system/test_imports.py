@@ -14,6 +14,9 @@ def test_imports():
         from dao.product_dao import ProductDAO
         from dao.category_dao import CategoryDAO
         from dao.order_dao import OrderDAO
+        from dao.inventory_dao import InventoryDAO
+        from dao.sales_rollup_dao import SalesRollupDAO
+        from dao.session_dao import SessionDAO
         print("✓ DAO modules imported")
         
         # Test model modules
@@ -25,6 +28,7 @@ def test_imports():
         # Test utility modules
         from utils.security import hash_password, verify_password
         from utils.validators import validate_email, validate_password
+        from utils.search_index import ProductSearchIndex
         print("✓ Utility modules imported")
         
         # Test GUI modules
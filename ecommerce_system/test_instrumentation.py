@@ -0,0 +1,74 @@
+"""
+Tests for query timing, the slow-query log and the statistics exports
+"""
+import json
+from .dao.category_dao import CategoryDAO
+from .db.instrumentation import BUCKETS, QueryStats, normalize_sql, query_stats
+
+
+def test_queries_differing_in_values_normalize_alike():
+    assert normalize_sql("SELECT * FROM products WHERE id = 42 AND name = 'it''s'") == \
+        "SELECT * FROM products WHERE id = ? AND name = ?"
+    assert normalize_sql("SELECT id FROM products WHERE id IN (%s, %s, %s)") == \
+        normalize_sql("SELECT id FROM products WHERE id IN (%s, %s)") == \
+        "SELECT id FROM products WHERE id IN (...)"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)") == \
+        "INSERT INTO t (a, b) VALUES (...), ..."
+
+
+def test_runs_are_counted_per_query_and_caller():
+    stats = QueryStats(slow_query_ms=1000)
+    stats.record("SELECT * FROM t WHERE id = %s", 0.002, rows=1)
+    stats.record("SELECT * FROM t WHERE id = 7", 0.004, rows=1)
+    stats.record("SELECT * FROM t WHERE id = %s", 0.001, error=True)
+    [stat] = stats.snapshot()
+    assert stat['query'] == "SELECT * FROM t WHERE id = ?"
+    assert stat['caller'] == "test_runs_are_counted_per_query_and_caller"
+    assert (stat['count'], stat['errors'], stat['rows']) == (3, 1, 2)
+    assert (stat['total_ms'], stat['max_ms']) == (7.0, 4.0)
+    assert sum(stat['buckets']) == 3
+    assert 1.0 <= stat['p50_ms'] <= stat['p95_ms'] <= stat['max_ms']
+
+
+def test_dao_queries_are_attributed_to_the_dao_method(database):
+    query_stats.reset()
+    CategoryDAO().get_all_categories()
+    assert [stat['caller'] for stat in query_stats.snapshot()] == ["CategoryDAO.get_all_categories"]
+
+
+def test_slow_queries_are_logged(tmp_path):
+    log_path = tmp_path / "slow.log"
+    stats = QueryStats(slow_query_ms=100, slow_log_path=str(log_path))
+    stats.record("SELECT 1", 0.05)
+    stats.record("SELECT * FROM orders WHERE user_id = 3", 0.25, rows=12)
+    [line] = log_path.read_text().splitlines()
+    assert line.endswith("Slow query (250.0 ms, 12 rows) from test_slow_queries_are_logged: "
+                         "SELECT * FROM orders WHERE user_id = ?")
+
+
+def test_prometheus_export():
+    stats = QueryStats()
+    stats.record('SELECT "a\\b"', 0.003, rows=2)
+    stats.record('SELECT "a\\b"', 20.0, error=True)
+    lines = stats.to_prometheus().splitlines()
+    assert "# TYPE db_query_duration_seconds histogram" in lines
+    labels = 'query="SELECT \\"a\\\\b\\"",caller="test_prometheus_export",pid="'
+    buckets = [line for line in lines if line.startswith("db_query_duration_seconds_bucket{" + labels)]
+    assert len(buckets) == len(BUCKETS) + 1
+    # Cumulative counts: the 3 ms run from the 5 ms bucket on, the 20 s run only in +Inf
+    assert [int(line.rpartition(" ")[2]) for line in buckets] == [0, 0, 0, 1] + [1] * (len(BUCKETS) - 4) + [2]
+    assert 'le="+Inf"' in buckets[-1]
+    assert any(line.startswith("db_query_duration_seconds_count{" + labels) and line.endswith(" 2")
+               for line in lines)
+    assert any(line.startswith("db_query_rows_total{" + labels) and line.endswith(" 2") for line in lines)
+    assert any(line.startswith("db_query_errors_total{" + labels) and line.endswith(" 1") for line in lines)
+
+
+def test_json_export(tmp_path):
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.001)
+    path = tmp_path / "stats.json"
+    assert stats.write_json(str(path))
+    exported = json.loads(path.read_text())
+    assert exported['bucket_bounds'] == list(BUCKETS)
+    assert [stat['query'] for stat in exported['queries']] == ["SELECT ?"]
@@ -0,0 +1,92 @@
+"""
+Tests for stock reservation and cart holds
+"""
+from decimal import Decimal
+import pytest
+from .config import SECURITY_CONFIG
+from .dao.inventory_dao import InventoryDAO
+from .dao.product_dao import ProductDAO
+from .dao.user_dao import UserDAO
+from .db.db_connection import db
+from .models.product import Product
+from .models.user import User
+
+BUYER, OTHER = 1, 2
+LAMP, CHAIR = 1, 2
+
+
+@pytest.fixture
+def inventory(database, monkeypatch):
+    """Two customers (IDs 1 and 2), 10 lamps (ID 1) and 3 chairs (ID 2)"""
+    monkeypatch.setitem(SECURITY_CONFIG, 'bcrypt_rounds', 4)
+    for name in ("Ann", "Bob"):
+        assert UserDAO().create_user(User(name=name, email=f"{name.lower()}@example.com", password="secret123",
+                                          role="customer"))
+    assert ProductDAO().create_product(Product(name="Lamp", description="", price=Decimal("5.00"), stock=10))
+    assert ProductDAO().create_product(Product(name="Chair", description="", price=Decimal("40.00"), stock=3))
+    return InventoryDAO()
+
+
+def reserve(inventory, items, user_id=BUYER):
+    """Reserve {product_id: quantity} in a transaction and return the shortfalls"""
+    with db.transaction() as cursor:
+        return inventory.reserve_stock(cursor, [{'product_id': product_id, 'quantity': quantity}
+                                                for product_id, quantity in items.items()], user_id)
+
+
+def stock(product_id):
+    return db.fetch_one("SELECT stock FROM products WHERE id = %s", (product_id,))[0]
+
+
+def test_a_shortfall_takes_no_stock(inventory):
+    assert reserve(inventory, {LAMP: 5, CHAIR: 4}) == \
+        [{'product_id': CHAIR, 'requested': 4, 'available': 3}]
+    assert (stock(LAMP), stock(CHAIR)) == (10, 3)
+
+    assert reserve(inventory, {LAMP: 5, CHAIR: 3}) == []
+    assert (stock(LAMP), stock(CHAIR)) == (5, 0)
+
+
+def test_repeated_lines_are_added_up(inventory):
+    items = [{'product_id': LAMP, 'quantity': 6}, {'product_id': LAMP, 'quantity': 6}]
+    with db.transaction() as cursor:
+        assert inventory.reserve_stock(cursor, items, BUYER) == \
+            [{'product_id': LAMP, 'requested': 12, 'available': 10}]
+
+
+def test_other_users_holds_are_unavailable(inventory):
+    assert inventory.hold_stock(OTHER, LAMP, 8)
+    assert inventory.get_available_stock(LAMP, BUYER) == 2
+    assert inventory.get_available_stock(LAMP, OTHER) == 10
+    assert not inventory.hold_stock(BUYER, LAMP, 3)
+    assert reserve(inventory, {LAMP: 3}) == [{'product_id': LAMP, 'requested': 3, 'available': 2}]
+    assert reserve(inventory, {LAMP: 2}) == []
+    assert stock(LAMP) == 8
+
+
+def test_the_buyers_own_holds_are_consumed(inventory):
+    assert inventory.hold_stock(BUYER, LAMP, 4)
+    assert inventory.hold_stock(OTHER, LAMP, 6)
+    assert reserve(inventory, {LAMP: 4}) == []
+    assert stock(LAMP) == 6
+    assert inventory.get_holds(BUYER) == []
+    assert [hold[:2] for hold in inventory.get_holds(OTHER)] == [(LAMP, 6)]
+
+
+def test_expired_holds_are_ignored_and_purged(inventory):
+    assert inventory.hold_stock(OTHER, LAMP, 8, minutes=-1)
+    assert inventory.get_holds(OTHER) == []
+    assert inventory.get_available_stock(LAMP, BUYER) == 10
+    assert reserve(inventory, {LAMP: 10}) == []
+
+    assert inventory.purge_expired_holds()
+    assert db.fetch_one("SELECT COUNT(*) FROM stock_holds")[0] == 0
+
+
+@pytest.mark.parametrize("quantity", [0, -2])
+def test_non_positive_quantities_are_refused(inventory, quantity):
+    with pytest.raises(ValueError):
+        reserve(inventory, {LAMP: 1, CHAIR: quantity})
+    assert (stock(LAMP), stock(CHAIR)) == (10, 3)
+    assert not inventory.hold_stock(BUYER, LAMP, quantity)
+    assert inventory.get_holds(BUYER) == []
@@ -0,0 +1,122 @@
+"""
+Tests for idempotent order placement and transaction retries
+"""
+import sqlite3
+from decimal import Decimal
+import pytest
+from .config import RETRY_CONFIG
+from .dao.order_dao import OrderDAO
+from .dao.product_dao import ProductDAO
+from .dao.user_dao import UserDAO
+from .db.db_connection import db
+from .models.product import Product
+from .models.user import User
+
+
+@pytest.fixture
+def shop(database, monkeypatch):
+    """A customer (ID 1) and a product (ID 1) with 10 in stock; retries don't sleep"""
+    monkeypatch.setitem(RETRY_CONFIG, 'base_delay', 0)
+    assert UserDAO().create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+    assert ProductDAO().create_product(Product(name="Lamp", description="", price=Decimal("5.00"), stock=10))
+    return OrderDAO()
+
+
+ITEMS = [{'product_id': 1, 'quantity': 2, 'price': Decimal("5.00")}]
+
+
+def stock():
+    return db.fetch_one("SELECT stock FROM products WHERE id = 1")[0]
+
+
+def order_count():
+    return db.fetch_one("SELECT COUNT(*) FROM orders")[0]
+
+
+def lock_error():
+    """The error SQLite raises when the write lock stays taken, which is worth retrying"""
+    error = sqlite3.OperationalError("database is locked")
+    error.sqlite_errorcode = sqlite3.SQLITE_BUSY
+    return error
+
+
+def test_repeated_key_replays_the_order(shop):
+    first = shop.place_order(1, Decimal("10.00"), ITEMS, "key-1")
+    again = shop.place_order(1, Decimal("10.00"), ITEMS, "key-1")
+    assert first[0] is not None
+    assert again == first
+    assert (order_count(), stock()) == (1, 8)
+
+    # Keys belong to a user, and another key is another order
+    assert shop.place_order(1, Decimal("10.00"), ITEMS, "key-2")[0] != first[0]
+    assert (order_count(), stock()) == (2, 6)
+
+
+def test_key_committed_by_a_concurrent_attempt_returns_that_order(shop, monkeypatch):
+    order_id, _ = shop.place_order(1, Decimal("10.00"), ITEMS, "key-1")
+
+    class MissedCheck:
+        """A cursor on which the replay check doesn't see the other attempt's order yet"""
+        def __init__(self, cursor):
+            self.cursor = cursor
+            self.hidden = False
+
+        def execute(self, query, params=None):
+            self.hidden = "idempotency_key = %s" in query
+            if not self.hidden:
+                self.cursor.execute(query, params)
+
+        def fetchone(self):
+            return None if self.hidden else self.cursor.fetchone()
+
+        def __getattr__(self, name):
+            return getattr(self.cursor, name)
+
+    run_transaction = db.run_transaction
+    monkeypatch.setattr(db, 'run_transaction', lambda work: run_transaction(lambda cursor: work(MissedCheck(cursor))))
+    # The insert hits the unique key, the transaction rolls back and the committed order is returned
+    assert shop.place_order(1, Decimal("10.00"), ITEMS, "key-1") == (order_id, [])
+    assert (order_count(), stock()) == (1, 8)
+
+
+def test_deadlocked_checkout_is_rolled_back_and_retried(shop, monkeypatch):
+    reserve_stock = shop.inventory_dao.reserve_stock
+    attempts = []
+
+    def deadlock_once(cursor, *args):
+        shortfalls = reserve_stock(cursor, *args)
+        attempts.append(shortfalls)
+        if len(attempts) == 1:
+            raise lock_error()  # After taking the stock, which must be rolled back
+        return shortfalls
+
+    monkeypatch.setattr(shop.inventory_dao, 'reserve_stock', deadlock_once)
+    order_id, shortfalls = shop.place_order(1, Decimal("10.00"), ITEMS, "key-1")
+    assert order_id is not None and shortfalls == []
+    assert len(attempts) == 2
+    assert (order_count(), stock()) == (1, 8)
+
+
+def test_retries_stop_after_the_configured_attempts(shop):
+    attempts = []
+
+    def always_locked(cursor):
+        attempts.append(cursor)
+        raise lock_error()
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.run_transaction(always_locked)
+    assert len(attempts) == RETRY_CONFIG['attempts']
+
+
+def test_other_errors_are_not_retried(shop, monkeypatch):
+    attempts = []
+
+    def fail(cursor, *args):
+        attempts.append(cursor)
+        raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+    monkeypatch.setattr(shop.inventory_dao, 'reserve_stock', fail)
+    assert shop.place_order(1, Decimal("10.00"), ITEMS) == (None, [])
+    assert len(attempts) == 1
+    assert (order_count(), stock()) == (0, 10)
@@ -0,0 +1,106 @@
+"""
+Tests for the LRU cache and the product cache's consistency with writes
+"""
+from decimal import Decimal
+import pytest
+from .dao import product_dao as product_dao_module
+from .dao.order_dao import OrderDAO
+from .dao.product_dao import ProductDAO
+from .dao.user_dao import UserDAO
+from .models.product import Product
+from .models.user import User
+from .utils.cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_entries_expire_after_their_ttl():
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set('fresh', 1)
+    cache.set('stale', 2, ttl=0)
+    assert cache.get('stale', 'missing') == 'missing'
+    assert cache.get('fresh') == 1
+    assert cache.stats()['expirations'] == 1
+
+
+def test_value_loaded_before_an_invalidation_is_not_cached():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.invalidate_where(lambda key: True)  # A write lands while the value is being read
+    cache.set('key', 'old value', generation=generation)
+    assert cache.get('key') is None
+    cache.set('key', 'new value', generation=cache.generation)
+    assert cache.get('key') == 'new value'
+
+
+def test_entries_can_be_invalidated_by_value():
+    cache = LRUCache()
+    cache.set('token-1', "ann")
+    cache.set('token-2', "ann")
+    cache.set('token-3', "bob")
+    generation = cache.generation
+    cache.invalidate_values(lambda user: user == "ann")
+    assert (cache.get('token-1'), cache.get('token-2'), cache.get('token-3')) == (None, None, "bob")
+    assert cache.stats()['invalidations'] == 2
+    assert cache.generation > generation
+
+
+@pytest.fixture
+def product(database):
+    product = Product(category_id=None, name="Desk lamp", description="", price=Decimal("20.00"), stock=10)
+    assert ProductDAO().create_product(product)
+    return product
+
+
+def test_product_writes_are_read_back(database, product):
+    product_dao = ProductDAO()
+    assert product_dao.get_product_by_id(product.id).price == Decimal("20.00")  # Now cached
+
+    product.price = Decimal("25.00")
+    assert product_dao.update_product(product)
+    assert product_dao.get_product_by_id(product.id).price == Decimal("25.00")
+    assert product_dao.get_products_by_ids([product.id])[0].price == Decimal("25.00")
+
+    assert product_dao.update_stock(product.id, 3)
+    assert product_dao.get_product_by_id(product.id).stock == 3
+
+    assert product_dao.delete_product(product.id)
+    assert product_dao.get_product_by_id(product.id) is None
+
+
+def test_listing_pages_see_new_products(database, product):
+    product_dao = ProductDAO()
+    assert [found.id for found in product_dao.get_all_products_page()[0]] == [product.id]
+
+    other = Product(category_id=None, name="Floor lamp", description="", price=Decimal("45.00"), stock=4)
+    assert product_dao.create_product(other)
+    assert [found.id for found in product_dao.get_all_products_page()[0]] == [product.id, other.id]
+
+
+def test_orders_refresh_cached_stock(database, product):
+    product_dao = ProductDAO()
+    assert product_dao.get_product_by_id(product.id).stock == 10
+    UserDAO().create_user(User(name="Buyer", email="buyer@example.com", password="secret123", role="customer"))
+    items = [{'product_id': product.id, 'quantity': 4, 'price': product.price}]
+    assert OrderDAO().create_order(1, Decimal("80.00"), items)
+    assert product_dao.get_product_by_id(product.id).stock == 6
+
+
+def test_full_listings_are_not_cached(database, product):
+    product_dao = ProductDAO()
+    assert len(product_dao.get_all_products()) == 1
+    assert product_dao_module.product_cache.stats()['size'] == 0
+
+    # A change made without the DAO, e.g. by another process, shows up straight away
+    database.execute_query("UPDATE products SET name = %s WHERE id = %s", ("Reading lamp", product.id))
+    assert product_dao.get_all_products()[0].name == "Reading lamp"
@@ -0,0 +1,86 @@
+"""
+Tests for bulk product import and export
+"""
+from decimal import Decimal
+import pytest
+from .dao.category_dao import CategoryDAO
+from .dao.product_dao import ProductDAO
+from .db.db_connection import db
+from .models.product import Product
+from .utils.product_io import export_products, import_products
+
+
+@pytest.fixture
+def catalog(database):
+    """Two categories and three products, one of them without a category"""
+    category_dao = CategoryDAO()
+    for name in ("Lighting", "Seating"):
+        assert category_dao.create_category(name)
+    assert ProductDAO().bulk_save_products([
+        Product(category_id=1, name="Desk lamp", description='LED, 60W "warm"', price=Decimal("19.99"), stock=20,
+                image="lamp.png"),
+        Product(category_id=2, name="Stool", description=None, price=Decimal("35.00"), stock=0),
+        Product(category_id=None, name="Gift card", description="Multi-line\ndescription", price=Decimal("0.50"),
+                stock=999),
+    ]) == []
+    return ProductDAO()
+
+
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_export_and_import_round_trip(catalog, tmp_path, extension):
+    path = tmp_path / f"products.{extension}"
+    assert export_products(str(path)) == 3
+    exported = path.read_text(encoding="utf-8")
+
+    # Change one product and delete another, then restore both from the file
+    db.execute_query("UPDATE products SET price = %s, stock = %s WHERE id = 1", (Decimal("1.00"), 1))
+    db.execute_query("DELETE FROM products WHERE id = 3")
+    report = import_products(str(path))
+    assert (report.saved, report.errors) == (3, [])
+
+    again = tmp_path / f"again.{extension}"
+    assert export_products(str(again)) == 3
+    assert again.read_text(encoding="utf-8") == exported
+    assert catalog.get_product_by_id(1).price == Decimal("19.99")
+
+
+class StaleCategories:
+    """Category names as read before "Outdoor" (ID 99) was deleted by someone else"""
+    def get_all_categories(self):
+        return CategoryDAO().get_all_categories() + [(99, "Outdoor", "")]
+
+
+def test_bad_rows_are_reported_and_skipped(catalog, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text(
+        "id,name,description,price,stock,category,image\n"
+        ",Floor lamp,,49.50,5,Lighting,\n"     # Line 2: saved
+        ",,,10.00,1,,\n"                       # Line 3: no name
+        ",Bench,,cheap,1,Seating,\n"           # Line 4: bad price
+        ",Hammock,,80.00,2,Outdoor,\n"         # Line 5: rejected by the database
+        "abc,Chair,,20.00,1,Seating,\n"        # Line 6: bad id
+        ",Rug,,15.00,-1,,\n"                   # Line 7: negative stock
+        ",Table,,150.00,3,Furniture,\n"        # Line 8: unknown category
+        "2,Stool,Oak,39.00,4,Seating,\n",      # Line 9: updates product 2
+        encoding="utf-8")
+    report = import_products(str(path), category_dao=StaleCategories())
+    assert report.saved == 2
+    assert [line for line, _ in report.errors] == [3, 4, 5, 6, 7, 8]
+    assert report.errors[0][1] == "name is required"
+    assert "FOREIGN KEY" in dict(report.errors)[5]
+    assert dict(report.errors)[8] == "unknown category 'Furniture'"
+    assert catalog.get_product_by_id(2).price == Decimal("39.00")
+    assert db.fetch_one("SELECT COUNT(*) FROM products")[0] == 4
+
+
+def test_bulk_save_reports_failed_positions(catalog):
+    failures = catalog.bulk_save_products([
+        Product(category_id=1, name="Pendant", description="", price=Decimal("60.00"), stock=2),
+        Product(category_id=99, name="Hammock", description="", price=Decimal("80.00"), stock=2),
+        Product(product_id=1, category_id=1, name="Desk lamp", description="", price=Decimal("17.99"), stock=20),
+    ])
+    assert [position for position, _ in failures] == [1]
+    # The rest of the batch is still saved, one product at a time
+    assert catalog.get_product_by_id(1).price == Decimal("17.99")
+    assert [product.name for product in catalog.get_all_products()] == \
+        ["Desk lamp", "Stool", "Gift card", "Pendant"]
@@ -0,0 +1,70 @@
+"""
+Tests for routing reads to a read replica
+"""
+import sqlite3
+from .dao.category_dao import CategoryDAO
+from .db.backends import sqlite as sqlite_backend
+from .db.connection_pool import PoolError
+
+
+def add_category(path, name):
+    """Insert a category into a database file without going through the application"""
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("INSERT INTO categories (name, description) VALUES (?, '')", (name,))
+    connection.close()
+
+
+def category_names():
+    return [category[1] for category in CategoryDAO().get_all_categories()]
+
+
+def test_read_only_methods_read_the_replica(database, replica_path):
+    add_category(replica_path, "Replica")
+    assert category_names() == ["Replica"]
+    assert database.replicas.stats()[0]['reads'] == 1
+    # Reads outside read-only DAO methods, and inside db.primary(), go to the primary
+    assert database.fetch_all("SELECT name FROM categories") == []
+    with database.primary():
+        assert category_names() == []
+
+
+def test_writers_read_their_own_writes_from_the_primary(database, replica_path, monkeypatch):
+    with database.read_your_writes(1):
+        assert CategoryDAO().create_category("Primary", "")
+        assert category_names() == ["Primary"]
+    with database.read_your_writes(2):
+        assert category_names() == []  # The replica has not caught up, but user 2 didn't write
+
+    monkeypatch.setitem(database.replica_config, 'read_your_writes_seconds', 0)
+    with database.read_your_writes(1):
+        assert category_names() == []
+
+
+def test_lagging_replicas_are_skipped_until_they_catch_up(database, replica_path, monkeypatch):
+    add_category(replica_path, "Replica")
+    replica = database.replicas.replicas[0]
+    monkeypatch.setattr(sqlite_backend, 'replication_lag', lambda connection: 60.0)
+    database.replicas._check_lag(replica)
+    assert category_names() == []
+
+    monkeypatch.setattr(sqlite_backend, 'replication_lag', lambda connection: 1.0)
+    database.replicas._check_lag(replica)
+    assert category_names() == ["Replica"]
+
+
+def test_failed_replica_reads_fall_back_to_the_primary(database, replica_path, monkeypatch):
+    add_category(replica_path, "Replica")
+    replica = database.replicas.replicas[0]
+    attempts = []
+
+    def unreachable():
+        attempts.append(1)
+        raise PoolError("Replica is down")
+
+    monkeypatch.setattr(replica.pool, 'acquire', unreachable)
+    assert category_names() == []
+    assert replica.lag is None
+    # Skipped until the next lag check finds it back
+    assert category_names() == []
+    assert len(attempts) == 1
@@ -0,0 +1,67 @@
+"""
+Tests for keeping the sharded sales rollups in step with the order tables
+"""
+from decimal import Decimal
+import pytest
+from .config import SECURITY_CONFIG
+from .dao.category_dao import CategoryDAO
+from .dao.order_dao import OrderDAO
+from .dao.product_dao import ProductDAO
+from .dao.sales_rollup_dao import SHARDS, SOLD_STATUSES, SalesRollupDAO
+from .dao.user_dao import UserDAO
+from .db.db_connection import db
+from .models.product import Product
+from .models.user import User
+
+PRICES = {1: Decimal("5.00"), 2: Decimal("12.50"), 3: Decimal("99.99")}
+
+
+@pytest.fixture
+def order_dao(database, monkeypatch):
+    """A customer and three products in two categories, plenty in stock"""
+    monkeypatch.setitem(SECURITY_CONFIG, 'bcrypt_rounds', 4)
+    assert UserDAO().create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+    for name in ("Lighting", "Seating"):
+        assert CategoryDAO().create_category(name)
+    for product_id, price in PRICES.items():
+        assert ProductDAO().create_product(Product(category_id=1 if product_id < 3 else 2, name=f"Product {product_id}",
+                                                   description="", price=price, stock=1000))
+    return OrderDAO()
+
+
+def reports(order_dao):
+    """Every report read from the rollups, with money rounded to cents since SQLite sums to floats"""
+    def cents(rows):
+        return [tuple(round(float(value), 2) if isinstance(value, (float, Decimal)) else value for value in row)
+                for row in rows]
+
+    rollup_dao = SalesRollupDAO()
+    return (cents(order_dao.get_sales_report()), order_dao.get_top_selling_products(),
+            sorted(cents(rollup_dao.get_sales_by_status())), cents(rollup_dao.get_sales_by_category()))
+
+
+def test_incremental_rollups_match_a_rebuild(order_dao):
+    order_ids = []
+    for number in range(SHARDS + 4):  # More orders than shards, so some share a row
+        items = [{'product_id': 1 + number % 3, 'quantity': 1 + number % 4, 'price': PRICES[1 + number % 3]},
+                 {'product_id': 1, 'quantity': 2, 'price': PRICES[1]}]
+        total = sum(item['quantity'] * item['price'] for item in items)
+        order_id, shortfalls = order_dao.place_order(1, total, items)
+        assert order_id is not None and shortfalls == []
+        order_ids.append(order_id)
+
+    for position, order_id in enumerate(order_ids):
+        for status in ('paid', 'shipped', 'delivered')[:position % 4]:
+            assert order_dao.update_order_status(order_id, status)
+    assert order_dao.update_order_status(order_ids[5], 'pending')  # Moved back out of the sold statuses
+
+    incremental = reports(order_dao)
+    sold = db.fetch_one(f"""
+    SELECT COUNT(*), SUM(total_amount) FROM orders
+    WHERE status IN ({", ".join(["%s"] * len(SOLD_STATUSES))})
+    """, SOLD_STATUSES)
+    [(_, orders_count, revenue)] = incremental[0]  # Every order was placed today
+    assert (orders_count, revenue) == (sold[0], round(float(sold[1]), 2))
+
+    assert SalesRollupDAO().rebuild()
+    assert reports(order_dao) == incremental
@@ -0,0 +1,140 @@
+"""
+Tests for the product search index and the search-backed product listings
+"""
+import random
+from decimal import Decimal
+import pytest
+from .dao.category_dao import CategoryDAO
+from .dao.product_dao import ProductDAO
+from .models.product import Product
+from .utils.search_index import ProductSearchIndex, tokenize
+
+COLORS = ["red", "blue", "green", "black"]
+NOUNS = ["lamp", "chair", "table", "desk", "sofa"]
+
+
+def test_tokenize():
+    assert tokenize("Red  Desk-Lamp, 60W!") == ["red", "desk", "lamp", "60w"]
+    assert tokenize("") == []
+    assert tokenize(None) == []
+
+
+def test_every_word_must_match_and_the_last_is_a_prefix():
+    index = ProductSearchIndex()
+    index.build([(1, "Red lamp", "", 1), (2, "Red chair", "", 1), (3, "Blue lamp", "", 2)])
+    assert set(index.search("lamp")) == {1, 3}
+    assert index.search("red lamp") == [1]
+    assert set(index.search("red ch")) == {2}
+    assert index.search("red sofa") == []
+    assert index.search("la red") == []  # Only the last word is a prefix
+    assert index.search("lamp", category_id=2) == [3]
+    assert index.facet_counts("lamp") == {1: 1, 2: 1}
+
+
+def test_name_matches_rank_above_description_matches():
+    index = ProductSearchIndex()
+    index.build([(1, "Chair", "Goes with any lamp", 1), (2, "Lamp", "A reading light", 1)])
+    assert index.search("lamp") == [2, 1]
+
+
+def test_add_update_and_remove_reindex_a_product():
+    index = ProductSearchIndex()
+    index.build([(1, "Red lamp", "", 1)])
+    index.add(2, "Green sofa", "", 1)
+    assert index.search("sofa") == [2]
+
+    index.add(2, "Green desk", "", 3)  # Re-indexing replaces the old words and category
+    assert index.search("sofa") == []
+    assert index.search("desk", category_id=3) == [2]
+
+    index.remove(1)
+    assert index.search("lamp") == []
+    assert index.search("red") == []
+    assert index.facet_counts("green") == {3: 1}
+
+
+def test_readding_a_word_does_not_repeat_it_in_the_vocabulary():
+    index = ProductSearchIndex()
+    index.build([(1, "Zebra rug", "", 1), (2, "Zebu figurine", "", 1)])
+    assert set(index.search("zeb")) == {1, 2}  # Sorts the vocabulary
+    for _ in range(3):
+        index.remove(1)
+        index.add(1, "Zebra rug", "", 1)
+    assert set(index.search("zeb")) == {1, 2}
+    assert index._expand("zeb", prefix=True) == ["zebra", "zebu"]
+
+
+def test_changes_made_during_a_build_are_kept():
+    index = ProductSearchIndex()
+    index.build([(1, "Red lamp", "", 1), (2, "Blue lamp", "", 1)])
+
+    def rows():
+        # Read before the writes below, as a background rebuild's batches can be
+        yield (1, "Red lamp", "", 1)
+        yield (2, "Blue lamp", "", 1)
+        index.add(3, "Green lamp", "", 1)
+        index.add(1, "Red chair", "", 1)
+        index.remove(2)
+
+    index.build(rows())
+    assert index.search("lamp") == [3]
+    assert index.search("chair") == [1]
+    assert index.search("blue") == []
+
+
+@pytest.fixture
+def products(database):
+    """A product DAO over a catalog of random color and furniture names"""
+    rng = random.Random(5)
+    category_dao = CategoryDAO()
+    for name in ("Home", "Office"):
+        category_dao.create_category(name)
+    category_ids = [category[0] for category in category_dao.get_all_categories()]
+    product_dao = ProductDAO()
+    for number in range(60):
+        product_dao.create_product(Product(
+            category_id=rng.choice(category_ids),
+            name=f"{rng.choice(COLORS)} {rng.choice(NOUNS)}",
+            description=f"A {rng.choice(COLORS)} piece, item {number}",
+            price=Decimal("9.99"),
+            stock=10,
+        ))
+    return product_dao
+
+
+def like_matches(database, word):
+    """IDs the LIKE search that the index replaced found for one word"""
+    pattern = f"%{word}%"
+    rows = database.fetch_all("SELECT id FROM products WHERE name LIKE %s OR description LIKE %s",
+                              (pattern, pattern))
+    return {row[0] for row in rows}
+
+
+@pytest.mark.parametrize("word", COLORS + NOUNS)
+def test_pages_cover_the_like_results_once(database, products, word):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = products.get_products_by_name_page(word, cursor, page_size=7)
+        seen.extend(product.id for product in page)
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert set(seen) == like_matches(database, word)
+    assert seen == [product.id for product in products.search_products(word)]
+
+
+def test_writes_update_a_built_index(database, products):
+    products.search_products("lamp")  # Builds the index
+    product = Product(category_id=None, name="Walnut bookcase", description="", price=Decimal("120.00"),
+                      stock=2)
+    assert products.create_product(product)
+    assert [found.id for found in products.search_products("bookcase")] == [product.id]
+
+    product.name = "Walnut cabinet"
+    assert products.update_product(product)
+    assert products.search_products("bookcase") == []
+    assert [found.id for found in products.search_products("cabi")] == [product.id]
+
+    assert products.delete_product(product.id)
+    assert products.search_products("walnut") == []
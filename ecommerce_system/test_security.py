@@ -0,0 +1,61 @@
+"""
+Tests for password hashing and the failed-login throttle
+"""
+import threading
+import pytest
+from .config import SECURITY_CONFIG
+from .dao.user_dao import UserDAO
+from .models.user import User
+from .utils import security
+from .utils.security import LoginThrottle, LoginThrottledError, hash_password, verify_password
+
+
+def test_hashes_verify_in_the_callers_thread():
+    hashed = hash_password("secret123", rounds=4)
+    assert verify_password("secret123", hashed)
+    assert not verify_password("secret124", hashed)
+    assert security.needs_rehash(hashed)  # Made with fewer rounds than configured
+
+
+def test_concurrent_attempts_cannot_pass_the_limit():
+    throttle = LoginThrottle(window_seconds=60)
+    limits = [(('account', "ann@example.com"), 3)]
+    started = []
+    barrier = threading.Barrier(20)
+
+    def attempt():
+        barrier.wait()
+        try:
+            started.append(throttle.begin(limits))
+        except LoginThrottledError:
+            pass
+
+    threads = [threading.Thread(target=attempt) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(started) == 3
+
+
+def test_successful_attempts_are_not_counted():
+    throttle = LoginThrottle(window_seconds=60)
+    limits = [(('source', "10.0.0.1"), 2)]
+    for _ in range(5):
+        throttle.succeeded([key for key, _ in limits], throttle.begin(limits))
+    throttle.begin(limits)
+    throttle.begin(limits)
+    with pytest.raises(LoginThrottledError):
+        throttle.begin(limits)
+
+
+def test_failed_logins_lock_the_account(database, monkeypatch):
+    monkeypatch.setitem(SECURITY_CONFIG, 'bcrypt_rounds', 4)
+    user_dao = UserDAO()
+    assert user_dao.create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+
+    assert user_dao.authenticate_user("ann@example.com", "secret123") is not None
+    for _ in range(SECURITY_CONFIG['max_failures_per_account']):
+        assert user_dao.authenticate_user("ann@example.com", "wrong") is None
+    with pytest.raises(LoginThrottledError):
+        user_dao.authenticate_user("ann@example.com", "secret123")
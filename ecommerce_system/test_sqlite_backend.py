@@ -0,0 +1,133 @@
+"""
+Tests for the SQLite backend's translation of MySQL statements, and for the
+migrations and DAO queries running on it
+"""
+from datetime import date
+from decimal import Decimal
+import pytest
+from .dao.category_dao import CategoryDAO
+from .dao.inventory_dao import InventoryDAO
+from .dao.order_dao import OrderDAO
+from .dao.product_dao import ProductDAO
+from .dao.sales_rollup_dao import SalesRollupDAO
+from .dao.session_dao import SessionDAO
+from .dao.user_dao import UserDAO
+from .db.backends.sqlite import translate
+from .db.instrumentation import query_stats
+from .db.migrate import MigrationRunner
+from .models.product import Product
+from .models.user import User
+
+
+def test_placeholders_become_question_marks():
+    assert translate("SELECT a %% 2 FROM t WHERE id = %s AND `key` = %s") == \
+        ('SELECT a % 2 FROM t WHERE id = ? AND "key" = ?',)
+
+
+def test_string_literals_are_left_alone():
+    assert translate("SELECT '%s', \"%s\" FROM t WHERE name = 'it''s %s' AND id = %s") == \
+        ("SELECT '%s', \"%s\" FROM t WHERE name = 'it''s %s' AND id = ?",)
+
+
+def test_on_duplicate_key_update_becomes_on_conflict():
+    query = """
+    INSERT INTO sales_daily (sale_date, status, orders_count)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE orders_count = orders_count + VALUES(orders_count), status = VALUES( status )
+    """
+    assert translate(query) == (
+        "INSERT INTO sales_daily (sale_date, status, orders_count)\n    VALUES (?, ?, ?)\n    "
+        "ON CONFLICT DO UPDATE SET orders_count = orders_count + excluded.orders_count, status = excluded.status",
+    )
+
+
+def test_create_table_rewrites():
+    query = """
+    CREATE TABLE IF NOT EXISTS holds (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        status ENUM('open', 'closed') DEFAULT 'open',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        user_id INT NOT NULL,
+        UNIQUE KEY uq_holds_user (user_id),
+        KEY idx_holds_status (status, created_at)
+    )
+    """
+    assert translate(query) == (
+        "CREATE TABLE IF NOT EXISTS holds (id INTEGER PRIMARY KEY AUTOINCREMENT, status TEXT DEFAULT 'open', "
+        "created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')), user_id INT NOT NULL, UNIQUE (user_id))",
+        "CREATE INDEX IF NOT EXISTS idx_holds_status ON holds (status, created_at)",
+    )
+
+
+def test_other_mysql_syntax():
+    assert translate("SELECT CAST(SUM(n) AS SIGNED) FROM t") == ("SELECT CAST(SUM(n) AS INTEGER) FROM t",)
+    assert translate("SELECT id FROM t WHERE id = %s FOR UPDATE") == ("SELECT id FROM t WHERE id = ?",)
+    assert translate("DROP INDEX idx_t_a ON t") == ("DROP INDEX idx_t_a",)
+
+
+def test_every_migration_applies_and_reverts(memory_database):
+    runner = MigrationRunner()
+    latest = runner.latest_version()
+    assert runner.current_version() == latest
+    runner.downgrade(0)
+    assert runner.current_version() == 0
+    runner.upgrade()
+    assert runner.current_version() == latest
+
+
+def test_dao_queries(memory_database):
+    query_stats.reset()
+    category_dao = CategoryDAO()
+    product_dao = ProductDAO()
+    user_dao = UserDAO()
+    order_dao = OrderDAO()
+    inventory_dao = InventoryDAO()
+
+    assert category_dao.create_category("Lighting", "Lamps")
+    assert category_dao.get_all_categories() == [(1, "Lighting", "Lamps")]
+    lamp = Product(category_id=1, name="Desk lamp", description="LED", price=Decimal("19.99"), stock=20)
+    assert product_dao.create_product(lamp)
+    assert product_dao.bulk_save_products([
+        Product(category_id=1, name="Floor lamp", description="", price=Decimal("49.50"), stock=5),
+        Product(product_id=lamp.id, category_id=1, name="Desk lamp", description="LED", price=Decimal("17.99"),
+                stock=20),
+    ]) == []
+    assert [(product.name, product.price) for product in product_dao.get_all_products()] == \
+        [("Desk lamp", Decimal("17.99")), ("Floor lamp", Decimal("49.50"))]
+    assert [product.name for product in product_dao.get_products_by_category_page(1, page_size=1)[0]] == \
+        ["Desk lamp"]
+    assert [product.name for product in product_dao.search_products("lamp floor")] == ["Floor lamp"]
+    assert len(list(product_dao.iter_products(batch_size=1))) == 2
+
+    assert user_dao.create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+    user = user_dao.authenticate_user("ann@example.com", "secret123")
+    assert user is not None and user.role == "customer"
+    assert [found.id for found in user_dao.get_users_page(role="customer", search="ann")[0]] == [user.id]
+    token = SessionDAO().create_session(user)
+    assert SessionDAO().get_session_user(token).id == user.id
+
+    assert inventory_dao.hold_stock(user.id, lamp.id, 3)
+    assert inventory_dao.hold_stock(user.id, lamp.id, 2)  # Updates the hold
+    assert [hold[:2] for hold in inventory_dao.get_holds(user.id)] == [(lamp.id, 2)]
+    assert inventory_dao.get_available_stock(lamp.id) == 18
+
+    order_id, shortfalls = order_dao.place_order(user.id, None, [{'product_id': lamp.id, 'quantity': 2}],
+                                                 reprice=True)
+    assert shortfalls == []
+    assert inventory_dao.get_holds(user.id) == []
+    order, items = order_dao.get_order_details(order_id, user.id)
+    assert order.total_amount == Decimal("35.98")
+    assert [(item.product_name, item.quantity) for item in items] == [("Desk lamp", 2)]
+    assert order_dao.update_order_status(order_id, 'paid')
+    assert [order.id for order in order_dao.get_orders_page(status='paid', start_date=date.today())[0]] == \
+        [order_id]
+    assert [row[0] for row in order_dao.iter_orders(user_id=user.id, raw=True)] == [order_id]
+
+    # SQLite sums DECIMAL columns to floats
+    assert order_dao.get_sales_report() == [(date.today(), 1, pytest.approx(35.98))]
+    assert order_dao.get_top_selling_products() == [("Desk lamp", 2)]
+    assert SalesRollupDAO().rebuild()
+    assert SalesRollupDAO().get_sales_by_category() == [("Lighting", 2, pytest.approx(35.98))]
+
+    errors = [stat for stat in query_stats.snapshot() if stat['errors']]
+    assert errors == []
@@ -0,0 +1,101 @@
+"""
+Tests for the prepared statement cache and streamed scans
+"""
+from .db.connection_pool import PoolError
+from .db.db_connection import read_only
+from .db.statements import StatementCache
+
+
+class FakeCursor:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def cursor(self, prepared=False):
+        assert prepared
+        return FakeCursor()
+
+
+def test_statements_are_reused_and_the_least_recent_closed():
+    cache = StatementCache(FakeConnection(), max_size=2)
+    first, _ = cache.get("SELECT a")
+    cache.get("SELECT b")
+    assert cache.get("SELECT a")[0] is first  # "SELECT b" is now the least recently used
+    second, _ = cache.get("SELECT b")
+    cache.get("SELECT c")
+    assert (cache.hits, cache.misses, len(cache)) == (2, 3, 2)
+    assert first.closed and not second.closed
+
+    cache.discard("SELECT b")
+    assert second.closed
+    assert cache.get("SELECT b")[0] is not second
+
+
+def cached_statements(database):
+    """The statements cached on the connection the next query will use"""
+    with database.connection() as conn:
+        return conn.statement_cache
+
+
+def test_failed_statements_are_prepared_again(database):
+    query = "SELECT name FROM categories WHERE id = %s"
+    assert database.fetch_all(query, (1,)) == []
+    statements = cached_statements(database)
+    assert len(statements) == 1
+    assert database.fetch_all(query, (1,)) == []
+    assert statements.hits == 1
+
+    assert database.fetch_all("SELECT name FROM missing_table WHERE id = %s", (1,)) == []
+    assert cached_statements(database) is statements
+    assert len(statements) == 1
+
+
+def insert_categories(database, count):
+    for number in range(count):
+        assert database.execute_query("INSERT INTO categories (name, description) VALUES (%s, '')",
+                                      (f"Category {number}",))
+
+
+def test_scans_stream_every_row_in_batches(database):
+    insert_categories(database, 7)
+    rows = list(database.iter_query("SELECT name FROM categories ORDER BY id", batch_size=3))
+    assert [row[0] for row in rows] == [f"Category {number}" for number in range(7)]
+
+
+def test_abandoned_scans_close_their_connection(database):
+    insert_categories(database, 5)
+    size = database.pool.stats()['size']
+    rows = database.iter_query("SELECT name FROM categories ORDER BY id", batch_size=2)
+    assert next(rows)[0] == "Category 0"
+    assert database.pool.stats()['in_use'] == 1
+    rows.close()  # Unread rows are left on the connection, so it is not reused
+    stats = database.pool.stats()
+    assert (stats['size'], stats['in_use']) == (size - 1, 0)
+
+    list(database.iter_query("SELECT name FROM categories", batch_size=2))
+    assert database.pool.stats()['size'] == size - 1
+
+
+@read_only
+def streamed_category_names(database):
+    for row in database.iter_query("SELECT name FROM categories ORDER BY id", batch_size=1):
+        yield row[0]
+
+
+def test_scans_fall_back_to_the_primary_when_the_replica_fails(database, replica_path, monkeypatch):
+    with database.read_your_writes("setup"):
+        insert_categories(database, 2)  # Only on the primary
+    assert list(streamed_category_names(database)) == []  # The replica copy has none
+
+    replica = database.replicas.replicas[0]
+
+    def unreachable():
+        raise PoolError("Replica is down")
+
+    monkeypatch.setattr(replica.pool, 'acquire', unreachable)
+    assert list(streamed_category_names(database)) == ["Category 0", "Category 1"]
+    assert replica.lag is None
@@ -0,0 +1,69 @@
+"""
+Tests for the cached user lookups and logging in past them
+"""
+import pytest
+from .dao.user_dao import UserDAO
+from .models.user import User
+from .utils.security import hash_password
+
+
+@pytest.fixture
+def users(database):
+    """A user DAO and one customer, ann@example.com"""
+    user_dao = UserDAO()
+    assert user_dao.create_user(User(name="Ann", email="ann@example.com", password="secret123", role="customer"))
+    return user_dao
+
+
+def rename_behind_the_cache(database, name):
+    """Change the user's name without the DAO, as another process would"""
+    database.execute_query("UPDATE users SET name = %s WHERE email = %s", (name, "ann@example.com"))
+
+
+def test_lookups_are_cached(database, users):
+    user = users.get_user_by_email("ann@example.com")
+    assert users.get_user_by_id(user.id).name == "Ann"
+    rename_behind_the_cache(database, "Changed")
+    assert users.get_user_by_email("ann@example.com").name == "Ann"
+    assert users.get_user_by_id(user.id).name == "Ann"
+
+
+def test_updates_refresh_both_lookups(database, users):
+    user = users.get_user_by_email("ann@example.com")
+    users.get_user_by_id(user.id)
+
+    user.name = "Anne"
+    assert users.update_user(user)
+    assert users.get_user_by_id(user.id).name == "Anne"
+    assert users.get_user_by_email("ann@example.com").name == "Anne"
+
+    assert users.update_password(user.id, "new-secret-456")
+    assert users.authenticate_user("ann@example.com", "new-secret-456") is not None
+
+    assert users.delete_user(user.id)
+    assert users.get_user_by_id(user.id) is None
+    assert users.get_user_by_email("ann@example.com") is None
+
+
+def test_new_accounts_are_found_after_a_miss(users):
+    assert users.get_user_by_email("bob@example.com") is None
+    assert users.create_user(User(name="Bob", email="bob@example.com", password="secret123", role="customer"))
+    assert users.get_user_by_email("bob@example.com").name == "Bob"
+
+
+def test_password_hashes_are_not_cached(users):
+    user = users.get_user_by_email("ann@example.com")
+    assert user.password is None
+    assert users.get_user_by_id(user.id).password is None
+
+
+def test_logins_check_the_stored_password(database, users):
+    user = users.get_user_by_email("ann@example.com")  # Now cached
+
+    # Another process changes the password, then deletes the account
+    database.execute_query("UPDATE users SET password = %s WHERE id = %s",
+                           (hash_password("changed-789", rounds=4), user.id))
+    assert users.authenticate_user("ann@example.com", "secret123") is None
+    assert users.authenticate_user("ann@example.com", "changed-789") is not None
+    database.execute_query("DELETE FROM users WHERE id = %s", (user.id,))
+    assert users.authenticate_user("ann@example.com", "changed-789") is None
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+
+    Every invalidation bumps ``generation``. A caller that reads the database
+    on a miss passes the generation it saw before the read to ``set`` so a
+    value that was invalidated while it was being loaded is not cached.
+    """
+
+    def __init__(self, max_size=1000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, generation=None):
+        """Cache a value, evicting the least recently used entries when full"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Remove one entry"""
+        with self._lock:
+            self.generation += 1
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate_where(self, predicate):
+        """Remove every entry whose key matches predicate"""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def invalidate_values(self, predicate):
+        """Remove every entry whose value matches predicate"""
+        with self._lock:
+            self.generation += 1
+            for key in [key for key, (value, _) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,219 @@
+"""
+Bulk product import and export as CSV or JSON Lines.
+
+Files are streamed, so memory use does not grow with the file size. Run
+from the repository root:
+
+    python -m ecommerce_system.utils.product_io import products.csv
+    python -m ecommerce_system.utils.product_io export products.jsonl
+
+Columns are id, name, description, price, stock, category and image. A row
+with an id updates that product; a row without one adds a new product.
+category is a category name; category_id may be given instead.
+"""
+import argparse
+import csv
+import json
+import sys
+from decimal import Decimal
+from ..db.db_connection import db
+from ..dao.category_dao import CategoryDAO
+from ..dao.product_dao import ProductDAO, BULK_BATCH_SIZE
+from ..models.product import Product
+from .validators import validate_price, validate_stock
+
+COLUMNS = ["id", "name", "description", "price", "stock", "category", "image"]
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+class ImportReport:
+    def __init__(self):
+        self.saved = 0
+        self.errors = []  # [(line_number, message), ...]
+
+    def __str__(self):
+        return f"{self.saved} products saved, {len(self.errors)} rows rejected"
+
+
+def detect_format(path):
+    """Get the file format from a path's extension"""
+    for extension, file_format in FORMATS.items():
+        if path.lower().endswith(extension):
+            return file_format
+    raise ValueError(f"Cannot tell the format of {path}; use a .csv or .jsonl file or pass a format")
+
+
+def read_rows(file, file_format):
+    """Yield (line_number, row dict) from a CSV or JSON Lines file"""
+    if file_format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+            continue
+        yield line_number, row if isinstance(row, dict) else ValueError("expected a JSON object")
+
+
+def parse_product(row, categories):
+    """Validate one row and build a Product; raises ValueError describing the first problem"""
+    def field(name):
+        value = row.get(name)
+        if value is None:
+            return ""
+        return value.strip() if isinstance(value, str) else value
+
+    name = field("name")
+    if not name:
+        raise ValueError("name is required")
+    if len(name) > 255:
+        raise ValueError("name is longer than 255 characters")
+
+    price = field("price")
+    if not validate_price(price):
+        raise ValueError(f"invalid price {price!r}")
+    price = Decimal(str(price))
+    if not price.is_finite() or price >= 10 ** 8:
+        raise ValueError(f"price {field('price')!r} is out of range")
+    stock = field("stock")
+    if not validate_stock(stock):
+        raise ValueError(f"invalid stock {stock!r}")
+
+    product_id = field("id")
+    if product_id != "":
+        try:
+            product_id = int(product_id)
+        except (ValueError, TypeError):
+            raise ValueError(f"invalid id {product_id!r}")
+        if product_id <= 0:
+            raise ValueError(f"invalid id {product_id!r}")
+    else:
+        product_id = None
+
+    category_id = None
+    category = field("category")
+    if category != "":
+        category_id = categories.get(str(category).lower())
+        if category_id is None:
+            raise ValueError(f"unknown category {category!r}")
+    elif field("category_id") != "":
+        try:
+            category_id = int(field("category_id"))
+        except (ValueError, TypeError):
+            raise ValueError(f"invalid category_id {field('category_id')!r}")
+        if category_id not in categories.values():
+            raise ValueError(f"unknown category_id {category_id}")
+
+    return Product(product_id=product_id, category_id=category_id, name=name,
+                   description=field("description") or None,
+                   price=price.quantize(Decimal("0.01")), stock=int(stock),
+                   image=field("image") or None)
+
+
+def import_products(path, file_format=None, product_dao=None, category_dao=None):
+    """Stream products from a file into the database and return an ImportReport"""
+    file_format = file_format or detect_format(path)
+    product_dao = product_dao or ProductDAO()
+    category_dao = category_dao or CategoryDAO()
+    # Resolve category names once rather than per row
+    categories = {name.lower(): category_id
+                  for category_id, name, _ in category_dao.get_all_categories()}
+
+    report = ImportReport()
+    batch, lines = [], []
+
+    def flush():
+        failures = product_dao.bulk_save_products(batch)
+        for position, message in failures:
+            report.errors.append((lines[position], message))
+        report.saved += len(batch) - len(failures)
+        batch.clear()
+        lines.clear()
+
+    with open(path, newline="", encoding="utf-8") as file:
+        for line_number, row in read_rows(file, file_format):
+            try:
+                if isinstance(row, Exception):
+                    raise ValueError(str(row))
+                product = parse_product(row, categories)
+            except ValueError as e:
+                report.errors.append((line_number, str(e)))
+                continue
+            batch.append(product)
+            lines.append(line_number)
+            if len(batch) >= BULK_BATCH_SIZE:
+                flush()
+    if batch:
+        flush()
+    report.errors.sort()
+    return report
+
+
+def export_products(path, file_format=None, product_dao=None, category_dao=None):
+    """Stream every product to a file in ID order and return the number written"""
+    file_format = file_format or detect_format(path)
+    product_dao = product_dao or ProductDAO()
+    category_dao = category_dao or CategoryDAO()
+    category_names = {category_id: name for category_id, name, _ in category_dao.get_all_categories()}
+
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = None
+        if file_format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+        for product in product_dao.iter_products():
+            values = [product.id, product.name, product.description, product.price, product.stock,
+                      category_names.get(product.category_id), product.image]
+            if writer:
+                writer.writerow(["" if value is None else value for value in values])
+            else:
+                row = dict(zip(COLUMNS, values))
+                row["price"] = str(product.price)  # Keep DECIMAL precision
+                file.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export products as CSV or JSON Lines")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())),
+                        help="file format (default: from the file extension)")
+    args = parser.parse_args()
+
+    try:
+        file_format = args.format or detect_format(args.path)
+    except ValueError as e:
+        parser.error(str(e))
+    if not db.connect():
+        return 1
+
+    try:
+        if args.command == "import":
+            report = import_products(args.path, file_format)
+            for line_number, message in report.errors:
+                print(f"{args.path}:{line_number}: {message}", file=sys.stderr)
+            print(report)
+            return 1 if report.errors else 0
+        count = export_products(args.path, file_format)
+        print(f"{count} products exported to {args.path}")
+        return 0
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import heapq
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Name matches rank above description matches
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+# A prefix such as "s" matches thousands of words; only the shortest are expanded
+MAX_PREFIX_TERMS = 50
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric tokens"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class ProductSearchIndex:
+    """An in-memory inverted index over product names and descriptions.
+
+    Every query word must match (the last one as a prefix, so results update
+    while the user types) and results are ranked by TF-IDF with name matches
+    weighted above description matches. The index lives in this process, so
+    it is rebuilt periodically to pick up changes made by other processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}  # token -> {product_id: weight}
+        self._documents = {}  # product_id -> (category_id, tokens)
+        self._vocabulary = []  # Sorted tokens for prefix lookups
+        self._vocabulary_sorted = True
+        self._build_lock = threading.Lock()  # One build at a time
+        self._changes = None  # Changes made while a build runs, replayed onto its result
+        self.built_at = None
+        self.stale = False  # Set after bulk changes to force a rebuild
+
+    @property
+    def built(self):
+        return self.built_at is not None
+
+    def build(self, rows):
+        """Index (product_id, name, description, category_id) rows from scratch.
+
+        Searches use the old index until the new one is ready, and products
+        added or removed in the meantime are applied to both.
+        """
+        with self._build_lock:
+            with self._lock:
+                self._changes = []
+            try:
+                self._build(rows)
+            finally:
+                self._changes = None
+
+    def _build(self, rows):
+        fresh = ProductSearchIndex()
+        fresh._vocabulary_sorted = False  # Sort once at the end, not per word
+        for product_id, name, description, category_id in rows:
+            fresh._add(product_id, name, description, category_id)
+        with self._lock:
+            # The rows may have been read before these changes were made
+            for change in self._changes:
+                if len(change) == 1:
+                    fresh._remove(*change)
+                else:
+                    fresh._add(*change)
+            self._postings = fresh._postings
+            self._documents = fresh._documents
+            self._vocabulary = fresh._vocabulary
+            self._vocabulary_sorted = False
+            self.built_at = time.monotonic()
+            self.stale = False
+
+    def mark_stale(self):
+        """Have the next search rebuild the index, e.g. after a bulk import"""
+        self.stale = True
+
+    def add(self, product_id, name, description, category_id):
+        """Add or re-index a single product"""
+        with self._lock:
+            self._add(product_id, name, description, category_id)
+            if self._changes is not None:
+                self._changes.append((product_id, name, description, category_id))
+
+    def remove(self, product_id):
+        """Remove a product from the index"""
+        with self._lock:
+            self._remove(product_id)
+            if self._changes is not None:
+                self._changes.append((product_id,))
+
+    def search(self, query, category_id=None, limit=None, offset=0):
+        """Return product IDs matching the query, best matches first"""
+        with self._lock:
+            scores = self._score(query)
+            if category_id is not None:
+                documents = self._documents
+                scores = {product_id: score for product_id, score in scores.items()
+                          if documents[product_id][0] == category_id}
+
+        # Both orderings are stable, so repeated searches page consistently
+        if limit is None:
+            return sorted(scores, key=scores.get, reverse=True)[offset:]
+        return heapq.nlargest(offset + limit, scores, key=scores.get)[offset:]
+
+    def facet_counts(self, query):
+        """Return {category_id: number of matches} for a query"""
+        with self._lock:
+            scores = self._score(query)
+            return dict(Counter(self._documents[product_id][0] for product_id in scores))
+
+    def _add(self, product_id, name, description, category_id):
+        self._remove(product_id)
+        weights = Counter()
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                if self._vocabulary_sorted:
+                    # A removed word is still listed until the next sort
+                    index = bisect_left(self._vocabulary, token)
+                    if index == len(self._vocabulary) or self._vocabulary[index] != token:
+                        self._vocabulary.insert(index, token)
+                else:
+                    self._vocabulary.append(token)
+            # Dampen repeated words so keyword stuffing does not dominate
+            postings[product_id] = 1 + math.log(weight)
+        self._documents[product_id] = (category_id, tuple(weights))
+
+    def _remove(self, product_id):
+        document = self._documents.pop(product_id, None)
+        if document is None:
+            return
+        for token in document[1]:
+            postings = self._postings[token]
+            del postings[product_id]
+            if not postings:
+                # The word stays in the vocabulary until the next sort and is skipped on lookup
+                del self._postings[token]
+
+    def _expand(self, token, prefix):
+        """Return the indexed tokens a query token matches"""
+        if not prefix:
+            return [token] if token in self._postings else []
+        if not self._vocabulary_sorted:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_sorted = True
+        matches = []
+        index = bisect_left(self._vocabulary, token)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(token):
+            if self._vocabulary[index] in self._postings:
+                matches.append(self._vocabulary[index])
+            index += 1
+        if len(matches) > MAX_PREFIX_TERMS:
+            matches = heapq.nsmallest(MAX_PREFIX_TERMS, matches, key=lambda term: (len(term), term))
+        return matches
+
+    def _score(self, query):
+        """Return {product_id: score} for products matching every query token"""
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+        document_count = len(self._documents)
+
+        # Expand every token first so the cheapest one can be scored first
+        expanded = []
+        for position, token in enumerate(tokens):
+            terms = self._expand(token, prefix=position == len(tokens) - 1)
+            if not terms:
+                return {}
+            size = sum(len(self._postings[term]) for term in terms)
+            expanded.append((size, token, terms))
+        expanded.sort(key=lambda entry: entry[0])
+
+        scores = None
+        for size, token, terms in expanded:
+            token_scores = {}
+            for term in terms:
+                postings = self._postings[term]
+                # Exact word matches rank above prefix completions
+                factor = math.log(1 + document_count / len(postings)) * (1.0 if term == token else 0.7)
+                if scores is not None and len(scores) < len(postings):
+                    # Only products that matched the earlier tokens can still match
+                    matches = ((product_id, postings[product_id]) for product_id in scores
+                               if product_id in postings)
+                else:
+                    matches = postings.items()
+                get = token_scores.get
+                for product_id, weight in matches:
+                    score = weight * factor
+                    if score > get(product_id, 0):
+                        token_scores[product_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {product_id: score + token_scores[product_id]
+                          for product_id, score in scores.items() if product_id in token_scores}
+            if not scores:
+                return {}
+        return scores
+
+
+# Global product search index
+product_index = ProductSearchIndex()
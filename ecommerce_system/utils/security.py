@@ -1,13 +1,121 @@
+import threading
+import time
+from collections import OrderedDict, deque
 import bcrypt
+from ..config import SECURITY_CONFIG
 
+# bcrypt releases the GIL, so hashes run in parallel in the callers' threads
+# (the GUI background runner and the API workers) up to this many at once
+_hash_slots = threading.BoundedSemaphore(SECURITY_CONFIG['hash_workers'])
 
-def hash_password(password):
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
+
+def hash_password(password, rounds=None):
+    """Hash a password using bcrypt. Slow; call it off the GUI thread"""
+    rounds = rounds or SECURITY_CONFIG['bcrypt_rounds']
+    with _hash_slots:
+        return _hash(password, rounds)
+
+
+def verify_password(password, hashed):
+    """Verify a password against its hash. Slow; call it off the GUI thread"""
+    with _hash_slots:
+        return _verify(password, hashed)
+
+
+def needs_rehash(hashed):
+    """Check whether a hash was made with a different cost than the configured one"""
+    try:
+        # Hashes look like $2b$12$<salt and digest>
+        return int(hashed.split('$')[2]) != SECURITY_CONFIG['bcrypt_rounds']
+    except (AttributeError, IndexError, ValueError):
+        return True
+
+
+def _hash(password, rounds):
+    salt = bcrypt.gensalt(rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
-def verify_password(password, hashed):
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
\ No newline at end of file
+def _verify(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+class LoginThrottledError(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Too many failed login attempts; try again in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    """Counts failed logins per key over a sliding window and rejects keys over their limit.
+
+    Rejected attempts are refused before any bcrypt work is done, so a
+    burst of bad logins costs almost nothing.
+    """
+
+    def __init__(self, window_seconds=300, max_keys=10000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._failures = OrderedDict()  # key -> deque of failure times, least recently failed first
+        self._lock = threading.Lock()
+
+    def begin(self, limits):
+        """Start a login attempt, counting it as a failure against each key until it succeeds.
+
+        limits holds (key, max_failures) pairs. Raises LoginThrottledError,
+        counting nothing, if any key is already at its limit. The check and
+        the count happen under one lock, so concurrent attempts cannot all
+        slip in under the limit. Returns the attempt's time for succeeded().
+        """
+        now = time.monotonic()
+        with self._lock:
+            retry_after = 0
+            for key, max_failures in limits:
+                failures = self._recent(key, now)
+                if failures is not None and len(failures) >= max_failures:
+                    # Allowed again once enough failures have left the window
+                    oldest = failures[len(failures) - max_failures]
+                    retry_after = max(retry_after, oldest + self.window_seconds - now)
+            if retry_after > 0:
+                raise LoginThrottledError(int(retry_after) + 1)
+            for key, _ in limits:
+                failures = self._recent(key, now)
+                if failures is None:
+                    failures = self._failures[key] = deque()
+                failures.append(now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+        return now
+
+    def succeeded(self, keys, attempt):
+        """Stop counting a successful attempt begun at time attempt as a failure"""
+        with self._lock:
+            for key in keys:
+                failures = self._failures.get(key)
+                if failures is not None and attempt in failures:
+                    failures.remove(attempt)
+                    if not failures:
+                        del self._failures[key]
+
+    def reset(self, key):
+        """Forget a key's failures, e.g. after a successful login"""
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def _recent(self, key, now):
+        """Get a key's failures inside the window, dropping older ones"""
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+
+# Global login throttle
+login_throttle = LoginThrottle(SECURITY_CONFIG['login_window_seconds'])
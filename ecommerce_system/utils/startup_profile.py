@@ -0,0 +1,46 @@
+"""
+Startup timing for the desktop client.
+
+Run the client with --profile-startup to print how long each startup phase
+took and which packages it imported:
+
+    python -m ecommerce_system.main --profile-startup
+
+For a per-module breakdown of import costs, add Python's own -X importtime.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []  # [(name, seconds, packages imported), ...]
+        self.reported = 0  # Phases already printed
+
+    @contextmanager
+    def phase(self, name):
+        """Time a with-block and record the top-level packages it imported"""
+        if not self.enabled:
+            yield
+            return
+        modules = set(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            packages = sorted({module.partition(".")[0] for module in set(sys.modules) - modules})
+            self.phases.append((name, elapsed, packages))
+
+    def report(self, milestone):
+        """Print the phases recorded since the last report and the time since startup"""
+        if not self.enabled:
+            return
+        for name, seconds, packages in self.phases[self.reported:]:
+            imported = f"  (imported {', '.join(packages)})" if packages else ""
+            print(f"  {name:<24} {seconds * 1000:8.1f} ms{imported}")
+        self.reported = len(self.phases)
+        print(f"{milestone} after {(time.perf_counter() - self.started) * 1000:.1f} ms")
@@ -0,0 +1,67 @@
+"""
+Product card thumbnails, generated once and stored on disk.
+
+A thumbnail's file name is derived from the source image's path and
+modification time, so replacing an image produces a new thumbnail instead
+of serving a stale one. Pillow is imported on first use, so modules that
+import this one don't pay for it at startup.
+"""
+import hashlib
+import os
+import tempfile
+from ..config import THUMBNAIL_CONFIG
+
+
+def thumbnail_path(image_path):
+    """Get where the thumbnail of an image is stored, or None if the image doesn't exist"""
+    try:
+        mtime = os.stat(image_path).st_mtime_ns
+    except OSError:
+        return None
+    width, height = THUMBNAIL_CONFIG['size']
+    key = f"{os.path.abspath(image_path)}|{mtime}|{width}x{height}"
+    name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(THUMBNAIL_CONFIG['directory'], f"{name}.png")
+
+
+def ensure_thumbnail(image_path):
+    """Generate an image's thumbnail if it doesn't exist yet and return its path, or None"""
+    path = thumbnail_path(image_path)
+    if path is None or os.path.exists(path):
+        return path
+    try:
+        from PIL import Image
+        os.makedirs(THUMBNAIL_CONFIG['directory'], exist_ok=True)
+        with Image.open(image_path) as img:
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            thumbnail = img.resize(THUMBNAIL_CONFIG['size'], Image.Resampling.LANCZOS)
+        # Write a private temporary file then rename, so a concurrent reader never sees a partial file
+        with tempfile.NamedTemporaryFile(dir=THUMBNAIL_CONFIG['directory'], suffix=".tmp", delete=False) as file:
+            temp_path = file.name
+            try:
+                thumbnail.save(file, "PNG")
+            except Exception:
+                file.close()
+                os.remove(temp_path)
+                raise
+        os.replace(temp_path, path)
+        return path
+    except Exception as e:
+        print(f"Error creating thumbnail for {image_path}: {e}")
+        return None
+
+
+def load_thumbnail(image_path):
+    """Decode an image's thumbnail, generating it first if needed; returns a PIL image or None"""
+    path = ensure_thumbnail(image_path)
+    if path is None:
+        return None
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            img.load()
+            return img.copy()
+    except Exception as e:
+        print(f"Error loading thumbnail for {image_path}: {e}")
+        return None